@@ -1,72 +1,259 @@
 import os
+import json
 import shutil
 import requests
 import time
 import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+import configuracoes
 
 # --- CONFIGURAÇÕES ---
 PASTA_ORIGEM = "urnas_para_ler"       # Coloque seus PDFs aqui
 PASTA_DESTINO = "urnas_concluidas"    # Eles virão para cá se der certo
 PASTA_ERRO = "urnas_com_erro"         # Vão para cá se der erro
-URL_API = "http://127.0.0.1:8000/upload-boletim/"
+PASTA_INCERTOS = "urnas_incertas"     # Timeout depois do envio: o servidor pode ter gravado; conferir antes de reenviar
+URL_API = configuracoes.URL_API
+ARQUIVO_MANIFESTO = "manifesto_envios.json"  # Estado de cada arquivo; permite retomar uma execução interrompida
 
-def processar_arquivos():
+# Envio concorrente: mantenha WORKERS perto do nº de OCRs que o servidor aguenta em paralelo
+# (núcleos da máquina do uvicorn). Mais que isso só enfileira lá e aumenta o risco de timeout.
+WORKERS = 4
+TIMEOUT_CONEXAO = 5         # Segundos para abrir a conexão
+TIMEOUT_RESPOSTA = 300      # Segundos esperando o OCR do servidor
+TENTATIVAS = 5              # Retentativas em falha de conexão / 502 / 503
+BACKOFF = 1.0               # Espera 1s, 2s, 4s, ... entre as tentativas
+MAX_FALHAS_CONEXAO = 3      # Arquivos seguidos sem conseguir falar com o servidor -> para a execução
+
+# --- SESSÃO HTTP ---
+_local = threading.local()
+
+def criar_sessao():
+    """
+    Sessão com conexões keep-alive e retentativa com backoff exponencial.
+    Só repete quando o servidor certamente não gravou o boletim (não conectou ou 502/503);
+    timeout de leitura e 504 NÃO são repetidos, porque o upload pode ter sido gravado.
+    """
+    retry = Retry(
+        total=TENTATIVAS, connect=TENTATIVAS, read=0, status=TENTATIVAS,
+        backoff_factor=BACKOFF,
+        status_forcelist=[502, 503],
+        allowed_methods=frozenset(["POST"]),
+        raise_on_status=False,
+    )
+    sessao = requests.Session()
+    sessao.mount("http://", HTTPAdapter(max_retries=retry))
+    sessao.mount("https://", HTTPAdapter(max_retries=retry))
+    return sessao
+
+def sessao_da_thread():
+    """Uma sessão por thread do pool (requests.Session não é garantidamente thread-safe)"""
+    if not hasattr(_local, "sessao"):
+        _local.sessao = criar_sessao()
+    return _local.sessao
+
+def classificar_falha(e):
+    """
+    "sem_conexao" só quando a conexão nem abriu (recusada, DNS, timeout de conexão): o servidor
+    não recebeu nada e reenviar é seguro. Qualquer outra falha (timeout de leitura, que o urllib3
+    entrega como ConnectionError por causa do read=0, ou conexão caída no meio) é "incerto".
+    """
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return "sem_conexao"
+    motivo = e.args[0] if e.args else None
+    motivo = getattr(motivo, "reason", motivo)  # MaxRetryError embrulha o erro de verdade
+    if isinstance(motivo, (NewConnectionError, ConnectTimeoutError)):
+        return "sem_conexao"
+    return "incerto"
+
+def enviar_arquivo(caminho, url=URL_API):
+    """
+    Envia um PDF para a API.
+    Devolve (situacao, detalhe): situacao = "ok", "erro" (servidor recusou), "sem_conexao"
+    (não chegou ao servidor; tentar de novo depois) ou "incerto" (pode ter sido gravado; não reenviar).
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            response = sessao_da_thread().post(url, files={"file": f}, timeout=(TIMEOUT_CONEXAO, TIMEOUT_RESPOSTA))
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        return classificar_falha(e), str(e)
+
+    if response.status_code == 200:
+        return "ok", response.json()
+    if response.status_code in (502, 503):
+        return "sem_conexao", f"HTTP {response.status_code}"
+    if response.status_code == 504:
+        return "incerto", "HTTP 504 (o gateway desistiu; a API pode ter gravado)"
+    return "erro", f"HTTP {response.status_code}: {response.text[:500]}"
+
+# --- MANIFESTO ---
+def chave_arquivo(caminho):
+    """Nome + tamanho + data de modificação: um PDF substituído com o mesmo nome é enviado de novo"""
+    info = os.stat(caminho)
+    return f"{os.path.basename(caminho)}|{info.st_size}|{int(info.st_mtime)}"
+
+def carregar_manifesto(caminho=ARQUIVO_MANIFESTO):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def salvar_manifesto(manifesto, caminho=ARQUIVO_MANIFESTO):
+    """Grava num temporário e troca (os.replace é atômico): um Ctrl+C no meio não corrompe o arquivo"""
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+
+def mover(caminho, pasta):
+    shutil.move(caminho, os.path.join(pasta, os.path.basename(caminho)))
+
+def concluir_envio(manifesto, caminho, chave, situacao, detalhe):
+    """
+    Aplica o resultado de um envio: "ok" -> pasta de concluídos, "erro" -> pasta de erro,
+    "incerto" -> pasta de incertos (sai da origem para nunca ser reenviado sozinho), todos
+    registrados no manifesto (quem chama decide quando salvar). "sem_conexao" não mexe no arquivo.
+    """
+    if situacao == "sem_conexao":
+        return
+    manifesto[chave] = {"arquivo": os.path.basename(caminho), "situacao": situacao,
+                        "detalhe": detalhe, "quando": time.strftime("%Y-%m-%d %H:%M:%S")}
+    mover(caminho, PASTAS_RESULTADO[situacao])
+
+PASTAS_RESULTADO = {"ok": PASTA_DESTINO, "erro": PASTA_ERRO, "incerto": PASTA_INCERTOS}
+
+def formatar_tempo(segundos):
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}h{minutos:02d}m{segundos:02d}s" if horas else f"{minutos}m{segundos:02d}s"
+
+def processar_arquivos(workers=WORKERS, url=URL_API):
     # 1. Cria as pastas se não existirem
-    for pasta in [PASTA_ORIGEM, PASTA_DESTINO, PASTA_ERRO]:
+    for pasta in [PASTA_ORIGEM, PASTA_DESTINO, PASTA_ERRO, PASTA_INCERTOS]:
         os.makedirs(pasta, exist_ok=True)
 
     # 2. Lista os PDFs
-    arquivos = [f for f in os.listdir(PASTA_ORIGEM) if f.lower().endswith('.pdf')]
+    arquivos = sorted(f for f in os.listdir(PASTA_ORIGEM) if f.lower().endswith('.pdf'))
 
     if not arquivos:
         print(f"⚠️  Nenhum arquivo PDF encontrado na pasta '{PASTA_ORIGEM}'.")
         print(f"👉 Cole os arquivos PDF lá e rode o script novamente.")
         return
 
-    print(f"🚀 Iniciando processamento de {len(arquivos)} arquivos...")
+    # 3. Retomada: arquivos que o manifesto já registra como enviados só são movidos
+    #    (a execução anterior parou entre a resposta da API e o shutil.move)
+    manifesto = carregar_manifesto()
+    pendentes = []
+    for arquivo in arquivos:
+        caminho = os.path.join(PASTA_ORIGEM, arquivo)
+        if manifesto.get(chave_arquivo(caminho), {}).get("situacao") == "ok":
+            mover(caminho, PASTA_DESTINO)
+        else:
+            pendentes.append(caminho)
+    if len(pendentes) < len(arquivos):
+        print(f"♻️  {len(arquivos) - len(pendentes)} arquivos já enviados numa execução anterior (movidos para '{PASTA_DESTINO}').")
+
+    if not pendentes:
+        print("✅ Nada pendente.")
+        return
+
+    print(f"🚀 Iniciando processamento de {len(pendentes)} arquivos com {workers} envios simultâneos...")
     print("=" * 60)
 
     sucessos = 0
     falhas = 0
+    incertos = 0
+    adiados = 0
+    falhas_conexao_seguidas = 0
+    inicio = time.perf_counter()
+    fila = iter(pendentes)
+    em_voo = {}
 
-    # 3. Loop de Envio
-    for i, arquivo in enumerate(arquivos):
-        caminho_atual = os.path.join(PASTA_ORIGEM, arquivo)
-        print(f"[{i+1}/{len(arquivos)}] Processando: {arquivo} ... ", end="", flush=True)
-
+    # 4. Envio com janela limitada: no máximo 'workers' arquivos em voo; cada resposta libera uma vaga
+    #    (backpressure: não lemos nem submetemos milhares de arquivos de uma vez)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
         try:
-            # Abre e envia o arquivo
-            with open(caminho_atual, 'rb') as f:
-                response = requests.post(URL_API, files={"file": f})
-
-            # Verifica resposta
-            if response.status_code == 200:
-                print("✅ SUCESSO")
-                # Move para pasta de concluídos
-                shutil.move(caminho_atual, os.path.join(PASTA_DESTINO, arquivo))
-                sucessos += 1
-            else:
-                print(f"❌ ERRO ({response.status_code})")
-                print(f"   Detalhe: {response.text}")
-                # Move para pasta de erro para analisar depois
-                shutil.move(caminho_atual, os.path.join(PASTA_ERRO, arquivo))
-                falhas += 1
-
-        except requests.exceptions.ConnectionError:
-            print("\n⛔ ERRO FATAL: Não foi possível conectar ao servidor.")
-            print("   Certifique-se que o 'main.py' está rodando (uvicorn).")
-            sys.exit(1)
-        except Exception as e:
-            print(f"\n❌ ERRO NO SCRIPT: {e}")
-            falhas += 1
-
-    # 4. Resumo Final
+            while True:
+                while len(em_voo) < workers and falhas_conexao_seguidas < MAX_FALHAS_CONEXAO:
+                    caminho = next(fila, None)
+                    if caminho is None:
+                        break
+                    em_voo[pool.submit(enviar_arquivo, caminho, url)] = (caminho, chave_arquivo(caminho))
+                if not em_voo:
+                    break
+
+                prontos, _ = wait(em_voo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    caminho, chave = em_voo.pop(futuro)
+                    arquivo = os.path.basename(caminho)
+                    try:
+                        situacao, detalhe = futuro.result()
+                    except Exception as e:
+                        situacao, detalhe = "erro", f"ERRO NO SCRIPT: {e}"
+
+                    concluir_envio(manifesto, caminho, chave, situacao, detalhe)
+                    if situacao == "ok":
+                        salvar_manifesto(manifesto)
+                        sucessos += 1
+                        falhas_conexao_seguidas = 0
+                        marca = "✅ SUCESSO"
+                    elif situacao == "erro":
+                        salvar_manifesto(manifesto)
+                        falhas += 1
+                        falhas_conexao_seguidas = 0
+                        marca = f"❌ ERRO\n   Detalhe: {detalhe}"
+                    elif situacao == "incerto":
+                        # A conexão estava aberta: não é servidor fora do ar, não conta para a parada
+                        salvar_manifesto(manifesto)
+                        incertos += 1
+                        falhas_conexao_seguidas = 0
+                        marca = f"❓ INCERTO (movido para '{PASTA_INCERTOS}', não será reenviado)\n   Detalhe: {detalhe}"
+                    else:
+                        # Fica na pasta de origem: a próxima execução tenta de novo
+                        adiados += 1
+                        falhas_conexao_seguidas += 1
+                        marca = f"⛔ SEM CONEXÃO (fica para a próxima execução)\n   Detalhe: {detalhe}"
+
+                    feitos = sucessos + falhas + incertos + adiados
+                    decorrido = time.perf_counter() - inicio
+                    taxa = feitos / decorrido
+                    eta = (len(pendentes) - feitos) / taxa if taxa else 0
+                    print(f"[{feitos}/{len(pendentes)}] {arquivo} {marca} | {taxa * 60:.1f} arq/min | ETA {formatar_tempo(eta)}", flush=True)
+
+                if falhas_conexao_seguidas >= MAX_FALHAS_CONEXAO and not em_voo:
+                    print("\n⛔ ERRO FATAL: Não foi possível conectar ao servidor.")
+                    print("   Certifique-se que o 'main.py' está rodando (uvicorn). Rode de novo para retomar.")
+                    break
+        except KeyboardInterrupt:
+            print("\n⏸️  Interrompido: esperando os envios em andamento (o manifesto já está salvo)...")
+            for futuro in em_voo:
+                futuro.cancel()
+            raise
+
+    # 5. Resumo Final
+    decorrido = time.perf_counter() - inicio
     print("=" * 60)
     print("🏁 Processamento Finalizado!")
-    print(f"📦 Total processado: {len(arquivos)}")
+    concluidos = sucessos + falhas + incertos
+    print(f"📦 Total processado: {concluidos} de {len(pendentes)} em {formatar_tempo(decorrido)}")
     print(f"✅ Sucessos: {sucessos}")
     print(f"❌ Falhas:   {falhas}")
+    if incertos:
+        print(f"❓ Incertos: {incertos} em '{PASTA_INCERTOS}' (timeout com o servidor processando). Confira na API;")
+        print(f"   como ela ignora PDF repetido, voltar o arquivo para '{PASTA_ORIGEM}' não duplica votos.")
+    if concluidos < len(pendentes):
+        print(f"⏳ Pendentes: {len(pendentes) - concluidos} (continuam em '{PASTA_ORIGEM}')")
     print(f"📁 Arquivos movidos para: '{PASTA_DESTINO}'")
+    if falhas_conexao_seguidas >= MAX_FALHAS_CONEXAO:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    processar_arquivos()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Envia os PDFs de BU da pasta de origem para a API")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Envios simultâneos (janela de arquivos em voo)")
+    parser.add_argument("--url", default=URL_API)
+    args = parser.parse_args()
+    processar_arquivos(args.workers, args.url)
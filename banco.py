@@ -0,0 +1,87 @@
+from sqlalchemy import create_engine, event, Column, Integer, Sequence, text
+from configuracoes import DATABASE_URL, DB_POOL_TAMANHO, DB_POOL_EXTRA, DB_POOL_TIMEOUT
+
+# Backend de armazenamento, escolhido pela variável de ambiente DATABASE_URL:
+#   postgresql://...             servidor (docker-compose); padrão. Único com partições, LISTEN/NOTIFY e COPY.
+#   sqlite:///eleicoes.db        embutido, zero instalação: API (com aiosqlite), scripts e relatórios.
+#   duckdb:///eleicoes.duckdb    embutido e colunar (pip install duckdb-engine): GROUP BY/pivôs bem mais
+#                                rápidos num notebook; para scripts e relatórios (não há driver assíncrono).
+# Para levar os dados do servidor para um arquivo local: DATABASE_URL=sqlite:///eleicoes.db python copiar_banco.py
+#
+# Os engines são criados na primeira chamada de obter_engine()/obter_engine_assincrona(), não no import:
+# importar um script (ou abrir o --help dele) não carrega driver nem abre pool.
+
+# --- CONFIGURAÇÕES ---
+DRIVERS_ASSINCRONOS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def dialeto_da_url(url):
+    """'postgresql+psycopg2://...' -> 'postgresql', sem criar engine nem importar o driver"""
+    return url.split(":", 1)[0].split("+", 1)[0]
+
+DIALETO = dialeto_da_url(DATABASE_URL)   # 'postgresql', 'sqlite' ou 'duckdb'
+EH_POSTGRES = DIALETO == "postgresql"
+
+_engines = {}  # url -> engine; um pool por processo e por base
+
+def opcoes_pool(url):
+    """Pool configurável só no Postgres; SQLite e DuckDB usam o pool padrão do dialeto (arquivo local)"""
+    if dialeto_da_url(url) != "postgresql":
+        return {}
+    return {"pool_size": DB_POOL_TAMANHO, "max_overflow": DB_POOL_EXTRA, "pool_timeout": DB_POOL_TIMEOUT}
+
+def criar_engine(url=DATABASE_URL):
+    engine = create_engine(url, **opcoes_pool(url))
+    if engine.dialect.name == "sqlite":
+        # O SQLite só respeita as chaves estrangeiras com o pragma ligado em cada conexão
+        @event.listens_for(engine, "connect")
+        def _ligar_chaves(conexao, _):
+            conexao.execute("PRAGMA foreign_keys = ON")
+    return engine
+
+def obter_engine(url=DATABASE_URL):
+    """Engine síncrono (scripts, dashboard, DDL, LISTEN), criado no primeiro uso e reaproveitado"""
+    if url not in _engines:
+        _engines[url] = criar_engine(url)
+    return _engines[url]
+
+def url_assincrona(url=DATABASE_URL):
+    """Mesma base com o driver assíncrono da API; None se o backend não tem um (DuckDB)"""
+    dialeto = dialeto_da_url(url)
+    if dialeto not in DRIVERS_ASSINCRONOS:
+        return None
+    return DRIVERS_ASSINCRONOS[dialeto] + url[url.index(":"):]
+
+def obter_engine_assincrona(url=DATABASE_URL):
+    """Engine da API (asyncpg/aiosqlite), criado no primeiro uso; None no DuckDB"""
+    assincrona = url_assincrona(url)
+    if assincrona is None:
+        return None
+    if assincrona not in _engines:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _engines[assincrona] = create_async_engine(assincrona, pool_pre_ping=EH_POSTGRES, **opcoes_pool(url))
+    return _engines[assincrona]
+
+def coluna_id(tabela, **opcoes):
+    """
+    Chave primária inteira autoincrementada. Postgres (SERIAL) e SQLite (ROWID) fazem isso sozinhos;
+    o DuckDB precisa de uma sequência explícita, também como DEFAULT para os INSERTs em SQL puro.
+    """
+    if DIALETO != "duckdb":
+        return Column(Integer, primary_key=True, **opcoes)
+    sequencia = Sequence(f"{tabela}_id_seq")
+    return Column(Integer, sequencia, server_default=text(f"nextval('{tabela}_id_seq')"), primary_key=True, **opcoes)
+
+def inserir_ignorando(tabela, valores, chave=None, restricao=None):
+    """INSERT ... ON CONFLICT DO NOTHING no dialeto do backend (Postgres e SQLite têm; o DuckDB também aceita)"""
+    if DIALETO == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        # O SQLite não referencia restrição por nome: resolve pelas colunas dela
+        if restricao is not None and chave is None:
+            chave = [c.name for c in next(r for r in tabela.constraints if r.name == restricao).columns]
+        return insert(tabela).values(valores).on_conflict_do_nothing(index_elements=chave)
+    from sqlalchemy.dialects.postgresql import insert
+    if DIALETO == "duckdb":
+        return insert(tabela).values(valores).on_conflict_do_nothing()
+    if restricao is not None:
+        return insert(tabela).values(valores).on_conflict_do_nothing(constraint=restricao)
+    return insert(tabela).values(valores).on_conflict_do_nothing(index_elements=chave)
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# --- CONFIGURAÇÕES ---
+# Tempo de inicialização de cada ponto de entrada: um processo Python novo por medição,
+# que só importa o módulo (o que toda execução de CLI e todo reload do Streamlit pagam
+# antes de fazer qualquer coisa útil). A subida do próprio interpretador não entra na conta.
+# Com --detalhe, mostra os imports mais caros de cada um (python -X importtime).
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PONTOS_DE_ENTRADA = [
+    "main", "dashboard", "automacao", "vigia_urnas", "importar_tse_csv", "copiar_banco",
+    "carregar_candidatos", "auditoria", "revelar_eleitos", "simulador_cadeiras",
+    "clusterização_de_rivais", "motor_relatorios", "sincronizar_tse_bd", "pipeline", "eleicoes",
+    "locais_votacao", "correlacao_votos", "dossie_candidatos",
+]
+REPETICOES = 5
+TOP_IMPORTS = 3
+LIMITE_REGRESSAO = 0.10
+ARQUIVO_SAIDA = "resultado_inicializacao.json"
+
+def medir_import(modulo):
+    """Segundos de 'import modulo' num processo novo (sem contar a subida do interpretador)"""
+    codigo = ("import sys, time, importlib; sys.path.insert(0, sys.argv[1]); t = time.perf_counter(); "
+              f"importlib.import_module({modulo!r}); print(time.perf_counter() - t)")
+    saida = subprocess.run([sys.executable, "-c", codigo, RAIZ], cwd=RAIZ, capture_output=True, text=True,
+                           env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if saida.returncode != 0:
+        raise RuntimeError(saida.stderr.strip().splitlines()[-1])
+    return float(saida.stdout.strip().splitlines()[-1])
+
+def imports_mais_caros(modulo, top=TOP_IMPORTS):
+    """Pacotes (primeiro nível) que mais pesam no import, pelo -X importtime"""
+    codigo = f"import sys, importlib; sys.path.insert(0, sys.argv[1]); importlib.import_module({modulo!r})"
+    saida = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo, RAIZ], cwd=RAIZ,
+                           capture_output=True, text=True)
+    custos = {}
+    for linha in saida.stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, acumulado, nome = linha.split("|")
+        if not acumulado.strip().isdigit():
+            continue  # Cabeçalho
+        raiz = nome.strip().split(".")[0]
+        # Só o nível mais raso de cada pacote (o acumulado já inclui os submódulos)
+        custos[raiz] = max(custos.get(raiz, 0), int(acumulado) / 1e6)
+    custos.pop(modulo, None)
+    return sorted(custos.items(), key=lambda c: c[1], reverse=True)[:top]
+
+def executar(args):
+    resultado = {}
+    print("=" * 90)
+    print(f"⏱️  Inicialização por ponto de entrada (mediana de {args.repeticoes} processos novos)")
+    print("-" * 90)
+    for modulo in args.modulos:
+        try:
+            tempos = sorted(medir_import(modulo) for _ in range(args.repeticoes))
+        except RuntimeError as e:
+            print(f"{modulo:<26} | ❌ {e}")
+            continue
+        mediana = tempos[len(tempos) // 2]
+        resultado[modulo] = {"mediana_s": mediana, "melhor_s": tempos[0]}
+        detalhe = ""
+        if args.detalhe:
+            detalhe = ", ".join(f"{nome} {segundos * 1000:.0f}ms" for nome, segundos in imports_mais_caros(modulo))
+        print(f"{modulo:<26} | mediana {mediana * 1000:>7.0f} ms | melhor {tempos[0] * 1000:>7.0f} ms | {detalhe}")
+    print("=" * 90)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=1)
+    print(f"💾 Resultado gravado em '{args.saida}'")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        print(f"\n📈 Comparação com '{args.comparar}':")
+        piorou = False
+        for modulo, atual in resultado.items():
+            if modulo not in base:
+                continue
+            antes, depois = base[modulo]["mediana_s"], atual["mediana_s"]
+            variacao = (depois - antes) / antes
+            marca = "🔴" if variacao > args.limite else ("🟢" if variacao < -args.limite else "⚪")
+            piorou |= variacao > args.limite
+            print(f"   {marca} {modulo:<26} {antes * 1000:>7.0f} ms -> {depois * 1000:>7.0f} ms ({variacao:+.0%})")
+        if piorou and args.falhar:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de inicialização de cada script")
+    parser.add_argument("modulos", nargs="*", default=PONTOS_DE_ENTRADA, help="Módulos a medir (padrão: todos)")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--detalhe", action="store_true", help="Mostra os imports mais caros de cada módulo")
+    parser.add_argument("--saida", default=ARQUIVO_SAIDA)
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar as medianas")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO, help="Piora relativa tolerada por módulo")
+    parser.add_argument("--falhar", action="store_true", help="Sai com código 1 se houver regressão (para CI)")
+    executar(parser.parse_args())
@@ -0,0 +1,366 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib
+import subprocess
+from contextlib import redirect_stdout
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import corpus_sintetico
+from ocr_boletim import interpretar_texto
+
+# --- CONFIGURAÇÕES ---
+# Benchmark de ponta a ponta sobre um corpus sintético com gabarito (corpus_sintetico.py):
+# interpretação do BU (e OCR real, se houver Tesseract), auditoria, cadeiras, clusterização,
+# correlação e PDF. Nada toca no banco. O resultado sai em JSON para comparar entre commits (--comparar).
+REPETICOES = 5
+CENARIOS_SIMULADOR = 10000   # Cenários por execução do simulador_cadeiras
+AMOSTRA_OCR = 5               # PDFs passados pelo OCR real (é a etapa lenta)
+LIMITE_REGRESSAO = 0.10       # Etapa 10% mais lenta que a base = regressão
+RUIDO_MINIMO_S = 0.005        # Diferenças menores que isso (etapas de microssegundos) não contam
+ARQUIVO_SAIDA = "resultado_bench.json"
+
+def cronometrar(funcao, repeticoes=REPETICOES):
+    """Roda 'funcao' n vezes com o stdout dos scripts descartado; devolve (tempos ordenados, último retorno)"""
+    tempos = []
+    for _ in range(repeticoes):
+        with redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            retorno = funcao()
+            tempos.append(time.perf_counter() - inicio)
+    return sorted(tempos), retorno
+
+def resumo_tempos(tempos, itens=None):
+    mediana = tempos[len(tempos) // 2]
+    resumo = {"mediana_s": round(mediana, 6), "melhor_s": round(tempos[0], 6), "repeticoes": len(tempos)}
+    if itens:
+        resumo["itens"] = itens
+        resumo["itens_por_s"] = round(itens / mediana, 1) if mediana else None
+    return resumo
+
+# --- ACURÁCIA CONTRA O GABARITO ---
+def comparar_com_gabarito(eleicao, lidos):
+    """'lidos': {secao: dados de interpretar_texto}. Conta votos certos/errados/faltando por (cargo, número)"""
+    esperados = lidos_certos = errados = faltando = sobrando = 0
+    metadados_ok = totais_conferem = comparecimento_ok = 0
+    legendas_esperadas = legendas_certas = especiais_certos = 0
+    for secao in eleicao["secoes"]:
+        dados = lidos.get(secao["secao"])
+        if dados is None:
+            continue
+        meta = dados["metadata"]
+        metadados_ok += meta["secao"] == secao["secao"] and meta["municipio"] == eleicao["municipio"]
+        comparecimento_ok += meta.get("aptos") == secao["aptos"] and meta.get("comparecimento") == secao["comparecimento"]
+        legenda = {l["partido"]: l["qtd"] for l in dados["legenda"]}
+        legendas_esperadas += len(secao["legenda"])
+        legendas_certas += sum(legenda.get(p) == q for p, q in secao["legenda"].items())
+        apuracao = dados.get("apuracao", {})
+        especiais_certos += sum(apuracao.get(cargo, {}).get("brancos") == secao["brancos"][cargo]
+                                and apuracao.get(cargo, {}).get("nulos") == secao["nulos"][cargo] for cargo in secao["brancos"])
+        lido = {(v["cargo"], v["numero"]): v["qtd"] for v in dados["votos"]}
+        for cargo, votos in secao["votos"].items():
+            esperados += len(votos)
+            for numero, qtd in votos.items():
+                chave = (cargo, numero)
+                if chave not in lido:
+                    faltando += 1
+                elif lido.pop(chave) == qtd:
+                    lidos_certos += 1
+                else:
+                    errados += 1
+            total = dados["totais"].get(cargo, {}).get("qtd")
+            soma = sum(v["qtd"] for v in dados["votos"] if v["cargo"] == cargo)
+            totais_conferem += total == soma
+        sobrando += len(lido)
+    secoes = len(lidos)
+    return {
+        "secoes": secoes,
+        "metadados_corretos": metadados_ok / secoes if secoes else None,
+        "votos_esperados": esperados,
+        "votos_corretos": lidos_certos,
+        "votos_errados": errados,
+        "votos_faltando": faltando,
+        "votos_sobrando": sobrando,
+        "acuracia": lidos_certos / esperados if esperados else None,
+        "legendas_esperadas": legendas_esperadas,
+        "legendas_corretas": legendas_certas,
+        "aptos_comparecimento_corretos": comparecimento_ok / secoes if secoes else None,
+        "brancos_nulos_corretos": especiais_certos / (2 * secoes) if secoes else None,
+        # Cargos em que a soma lida bate com os votos nominais do BU (o que o ingest usa para reler)
+        "totais_conferem": totais_conferem / (2 * secoes) if secoes else None,
+    }
+
+# --- ETAPAS ---
+def etapa_interpretar(eleicao, fixtures, repeticoes):
+    def rodar():
+        return {f["secao"]: interpretar_texto(f["linhas"], f["confiancas"]) for f in fixtures}
+    tempos, lidos = cronometrar(rodar, repeticoes)
+    return resumo_tempos(tempos, len(fixtures)), lidos
+
+def etapa_ocr(eleicao, pasta, amostra):
+    """OCR real (pdf2image + Tesseract) numa amostra dos PDFs; pulada quando o ambiente não tem os binários"""
+    pasta_pdf = os.path.join(pasta, "pdf")
+    if not os.path.isdir(pasta_pdf):
+        return {"pulada": "corpus sem PDFs (gere com --pdf)"}, None
+    faltam = [b for b in ("tesseract", "pdftoppm") if not shutil.which(b)]
+    if faltam:
+        return {"pulada": f"sem {', '.join(faltam)} no PATH"}, None
+
+    from ocr_boletim import extrair_dados_com_ocr
+    arquivos = sorted(os.listdir(pasta_pdf))[:amostra]
+    conteudos = []
+    for arquivo in arquivos:
+        with open(os.path.join(pasta_pdf, arquivo), "rb") as f:
+            conteudos.append(f.read())
+
+    tempos, lidos = cronometrar(lambda: [extrair_dados_com_ocr(c) for c in conteudos], repeticoes=1)
+    resultado = resumo_tempos(tempos, len(conteudos))
+    return resultado, {arquivo[3:-4]: dados for arquivo, dados in zip(arquivos, lidos)}
+
+def totais_por_candidato(votos_por_secao):
+    """{cargo: {numero: {'nome', 'votos'}}} somando as seções (formato do auditoria.py)"""
+    totais = {}
+    for cargo, numero, nome, qtd in votos_por_secao:
+        item = totais.setdefault(cargo, {}).setdefault(numero, {"nome": nome, "votos": 0})
+        item["votos"] += qtd
+    return totais
+
+def etapa_auditoria(eleicao, df_votos, repeticoes):
+    import auditoria
+
+    nomes = {(c["cargo"], c["numero"]): c["nome"] for c in eleicao["candidatos"]}
+    oficial = totais_por_candidato((cargo, n, nomes[(cargo, n)], q) for s in eleicao["secoes"]
+                                   for cargo, votos in s["votos"].items() for n, q in votos.items())
+    apurado = totais_por_candidato(df_votos[["cargo", "numero", "nome", "qtd_votos"]].itertuples(index=False))
+
+    def rodar():
+        return {cargo: auditoria.comparar(oficial.get(cargo, {}), apurado.get(cargo, {})) for cargo in oficial}
+    tempos, linhas = cronometrar(rodar, repeticoes)
+    resultado = resumo_tempos(tempos, sum(len(l) for l in linhas.values()))
+    resultado["candidatos_divergentes"] = sum(l["diferenca"] != 0 for c in linhas.values() for l in c)
+    return resultado
+
+def etapa_cadeiras(df_votos, df_legenda, repeticoes):
+    import revelar_eleitos
+
+    vereador = pd.concat([df_votos, df_legenda])
+    vereador = vereador[vereador["cargo"] == "vereador"]
+    df_partidos = (vereador.groupby("partido", as_index=False)["qtd_votos"].sum()
+                   .rename(columns={"qtd_votos": "votos_totais"})
+                   .sort_values("votos_totais", ascending=False, ignore_index=True))
+    tempos, (distribuicao, _) = cronometrar(lambda: revelar_eleitos.calcular_distribuicao(df_partidos), repeticoes)
+    resultado = resumo_tempos(tempos, len(df_partidos))
+    resultado["cadeiras"] = int(distribuicao["vagas"].sum())
+    return resultado
+
+def etapa_simulador(df_votos, df_legenda, cenarios, repeticoes):
+    import simulador_cadeiras
+
+    vereador = pd.concat([df_votos, df_legenda])
+    base = simulador_cadeiras.montar_base(vereador[vereador["cargo"] == "vereador"])
+    partidos = sorted(base["colunas"]["partido"].unique())
+    cenario = {"comparecimento": [1.0, 0.05], "transferencias": [[partidos[0], partidos[1], [0.0, 0.3]]]}
+    tempos, (vagas, _, _) = cronometrar(lambda: simulador_cadeiras.simular(base, cenario, cenarios), repeticoes)
+    resultado = resumo_tempos(tempos, cenarios)
+    resultado["cadeiras_por_cenario"] = int(vagas.sum(axis=1).max())
+    return resultado
+
+def etapa_clusterizacao(df_votos, repeticoes):
+    try:
+        cluster = importlib.import_module("clusterização_de_rivais")
+    except ImportError as e:
+        return {"pulada": str(e)}
+
+    vereador = df_votos[df_votos["cargo"] == "vereador"]
+    df = pd.DataFrame({"candidato": vereador["nome"] + " (" + vereador["numero"].astype(str) + ")",
+                       "secao": vereador["secao"], "qtd_votos": vereador["qtd_votos"]})
+
+    def rodar():
+        df_pivot = cluster.montar_matriz(df)
+        return cluster.agrupar(df_pivot)[0]
+    tempos, clusters = cronometrar(rodar, repeticoes)
+    resultado = resumo_tempos(tempos, df["candidato"].nunique())
+    resultado["grupos"] = int(clusters.max()) + 1
+    return resultado
+
+def etapa_correlacao(df_votos, repeticoes):
+    import correlacao_votos
+
+    df = pd.DataFrame({"zona": "0001", "secao": df_votos["secao"], "cargo": df_votos["cargo"],
+                       "numero": df_votos["numero"], "partido_numero": df_votos["partido"], "qtd": df_votos["qtd_votos"]})
+    tempos, (registros, _) = cronometrar(lambda: correlacao_votos.calcular_ligacoes(df, 0, "bench"), repeticoes)
+    resultado = resumo_tempos(tempos, df[["cargo", "numero"]].drop_duplicates().shape[0])
+    resultado["ligacoes"] = len(registros)
+    return resultado
+
+def etapa_pdf(eleicao, df_votos, repeticoes, compacto):
+    import motor_relatorios
+
+    nomes = {c["numero"]: c["nome"] for c in eleicao["candidatos"]}
+    oficial = totais_por_candidato(("-", n, nomes[n], q) for s in eleicao["secoes"]
+                                   for votos in s["votos"].values() for n, q in votos.items())["-"]
+    df_oficial = pd.DataFrame({"numero": list(oficial), "votos_tse": [o["votos"] for o in oficial.values()]})
+    secoes = [s["secao"] for s in eleicao["secoes"]]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = os.path.join(pasta, "auditoria.pdf")
+
+        def rodar():
+            modelo = motor_relatorios.montar_modelo(secoes, df_votos, df_oficial)
+            motor_relatorios.renderizar_documento(modelo, "auditoria", destino, compacto=compacto)
+            return len(modelo["candidatos"])
+        tempos, candidatos = cronometrar(rodar, repeticoes)
+        resultado = resumo_tempos(tempos, candidatos)
+        resultado["bytes"] = os.path.getsize(destino)
+    return resultado
+
+# --- EXECUÇÃO ---
+def votos_lidos_em_tabela(lidos):
+    """Saída do ingest no formato das consultas dos scripts: cargo, numero, nome, partido, secao, qtd_votos"""
+    return pd.DataFrame([
+        {"cargo": v["cargo"], "numero": v["numero"], "nome": v["nome"], "partido": v["partido"],
+         "secao": secao, "qtd_votos": v["qtd"]}
+        for secao, dados in lidos.items() for v in dados["votos"]
+    ])
+
+def legendas_lidas_em_tabela(lidos):
+    """Votos de legenda com o número do partido no lugar do número do candidato (como o simulador_cadeiras espera)"""
+    return pd.DataFrame([
+        {"cargo": l["cargo"], "numero": l["partido"], "nome": "LEGENDA", "partido": l["partido"],
+         "secao": secao, "qtd_votos": l["qtd"]}
+        for secao, dados in lidos.items() for l in dados["legenda"]
+    ], columns=["cargo", "numero", "nome", "partido", "secao", "qtd_votos"])
+
+def versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def executar(args):
+    if args.corpus:
+        eleicao, fixtures = corpus_sintetico.carregar_corpus(args.corpus)
+        pasta = args.corpus
+    else:
+        eleicao = corpus_sintetico.gerar_eleicao(args.secoes, args.candidatos, args.partidos, semente=args.semente)
+        fixtures = corpus_sintetico.gerar_fixtures(eleicao, args.ruido, args.semente)
+        eleicao["parametros"] = {"ruido": args.ruido, "semente": args.semente}
+        pasta = None
+
+    escala = {"secoes": len(eleicao["secoes"]), "candidatos": len(eleicao["candidatos"]),
+              "partidos": len(eleicao["partidos"]), **eleicao.get("parametros", {})}
+    print(f"🚀 Benchmark: {escala['secoes']} seções, {escala['candidatos']} candidatos, {escala['partidos']} partidos")
+
+    etapas, acuracia = {}, {}
+    etapas["interpretar"], lidos = etapa_interpretar(eleicao, fixtures, args.repeticoes)
+    acuracia["interpretar"] = comparar_com_gabarito(eleicao, lidos)
+
+    etapas["ocr"], lidos_ocr = etapa_ocr(eleicao, pasta, args.amostra_ocr) if pasta else ({"pulada": "sem --corpus"}, None)
+    if lidos_ocr:
+        acuracia["ocr"] = comparar_com_gabarito(eleicao, lidos_ocr)
+
+    df_votos = votos_lidos_em_tabela(lidos)
+    df_legenda = legendas_lidas_em_tabela(lidos)
+    etapas["auditoria"] = etapa_auditoria(eleicao, df_votos, args.repeticoes)
+    etapas["cadeiras"] = etapa_cadeiras(df_votos, df_legenda, args.repeticoes)
+    etapas["simulador"] = etapa_simulador(df_votos, df_legenda, args.cenarios_simulador, args.repeticoes)
+    etapas["clusterizacao"] = etapa_clusterizacao(df_votos, args.repeticoes)
+    etapas["correlacao"] = etapa_correlacao(df_votos, args.repeticoes)
+    if not args.sem_pdf:
+        etapas["pdf"] = etapa_pdf(eleicao, df_votos, args.repeticoes_pdf, args.compacto)
+
+    resultado = {
+        "quando": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": versao_codigo(),
+        "python": platform.python_version(),
+        "maquina": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "escala": escala,
+        "etapas": etapas,
+        "acuracia": acuracia,
+    }
+    mostrar(resultado)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=1)
+    print(f"💾 Resultado gravado em '{args.saida}'")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if comparar_resultados(base, resultado, args.limite) and args.falhar:
+            sys.exit(1)
+
+def mostrar(resultado):
+    print("=" * 90)
+    print(f"{'etapa':<16} | {'mediana ms':>11} | {'melhor ms':>10} | {'itens':>7} | {'itens/s':>10} | detalhe")
+    print("-" * 90)
+    for nome, etapa in resultado["etapas"].items():
+        if "pulada" in etapa:
+            print(f"{nome:<16} | {'-':>11} | {'-':>10} | {'-':>7} | {'-':>10} | ⏭️  pulada: {etapa['pulada']}")
+            continue
+        extras = {k: v for k, v in etapa.items() if k not in ("mediana_s", "melhor_s", "repeticoes", "itens", "itens_por_s")}
+        print(f"{nome:<16} | {etapa['mediana_s'] * 1000:>11.1f} | {etapa['melhor_s'] * 1000:>10.1f} | "
+              f"{etapa.get('itens', ''):>7} | {etapa.get('itens_por_s') or '':>10} | {extras or ''}")
+    print("-" * 90)
+    for nome, a in resultado["acuracia"].items():
+        print(f"🎯 {nome}: {a['votos_corretos']}/{a['votos_esperados']} votos corretos ({a['acuracia']:.2%}), "
+              f"{a['votos_errados']} errados, {a['votos_faltando']} faltando, {a['votos_sobrando']} sobrando | "
+              f"metadados {a['metadados_corretos']:.0%} | totais do BU conferem em {a['totais_conferem']:.0%}")
+        print(f"   legendas {a['legendas_corretas']}/{a['legendas_esperadas']} | aptos/comparecimento "
+              f"{a['aptos_comparecimento_corretos']:.0%} | brancos/nulos {a['brancos_nulos_corretos']:.0%}")
+    print("=" * 90)
+
+def comparar_resultados(base, atual, limite=LIMITE_REGRESSAO):
+    """
+    Imprime a variação de cada etapa contra 'base' e devolve True se alguma piorou além do limite.
+    Compara o melhor tempo (menos sensível a ruído da máquina que a mediana).
+    """
+    if base.get("escala") != atual["escala"]:
+        print(f"⚠️  Escalas diferentes (base {base.get('escala')}): a comparação é só indicativa.")
+    print(f"📈 Comparando com {base.get('commit')} ({base.get('quando')}), melhor tempo de cada etapa:")
+    regressoes = []
+    for nome, etapa in atual["etapas"].items():
+        anterior = base.get("etapas", {}).get(nome, {})
+        if "melhor_s" not in etapa or "melhor_s" not in anterior:
+            continue
+        antes, agora = anterior["melhor_s"], etapa["melhor_s"]
+        variacao = agora / antes - 1 if antes else 0.0
+        significativa = abs(agora - antes) >= RUIDO_MINIMO_S and abs(variacao) > limite
+        marca = ("⚠️  REGRESSÃO" if variacao > 0 else "🚀") if significativa else ""
+        if significativa and variacao > 0:
+            regressoes.append(nome)
+        print(f"   {nome:<16} {antes * 1000:>10.1f} ms -> {agora * 1000:>10.1f} ms ({variacao:+.1%}) {marca}")
+    for nome, a in atual["acuracia"].items():
+        anterior = base.get("acuracia", {}).get(nome)
+        if anterior and a["acuracia"] < anterior["acuracia"]:
+            regressoes.append(f"acuracia_{nome}")
+            print(f"   ⚠️  acurácia de {nome} caiu: {anterior['acuracia']:.2%} -> {a['acuracia']:.2%}")
+    return bool(regressoes)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta com corpus sintético de BUs")
+    parser.add_argument("--corpus", help="Pasta gerada pelo corpus_sintetico.py (sem ela, gera em memória)")
+    parser.add_argument("--secoes", type=int, default=corpus_sintetico.SECOES_PADRAO)
+    parser.add_argument("--candidatos", type=int, default=corpus_sintetico.CANDIDATOS_PADRAO)
+    parser.add_argument("--partidos", type=int, default=corpus_sintetico.PARTIDOS_PADRAO)
+    parser.add_argument("--ruido", type=float, default=corpus_sintetico.TAXA_RUIDO_PADRAO)
+    parser.add_argument("--semente", type=int, default=corpus_sintetico.SEMENTE_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--repeticoes-pdf", type=int, default=1, help="Repetições da etapa de PDF (a mais lenta)")
+    parser.add_argument("--amostra-ocr", type=int, default=AMOSTRA_OCR, help="PDFs do corpus passados pelo OCR real")
+    parser.add_argument("--cenarios-simulador", type=int, default=CENARIOS_SIMULADOR)
+    parser.add_argument("--compacto", action="store_true", help="PDF no layout compacto")
+    parser.add_argument("--sem-pdf", action="store_true", help="Pula a geração de PDF")
+    parser.add_argument("--saida", default=ARQUIVO_SAIDA)
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar as medianas")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO, help="Piora relativa tolerada por etapa")
+    parser.add_argument("--falhar", action="store_true", help="Sai com código 1 se houver regressão (para CI)")
+    executar(parser.parse_args())
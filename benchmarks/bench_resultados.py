@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import argparse
+from sqlalchemy import text
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import banco
+import main
+
+# --- CONFIGURAÇÕES ---
+# Os dados sintéticos vão para o banco do DATABASE_URL (ver banco.py), marcados com
+# UF_BENCH / ARQUIVO_BENCH, e são apagados no final (a menos que --manter).
+UF_BENCH = "ZZ"
+ARQUIVO_BENCH = "__bench__"
+VOTOS_POR_BOLETIM = 50
+REPETICOES = 5
+
+def semear(total_votos):
+    """Cria boletins/votos sintéticos direto no SQL (generate_series), em segundos mesmo para 10^6 linhas"""
+    boletins = total_votos // VOTOS_POR_BOLETIM
+    with banco.obter_engine().begin() as conn:
+        ja_existe = conn.execute(text("SELECT COUNT(*) FROM boletins WHERE uf = :uf"), {"uf": UF_BENCH}).scalar()
+        if ja_existe >= boletins:
+            print(f"♻️  Reaproveitando {ja_existe} boletins sintéticos já semeados.")
+            return
+        print(f"🌱 Semeando {boletins} boletins x {VOTOS_POR_BOLETIM} votos = {boletins * VOTOS_POR_BOLETIM} votos...")
+        conn.execute(text("""
+            INSERT INTO boletins (arquivo_nome, uf, municipio, zona, secao)
+            SELECT :arquivo, :uf, LPAD((g % 50)::text, 5, '0'), LPAD((g % 7)::text, 4, '0'), LPAD((g % 400)::text, 4, '0')
+            FROM generate_series(1, :n) g
+        """), {"arquivo": ARQUIVO_BENCH, "uf": UF_BENCH, "n": boletins})
+        conn.execute(text("""
+            INSERT INTO candidatos (eleicao, municipio, cargo, numero, nome)
+            SELECT DISTINCT :eleicao, b.municipio,
+                   CASE WHEN c <= 5 THEN 'prefeito' ELSE 'vereador' END,
+                   CASE WHEN c <= 5 THEN 10 + c ELSE 10000 + c END,
+                   'CANDIDATO ' || c
+            FROM boletins b, generate_series(1, :por_boletim) c
+            WHERE b.uf = :uf
+            ON CONFLICT ON CONSTRAINT uq_candidatos_chave DO NOTHING
+        """), {"uf": UF_BENCH, "por_boletim": VOTOS_POR_BOLETIM, "eleicao": main.ELEICAO_PADRAO})
+        main.garantir_particoes(conn, [(main.ELEICAO_PADRAO, f"{m:05d}") for m in range(50)])
+        conn.execute(text("""
+            INSERT INTO votos (eleicao, municipio, boletim_id, cargo, numero, candidato_id, qtd_votos)
+            SELECT ca.eleicao, ca.municipio, b.id, ca.cargo, ca.numero, ca.id, (b.id * c) % 37
+            FROM boletins b
+            CROSS JOIN generate_series(1, :por_boletim) c
+            JOIN candidatos ca ON ca.eleicao = :eleicao AND ca.municipio = b.municipio
+                              AND ca.numero = CASE WHEN c <= 5 THEN 10 + c ELSE 10000 + c END
+            WHERE b.uf = :uf
+        """), {"uf": UF_BENCH, "por_boletim": VOTOS_POR_BOLETIM, "eleicao": main.ELEICAO_PADRAO})
+        conn.execute(text("ANALYZE boletins"))
+        conn.execute(text("ANALYZE votos"))
+
+def limpar():
+    with banco.obter_engine().begin() as conn:
+        conn.execute(text("DELETE FROM votos WHERE boletim_id IN (SELECT id FROM boletins WHERE uf = :uf)"), {"uf": UF_BENCH})
+        conn.execute(text("DELETE FROM boletins WHERE uf = :uf"), {"uf": UF_BENCH})
+    print("🧹 Dados sintéticos removidos.")
+
+def cronometrar(nome, funcao, repeticoes=REPETICOES):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        detalhe = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    print(f"{nome:<45} | mediana {tempos[len(tempos) // 2] * 1000:>9.1f} ms | melhor {tempos[0] * 1000:>9.1f} ms | {detalhe}")
+
+def executar(total_votos, manter):
+    main.preparar_banco()
+    semear(total_votos)
+    # Dentro do "with" o app roda num único event loop (o pool do engine assíncrono fica preso a ele)
+    with TestClient(main.app) as cliente:
+        medir(cliente)
+
+    if not manter:
+        limpar()
+
+def medir(cliente):
+    with banco.obter_engine().connect() as conn:
+        meio = conn.execute(text("SELECT PERCENTILE_DISC(0.5) WITHIN GROUP (ORDER BY id) FROM boletins WHERE uf = :uf"),
+                            {"uf": UF_BENCH}).scalar()
+
+    def pagina(**params):
+        def chamar():
+            r = cliente.get("/resultados", params={"uf": UF_BENCH, **params})
+            r.raise_for_status()
+            corpo = r.json()
+            return f"{len(corpo['itens'])} boletins, {sum(len(b['votos']) for b in corpo['itens'])} votos"
+        return chamar
+
+    def exportacao(formato, **params):
+        def chamar():
+            bytes_lidos = 0
+            with cliente.stream("GET", "/resultados", params={"uf": UF_BENCH, "formato": formato, **params}) as r:
+                for bloco in r.iter_bytes():
+                    bytes_lidos += len(bloco)
+            return f"{bytes_lidos / 1e6:.1f} MB"
+        return chamar
+
+    print("=" * 110)
+    print(f"📊 /resultados com os votos sintéticos da UF {UF_BENCH} ({REPETICOES} repetições)")
+    print("-" * 110)
+    cronometrar("1ª página (100)", pagina())
+    cronometrar("página no meio da base (cursor)", pagina(depois_de=meio))
+    cronometrar("página de 1000", pagina(limite=1000))
+    cronometrar("filtro município+zona", pagina(municipio="00007", zona="0003"))
+    cronometrar("filtro candidato (numero)", pagina(numero=10007))
+    cronometrar("filtro cargo=prefeito, página de 1000", pagina(cargo="prefeito", limite=1000))
+    cronometrar("export CSV de um candidato", exportacao("csv", numero=10007))
+    print("-" * 110)
+
+    cronometrar("export CSV completo (streaming)", exportacao("csv"), repeticoes=1)
+    cronometrar("export NDJSON completo (streaming)", exportacao("ndjson"), repeticoes=1)
+    print("=" * 110)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do endpoint /resultados")
+    parser.add_argument("--votos", type=int, default=1_000_000, help="Total de linhas em votos a semear")
+    parser.add_argument("--manter", action="store_true", help="Não apaga os dados sintéticos no final")
+    args = parser.parse_args()
+    executar(args.votos, args.manter)
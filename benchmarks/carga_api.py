@@ -0,0 +1,102 @@
+import time
+import random
+import asyncio
+import argparse
+import httpx
+
+# --- CONFIGURAÇÕES ---
+# Teste de carga da API já rodando (uvicorn main:app): N clientes lendo /resultados
+# enquanto M clientes enviam boletins. Mede req/s e latências por tipo de requisição.
+URL_PADRAO = "http://localhost:8000"
+DURACAO_PADRAO = 30   # Segundos de carga
+LEITORES_PADRAO = 50
+UPLOADERS_PADRAO = 4
+
+def percentil(tempos, p):
+    if not tempos:
+        return 0.0
+    tempos = sorted(tempos)
+    return tempos[min(len(tempos) - 1, int(len(tempos) * p))]
+
+async def descobrir_filtros(cliente, uf):
+    """Pega alguns municípios/zonas reais da 1ª página para variar as leituras"""
+    r = await cliente.get("/resultados", params={"uf": uf, "limite": 1000} if uf else {"limite": 1000})
+    r.raise_for_status()
+    itens = r.json()["itens"]
+    locais = list({(b["municipio"], b["zona"]) for b in itens})
+    ultimo_id = itens[-1]["id"] if itens else 0
+    return locais, ultimo_id
+
+async def leitor(cliente, fim, uf, locais, ultimo_id, medidas):
+    params_uf = {"uf": uf} if uf else {}
+    while time.perf_counter() < fim:
+        sorteio = random.random()
+        if sorteio < 0.4 or not locais:
+            params, tipo = {**params_uf, "depois_de": random.randint(0, ultimo_id)}, "leitura_pagina"
+        elif sorteio < 0.8:
+            municipio, zona = random.choice(locais)
+            params, tipo = {**params_uf, "municipio": municipio, "zona": zona}, "leitura_local"
+        else:
+            params, tipo = {**params_uf, "cargo": "prefeito", "limite": 500}, "leitura_cargo"
+        await medir(cliente.get("/resultados", params=params), tipo, medidas)
+
+async def uploader(cliente, fim, uf, pdf, medidas):
+    with open(pdf, "rb") as f:
+        conteudo = f.read()
+    while time.perf_counter() < fim:
+        arquivos = {"file": ("carga.pdf", conteudo, "application/pdf")}
+        await medir(cliente.post("/upload-boletim/", params={"uf": uf or "PE"}, files=arquivos), "upload", medidas)
+
+async def medir(requisicao, tipo, medidas):
+    inicio = time.perf_counter()
+    try:
+        r = await requisicao
+        ok = r.status_code < 400
+    except httpx.HTTPError:
+        ok = False
+    tempos, erros = medidas.setdefault(tipo, ([], [0]))
+    if ok:
+        tempos.append(time.perf_counter() - inicio)
+    else:
+        erros[0] += 1
+
+async def executar(url, duracao, leitores, uploaders, pdf, uf):
+    limites = httpx.Limits(max_connections=leitores + uploaders)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limites) as cliente:
+        locais, ultimo_id = await descobrir_filtros(cliente, uf)
+        if uploaders and not pdf:
+            print("⚠️  Sem --pdf: rodando só leituras.")
+            uploaders = 0
+
+        print(f"🚀 {leitores} leitores + {uploaders} uploaders por {duracao}s contra {url}")
+        medidas = {}
+        fim = time.perf_counter() + duracao
+        inicio = time.perf_counter()
+        await asyncio.gather(
+            *[leitor(cliente, fim, uf, locais, ultimo_id, medidas) for _ in range(leitores)],
+            *[uploader(cliente, fim, uf, pdf, medidas) for _ in range(uploaders)],
+        )
+        decorrido = time.perf_counter() - inicio
+
+    print("=" * 100)
+    print(f"{'tipo':<16} | {'ok':>7} | {'erros':>5} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    print("-" * 100)
+    total = 0
+    for tipo, (tempos, erros) in sorted(medidas.items()):
+        total += len(tempos)
+        print(f"{tipo:<16} | {len(tempos):>7} | {erros[0]:>5} | {len(tempos) / decorrido:>8.1f} | "
+              f"{percentil(tempos, 0.50) * 1000:>8.1f} | {percentil(tempos, 0.95) * 1000:>8.1f} | {percentil(tempos, 0.99) * 1000:>8.1f}")
+    print("-" * 100)
+    print(f"{'TOTAL':<16} | {total:>7} | {'':>5} | {total / decorrido:>8.1f}")
+    print("=" * 100)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga: leituras de /resultados com uploads concorrentes")
+    parser.add_argument("--url", default=URL_PADRAO)
+    parser.add_argument("--duracao", type=int, default=DURACAO_PADRAO, help="Segundos de carga")
+    parser.add_argument("--leitores", type=int, default=LEITORES_PADRAO, help="Clientes lendo /resultados")
+    parser.add_argument("--uploaders", type=int, default=UPLOADERS_PADRAO, help="Clientes enviando boletins")
+    parser.add_argument("--pdf", help="PDF de BU usado nos uploads (sem ele, só leituras)")
+    parser.add_argument("--uf", help="Restringe leituras (e uploads) a uma UF, ex.: ZZ dos dados do bench_resultados")
+    args = parser.parse_args()
+    asyncio.run(executar(args.url, args.duracao, args.leitores, args.uploaders, args.pdf, args.uf))
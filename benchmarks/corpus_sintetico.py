@@ -0,0 +1,246 @@
+import os
+import json
+import argparse
+import numpy as np
+
+# --- CONFIGURAÇÕES ---
+# Eleição municipal inventada, com gabarito conhecido, para os benchmarks:
+# o texto de cada BU sai no mesmo formato de linhas que o OCR entrega (com ruído
+# controlado e a confiança de cada linha) e, opcionalmente, como PDF para o OCR real.
+MUNICIPIO = "99999"
+ZONA = "0001"
+LOCAL = "1000"
+SECOES_PADRAO = 200
+CANDIDATOS_PADRAO = 150      # Vereadores
+PARTIDOS_PADRAO = 12
+PREFEITOS_PADRAO = 4
+ELEITORES_POR_SECAO = 350
+COMPARECIMENTO = 0.8
+FRACAO_BRANCOS = 0.02
+FRACAO_NULOS = 0.03
+FRACAO_LEGENDA = 0.05        # Votos de vereador só no partido
+TAXA_RUIDO_PADRAO = 0.05     # Fração das linhas de candidato com algum defeito de OCR
+CONFIANCA_BOA = 95
+CONFIANCA_RUIM = 40          # Confiança das linhas em que o dígito do voto foi trocado
+SEMENTE_PADRAO = 42
+
+PRENOMES = ["JOSE", "MARIA", "ANTONIO", "FRANCISCA", "JOAO", "ANA", "PAULO", "ADRIANA", "CARLOS",
+            "JULIANA", "PEDRO", "MARCIA", "LUCAS", "FERNANDA", "RAIMUNDO", "PATRICIA", "SEVERINO", "ALINE"]
+SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "FERREIRA", "COSTA",
+              "RODRIGUES", "ALMEIDA", "NASCIMENTO", "BARBOSA", "CAVALCANTI", "ARAUJO", "MELO"]
+
+# --- 1. ELEIÇÃO (GABARITO) ---
+def gerar_nome(rng, usados):
+    while True:
+        nome = f"{rng.choice(PRENOMES)} {rng.choice(['DA ', 'DE ', 'DOS ', ''])}{rng.choice(SOBRENOMES)}"
+        if rng.random() < 0.3:
+            nome += f" {rng.choice(SOBRENOMES)}"
+        if nome not in usados:
+            usados.add(nome)
+            return nome
+
+def distribuir_votos(rng, candidatos, secoes, eleitores):
+    """
+    Matriz secoes x candidatos. Cada candidato tem uma força global e um reduto
+    (seção central + largura): o voto é concentrado na geografia, como no dado real,
+    para que a clusterização tenha o que encontrar.
+    """
+    forca = rng.gamma(0.6, 1.0, size=candidatos)
+    centro = rng.integers(0, secoes, size=candidatos)
+    largura = rng.uniform(secoes * 0.02, secoes * 0.3, size=candidatos)
+    posicao = np.arange(secoes)[:, None]
+    pesos = forca * (0.2 + np.exp(-np.abs(posicao - centro) / largura))
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    return np.stack([rng.multinomial(n, p) for n, p in zip(eleitores, pesos)])
+
+def gerar_eleicao(secoes=SECOES_PADRAO, candidatos=CANDIDATOS_PADRAO, partidos=PARTIDOS_PADRAO,
+                  prefeitos=PREFEITOS_PADRAO, semente=SEMENTE_PADRAO):
+    """
+    Gabarito: {'municipio', 'zona', 'partidos': [...], 'candidatos': [{'cargo', 'numero', 'nome', 'partido'}],
+    'secoes': [{'secao', 'aptos', 'comparecimento', 'votos': {cargo: {numero: qtd}}, 'legenda': {partido: qtd},
+    'brancos': {cargo: qtd}, 'nulos': {cargo: qtd}}]}
+    """
+    rng = np.random.default_rng(semente)
+    numeros_partidos = sorted(int(n) for n in rng.choice(np.arange(10, 100), size=partidos, replace=False))
+    usados = set()
+
+    lista = []
+    for numero in numeros_partidos[:prefeitos]:
+        lista.append({"cargo": "prefeito", "numero": numero, "nome": gerar_nome(rng, usados), "partido": numero})
+    sequencia = {p: 0 for p in numeros_partidos}
+    for partido in rng.choice(numeros_partidos, size=candidatos):
+        partido = int(partido)
+        sequencia[partido] += 1
+        lista.append({"cargo": "vereador", "numero": partido * 1000 + sequencia[partido],
+                      "nome": gerar_nome(rng, usados), "partido": partido})
+
+    aptos = rng.integers(int(ELEITORES_POR_SECAO * 0.8), int(ELEITORES_POR_SECAO * 1.2), size=secoes)
+    comparecimento = rng.binomial(aptos, COMPARECIMENTO)
+    brancos = {cargo: rng.binomial(comparecimento, FRACAO_BRANCOS) for cargo in ("prefeito", "vereador")}
+    nulos = {cargo: rng.binomial(comparecimento, FRACAO_NULOS) for cargo in ("prefeito", "vereador")}
+    legenda = rng.binomial(comparecimento, FRACAO_LEGENDA)
+    matrizes = {}
+    for cargo in ("prefeito", "vereador"):
+        do_cargo = [c for c in lista if c["cargo"] == cargo]
+        nominais = comparecimento - brancos[cargo] - nulos[cargo] - (legenda if cargo == "vereador" else 0)
+        matrizes[cargo] = (do_cargo, distribuir_votos(rng, len(do_cargo), secoes, nominais))
+
+    # Legenda da seção dividida entre os partidos na proporção dos nominais de vereador (+1 para todos terem chance)
+    do_vereador, matriz_vereador = matrizes["vereador"]
+    por_partido = np.stack([matriz_vereador[:, [c["partido"] == p for c in do_vereador]].sum(axis=1) + 1
+                            for p in numeros_partidos], axis=1)
+    legenda_partido = np.stack([rng.multinomial(n, p / p.sum()) for n, p in zip(legenda, por_partido)])
+
+    lista_secoes = []
+    for s in range(secoes):
+        votos = {}
+        for cargo, (do_cargo, matriz) in matrizes.items():
+            votos[cargo] = {c["numero"]: int(q) for c, q in zip(do_cargo, matriz[s]) if q > 0}
+        lista_secoes.append({
+            "secao": f"{s + 1:04d}", "aptos": int(aptos[s]), "comparecimento": int(comparecimento[s]), "votos": votos,
+            "legenda": {p: int(q) for p, q in zip(numeros_partidos, legenda_partido[s]) if q > 0},
+            "brancos": {cargo: int(b[s]) for cargo, b in brancos.items()},
+            "nulos": {cargo: int(n[s]) for cargo, n in nulos.items()},
+        })
+
+    return {"municipio": MUNICIPIO, "zona": ZONA, "partidos": numeros_partidos,
+            "candidatos": lista, "secoes": lista_secoes}
+
+# --- 2. TEXTO DO BU (FIXTURE DE OCR) ---
+def linhas_bu(eleicao, secao):
+    """
+    Linhas do BU de uma seção, como o OCR as leria num documento limpo. Vereador vem em blocos
+    por partido (cabeçalho, candidatos, legenda, total do partido); cada cargo fecha com o resumo.
+    """
+    nomes = {(c["cargo"], c["numero"]): c["nome"] for c in eleicao["candidatos"]}
+    linhas = [
+        "BOLETIM DE URNA - ELEICOES MUNICIPAIS",
+        "Municipio Zona Local Secao",
+        f"{eleicao['municipio']} {eleicao['zona']} {LOCAL} {secao['secao']}",
+        f"Eleitores aptos {secao['aptos']}",
+        f"Comparecimento {secao['comparecimento']}",
+    ]
+    for cargo, titulo in (("prefeito", "PREFEITO"), ("vereador", "VEREADOR")):
+        linhas += [titulo, "Partido Candidato Votação"]
+        votos = secao["votos"][cargo]
+        if cargo == "prefeito":
+            linhas += [f"{numero} {nomes[(cargo, numero)]} {qtd}" for numero, qtd in sorted(votos.items())]
+        else:
+            for partido in eleicao["partidos"]:
+                do_partido = sorted((n, q) for n, q in votos.items() if n // 1000 == partido)
+                legenda = secao["legenda"].get(partido, 0)
+                if not do_partido and not legenda:
+                    continue
+                linhas.append(f"Partido {partido}")
+                linhas += [f"{numero} {nomes[(cargo, numero)]} {qtd}" for numero, qtd in do_partido]
+                if legenda:
+                    linhas.append(f"Legenda {legenda}")
+                linhas.append(f"Total do partido {sum(q for _, q in do_partido) + legenda}")
+        linhas.append(f"Votos nominais {sum(votos.values())}")
+        if cargo == "vereador":
+            linhas.append(f"Votos de legenda {sum(secao['legenda'].values())}")
+        linhas += [f"Brancos {secao['brancos'][cargo]}", f"Nulos {secao['nulos'][cargo]}"]
+    return linhas
+
+def aplicar_ruido(linhas, taxa, rng):
+    """
+    Defeitos típicos do OCR nas linhas de candidato, na fração 'taxa' delas:
+    voto empurrado para a linha de baixo, lixo de cabeçalho no meio do nome e dígito
+    do voto trocado (esse com confiança baixa, como o Tesseract reporta).
+    Devolve (linhas, confiancas); só a troca de dígito muda o número lido.
+    """
+    saida, confiancas = [], []
+    for linha in linhas:
+        partes = linha.rsplit(" ", 1)
+        eh_candidato = (linha[:2].isdigit() and len(partes) == 2 and partes[1].isdigit()
+                        and any(c.isalpha() for c in partes[0]))
+        if not eh_candidato or rng.random() >= taxa:
+            saida.append(linha)
+            confiancas.append(CONFIANCA_BOA)
+            continue
+        defeito = rng.choice(["quebra", "lixo", "digito"])
+        if defeito == "quebra":
+            saida += [partes[0], partes[1]]
+            confiancas += [CONFIANCA_BOA, CONFIANCA_BOA]
+        elif defeito == "lixo":
+            saida.append(f"{partes[0]} Votação {partes[1]}")
+            confiancas.append(CONFIANCA_BOA)
+        else:
+            voto = list(partes[1])
+            pos = rng.integers(len(voto))
+            voto[pos] = str((int(voto[pos]) + rng.integers(1, 10)) % 10)
+            saida.append(f"{partes[0]} {''.join(voto).lstrip('0') or '0'}")
+            confiancas.append(CONFIANCA_RUIM)
+    return saida, confiancas
+
+def gerar_fixtures(eleicao, taxa_ruido=TAXA_RUIDO_PADRAO, semente=SEMENTE_PADRAO):
+    """Uma fixture por seção: {'secao', 'linhas', 'confiancas'}"""
+    rng = np.random.default_rng(semente + 1)
+    fixtures = []
+    for secao in eleicao["secoes"]:
+        linhas, confiancas = aplicar_ruido(linhas_bu(eleicao, secao), taxa_ruido, rng)
+        fixtures.append({"secao": secao["secao"], "linhas": linhas, "confiancas": confiancas})
+    return fixtures
+
+# --- 3. PDF DO BU ---
+def gerar_pdf_bu(linhas, caminho):
+    """PDF de uma página (ou mais) com o texto limpo do BU, para alimentar o OCR de verdade"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    largura, altura = A4
+    pdf = canvas.Canvas(caminho, pagesize=A4)
+    y = altura - 50
+    for linha in linhas:
+        if y < 50:
+            pdf.showPage()
+            y = altura - 50
+        pdf.setFont("Courier", 11)
+        pdf.drawString(50, y, linha)
+        y -= 15
+    pdf.save()
+
+# --- 4. GRAVAÇÃO ---
+def salvar_corpus(pasta, eleicao, fixtures, com_pdf=False):
+    """gabarito.json + ocr.jsonl (uma seção por linha) + pdf/BU_<secao>.pdf opcionais"""
+    os.makedirs(pasta, exist_ok=True)
+    with open(os.path.join(pasta, "gabarito.json"), "w", encoding="utf-8") as f:
+        json.dump(eleicao, f, ensure_ascii=False)
+    with open(os.path.join(pasta, "ocr.jsonl"), "w", encoding="utf-8") as f:
+        for fixture in fixtures:
+            f.write(json.dumps(fixture, ensure_ascii=False) + "\n")
+    if com_pdf:
+        pasta_pdf = os.path.join(pasta, "pdf")
+        os.makedirs(pasta_pdf, exist_ok=True)
+        for secao in eleicao["secoes"]:
+            gerar_pdf_bu(linhas_bu(eleicao, secao), os.path.join(pasta_pdf, f"BU_{secao['secao']}.pdf"))
+
+def carregar_corpus(pasta):
+    with open(os.path.join(pasta, "gabarito.json"), encoding="utf-8") as f:
+        eleicao = json.load(f)
+    # JSON só tem chaves texto: volta os números de candidato e de partido para int
+    for secao in eleicao["secoes"]:
+        secao["votos"] = {cargo: {int(n): q for n, q in votos.items()} for cargo, votos in secao["votos"].items()}
+        secao["legenda"] = {int(p): q for p, q in secao["legenda"].items()}
+    with open(os.path.join(pasta, "ocr.jsonl"), encoding="utf-8") as f:
+        fixtures = [json.loads(linha) for linha in f]
+    return eleicao, fixtures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um corpus sintético de BUs com gabarito")
+    parser.add_argument("--pasta", default="corpus_sintetico")
+    parser.add_argument("--secoes", type=int, default=SECOES_PADRAO)
+    parser.add_argument("--candidatos", type=int, default=CANDIDATOS_PADRAO, help="Candidatos a vereador")
+    parser.add_argument("--partidos", type=int, default=PARTIDOS_PADRAO)
+    parser.add_argument("--ruido", type=float, default=TAXA_RUIDO_PADRAO, help="Fração de linhas de candidato com defeito de OCR")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument("--pdf", action="store_true", help="Gera também um PDF por seção (para o OCR real)")
+    args = parser.parse_args()
+
+    eleicao = gerar_eleicao(args.secoes, args.candidatos, args.partidos, semente=args.semente)
+    fixtures = gerar_fixtures(eleicao, args.ruido, args.semente)
+    eleicao["parametros"] = {"ruido": args.ruido, "semente": args.semente}
+    salvar_corpus(args.pasta, eleicao, fixtures, args.pdf)
+    total = sum(s["comparecimento"] for s in eleicao["secoes"])
+    print(f"✅ Corpus em '{args.pasta}': {len(eleicao['secoes'])} seções, {len(eleicao['candidatos'])} candidatos, "
+          f"{len(eleicao['partidos'])} partidos, {total} eleitores votantes" + (" (+ PDFs)" if args.pdf else ""))
@@ -1,8 +1,9 @@
 import pandas as pd
 import math
+import configuracoes
 
 # --- CONFIGURAÇÕES ---
-NUMERO_CADEIRAS = 11  
+NUMERO_CADEIRAS = configuracoes.NUMERO_CADEIRAS
 
 dados_partidos = {
     "10 - Republicanos": 1901,
@@ -0,0 +1,60 @@
+import argparse
+import json
+from sqlalchemy import text
+import banco
+from auditoria import buscar_oficial_tse, MUNICIPIO_TSE, ELEICAO_ID
+from ocr_boletim import partido_do_numero
+
+# Carrega a tabela candidatos com o nome oficial do TSE (JSON da API de Resultados).
+# Os votos já gravados apontam para candidatos por id: trocar o nome aqui corrige
+# todos os relatórios de uma vez, sem tocar na tabela votos.
+
+# --- CONFIGURAÇÕES ---
+CARGOS_TSE = {11: "prefeito", 13: "vereador"}
+
+def ler_arquivo(caminho):
+    """Mesmo formato do buscar_oficial_tse, a partir de um JSON do TSE já baixado"""
+    with open(caminho, encoding="utf-8") as f:
+        data = json.load(f)
+    return {int(c['n']): {'nome': c['nm'], 'votos': int(c['vap']), 'situacao': c['st']}
+            for c in data.get('abr', [{}])[0].get('cand', [])}
+
+def salvar_candidatos(eleicao, municipio, cargo, oficial):
+    """Upsert por (eleicao, municipio, cargo, numero): o nome do TSE substitui o que veio do OCR"""
+    linhas = [{"eleicao": eleicao, "municipio": municipio, "cargo": cargo, "numero": numero,
+               "nome": c['nome'], "situacao": c['situacao'], "partido": partido_do_numero(numero)}
+              for numero, c in oficial.items()]
+    if not linhas:
+        return 0
+    with banco.obter_engine().begin() as conn:
+        conn.execute(text("INSERT INTO partidos (numero) VALUES (:partido) ON CONFLICT DO NOTHING"), linhas)
+        conn.execute(text("""
+            INSERT INTO candidatos (eleicao, municipio, cargo, numero, nome, situacao, partido_numero)
+            VALUES (:eleicao, :municipio, :cargo, :numero, :nome, :situacao, :partido)
+            ON CONFLICT (eleicao, municipio, cargo, numero)
+            DO UPDATE SET nome = EXCLUDED.nome, situacao = EXCLUDED.situacao
+        """), linhas)
+    return len(linhas)
+
+def main():
+    parser = argparse.ArgumentParser(description="Carrega candidatos (nome oficial) do JSON de resultados do TSE")
+    parser.add_argument("--municipio", default=MUNICIPIO_TSE, help="Código do município como gravado em boletins")
+    parser.add_argument("--eleicao", type=int, default=int(ELEICAO_ID))
+    parser.add_argument("--arquivo", nargs=2, action="append", metavar=("CARGO", "JSON"),
+                        help="Usa um JSON já baixado em vez da API (ex.: --arquivo vereador ve.json)")
+    args = parser.parse_args()
+    carregar(args.municipio, args.eleicao, args.arquivo)
+
+def carregar(municipio=MUNICIPIO_TSE, eleicao=int(ELEICAO_ID), arquivos=None):
+    """arquivos: [(cargo, caminho do JSON)] já baixados; sem eles, busca prefeito e vereador na API do TSE"""
+    if arquivos:
+        fontes = [(cargo, lambda caminho=caminho: ler_arquivo(caminho)) for cargo, caminho in arquivos]
+    else:
+        fontes = [(cargo, lambda codigo=codigo: buscar_oficial_tse(codigo, municipio)) for codigo, cargo in CARGOS_TSE.items()]
+
+    for cargo, buscar in fontes:
+        total = salvar_candidatos(eleicao, municipio, cargo, buscar())
+        print(f"✅ {cargo}: {total} candidatos gravados para o município {municipio}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import sys
+import time
+import argparse
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+import banco
+import configuracoes
+import main  # Modelos (no dialeto do destino) e preparar_banco
+
+# Copia a base do servidor (Postgres) para um arquivo local, para rodar relatórios,
+# a calculadora de cadeiras e as análises sem docker:
+#   DATABASE_URL=sqlite:///eleicoes.db python copiar_banco.py
+#   DATABASE_URL=duckdb:///eleicoes.duckdb python copiar_banco.py
+# O destino é sempre o DATABASE_URL; a origem é o Postgres do docker-compose (ou --de).
+
+# --- CONFIGURAÇÕES ---
+LOTE = 100_000                        # Linhas lidas da origem por vez (memória constante)
+TABELAS_AVULSAS = ["resultado_oficial"]  # Criadas por scripts, fora dos modelos do main
+
+def gravar_lote(df, tabela, destino):
+    if banco.DIALETO == "duckdb":
+        # Caminho nativo: o DuckDB lê o DataFrame direto, sem um INSERT por linha
+        with destino.begin() as conn:
+            bruto = conn.connection.driver_connection
+            bruto.register("lote_df", df)
+            bruto.execute(f"INSERT INTO {tabela} ({', '.join(df.columns)}) SELECT * FROM lote_df")
+            bruto.unregister("lote_df")
+    else:
+        df.to_sql(tabela, destino, if_exists="append", index=False, chunksize=10_000)
+
+def avancar_sequencia(destino, tabela):
+    """No DuckDB o id vem de uma sequência (banco.coluna_id): ela precisa passar do maior id copiado"""
+    with destino.begin() as conn:
+        maior = conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}")).scalar()
+        proximo = conn.execute(text(f"SELECT nextval('{tabela}_id_seq')")).scalar()
+        if maior > proximo:
+            # Não há setval no DuckDB: consome os valores que faltam de uma vez só
+            conn.execute(text(f"SELECT MAX(nextval('{tabela}_id_seq')) FROM range({maior - proximo})"))
+
+def copiar_tabela(origem, destino, tabela, colunas):
+    inicio = time.perf_counter()
+    total = 0
+    with origem.connect().execution_options(stream_results=True) as conn:
+        for df in pd.read_sql(f"SELECT {', '.join(colunas)} FROM {tabela}", conn, chunksize=LOTE):
+            gravar_lote(df, tabela, destino)
+            total += len(df)
+            print(f"\r   📦 {tabela}: {total:,} linhas", end="", flush=True)
+    segundos = time.perf_counter() - inicio
+    print(f"\r   ✅ {tabela:<16} {total:>12,} linhas em {segundos:>6.1f}s")
+    return total
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Copia a base do Postgres para o banco embutido do DATABASE_URL")
+    parser.add_argument("--de", default=configuracoes.URL_POSTGRES, help="Base de origem (padrão: Postgres do docker-compose)")
+    args = parser.parse_args()
+
+    if banco.EH_POSTGRES:
+        print("❌ DATABASE_URL aponta para um Postgres. Defina o destino, ex.: DATABASE_URL=sqlite:///eleicoes.db")
+        sys.exit(1)
+
+    main.preparar_banco()  # Cria as tabelas no destino (DATABASE_URL) com os modelos do dialeto dele
+    origem = create_engine(args.de)
+    destino = banco.obter_engine()
+    existentes_origem = set(inspect(origem).get_table_names())
+    print(f"📥 Copiando de {origem.url.render_as_string(hide_password=True)} para {destino.url}")
+
+    # Ordem das chaves estrangeiras (partidos e boletins antes de votos); tabelas já copiadas são esvaziadas
+    with destino.begin() as conn:
+        for tabela in reversed(main.Base.metadata.sorted_tables):
+            conn.execute(tabela.delete())
+    inicio = time.perf_counter()
+    for tabela in main.Base.metadata.sorted_tables:
+        if tabela.name in existentes_origem:
+            copiar_tabela(origem, destino, tabela.name, [c.name for c in tabela.columns])
+            if banco.DIALETO == "duckdb" and "id" in tabela.columns:
+                avancar_sequencia(destino, tabela.name)
+    for tabela in TABELAS_AVULSAS:
+        if tabela in existentes_origem:
+            pd.read_sql(f"SELECT * FROM {tabela}", origem).to_sql(tabela, destino, if_exists="replace", index=False)
+            print(f"   ✅ {tabela}")
+
+    print(f"🚀 Cópia concluída em {time.perf_counter() - inicio:.1f}s. Use DATABASE_URL={destino.url} nos scripts.")
+
+if __name__ == "__main__":
+    main_cli()
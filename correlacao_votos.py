@@ -0,0 +1,221 @@
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sqlalchemy import text, bindparam
+import banco
+import configuracoes
+
+# Correlação entre candidatos pelo desenho do voto nas seções, em lote:
+# para cada município, uma matriz esparsa candidato x seção (fatia do voto do cargo na seção)
+# e as correlações de Pearson de todos contra todos saem de produtos de matrizes:
+#   vereador x vereador, vereador x prefeito (nos dois sentidos) e partido x partido.
+# De cada candidato/partido ficam só os TOP_K parceiros (correlação positiva mais alta:
+# crescem nas mesmas seções, dobradinha) e os TOP_K rivais (mais negativa: um cresce onde
+# o outro encolhe) na tabela correlacoes. Substitui o duelo um-a-um do notebook (AnalisePrefeito).
+
+# --- CONFIGURAÇÕES ---
+TOP_K = 5
+MIN_VOTOS = 20          # Candidato com menos votos no município fica de fora (ruído)
+MIN_SECOES = 5          # Menos seções que isso no município: correlação não quer dizer nada
+CARGOS = ("prefeito", "vereador")
+# tipo: (linhas, colunas); "partido" = votos nominais de vereador somados por partido
+COMPARACOES = {
+    "vereador-vereador": ("vereador", "vereador"),
+    "vereador-prefeito": ("vereador", "prefeito"),
+    "prefeito-vereador": ("prefeito", "vereador"),
+    "partido-partido": ("partido", "partido"),
+}
+
+CONSULTA = text("""
+    SELECT b.zona, b.secao, v.cargo, v.numero, v.partido_numero, SUM(v.qtd_votos) AS qtd
+    FROM votos v
+    JOIN boletins b ON b.id = v.boletim_id
+    WHERE v.eleicao = :eleicao AND v.municipio = :municipio AND v.cargo IN :cargos AND v.qtd_votos > 0
+    GROUP BY b.zona, b.secao, v.cargo, v.numero, v.partido_numero
+""").bindparams(bindparam("cargos", expanding=True))
+
+def listar_municipios(conn, eleicao=None, municipio=None):
+    """(eleicao, municipio) com candidatos cadastrados: barato, não varre votos"""
+    filtro = ""
+    if eleicao is not None:
+        filtro += " AND eleicao = :eleicao"
+    if municipio is not None:
+        filtro += " AND municipio = :municipio"
+    return conn.execute(text(f"""
+        SELECT DISTINCT eleicao, municipio FROM candidatos WHERE municipio IS NOT NULL {filtro} ORDER BY 1, 2
+    """), {"eleicao": eleicao, "municipio": municipio}).all()
+
+# --- MATRIZES ---
+def montar_matrizes(df):
+    """
+    {"vereador": (numeros, X), "prefeito": ..., "partido": ...}: X esparsa (linhas x seções) com a
+    fatia de cada um no total do cargo na seção, para o tamanho da seção não virar correlação.
+    """
+    secoes = pd.Categorical(df["zona"].astype(str) + "-" + df["secao"].astype(str))
+    df = df.assign(col=secoes.codes)
+    n_secoes = len(secoes.categories)
+    matrizes = {}
+    for cargo in CARGOS:
+        parte = df[df["cargo"] == cargo]
+        if cargo == "vereador":
+            por_partido = parte.groupby(["partido_numero", "col"], as_index=False)["qtd"].sum()
+            matrizes["partido"] = fatias(por_partido["partido_numero"], por_partido["col"], por_partido["qtd"], n_secoes)
+        totais = parte.groupby("numero")["qtd"].sum()
+        parte = parte[parte["numero"].isin(totais.index[totais >= MIN_VOTOS])]
+        matrizes[cargo] = fatias(parte["numero"], parte["col"], parte["qtd"], n_secoes)
+    return matrizes, n_secoes
+
+def fatias(chaves, colunas, valores, n_secoes):
+    linhas = pd.Categorical(chaves)
+    X = sparse.csr_matrix((valores.to_numpy(dtype=float), (linhas.codes, colunas.to_numpy())),
+                          shape=(len(linhas.categories), n_secoes))
+    total_secao = np.asarray(X.sum(axis=0)).ravel()
+    total_secao[total_secao == 0] = 1
+    return np.asarray(linhas.categories), X @ sparse.diags(1 / total_secao)
+
+def correlacionar(A, B, n):
+    """
+    Pearson entre cada linha de A e cada linha de B (mesmas n colunas) sem densificar A nem B:
+    cov = A·Bᵀ - somaA·somaBᵀ/n. Devolve (correlações m x p, seções em que os dois tiveram voto).
+    """
+    soma_a = np.asarray(A.sum(axis=1)).ravel()
+    soma_b = np.asarray(B.sum(axis=1)).ravel()
+    var_a = np.asarray(A.multiply(A).sum(axis=1)).ravel() - soma_a ** 2 / n
+    var_b = np.asarray(B.multiply(B).sum(axis=1)).ravel() - soma_b ** 2 / n
+    cov = (A @ B.T).toarray() - np.outer(soma_a, soma_b) / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = cov / np.sqrt(np.outer(var_a, var_b))
+    r[~np.isfinite(r)] = np.nan  # Variância zero (votou igual em toda seção): sem correlação
+    comuns = ((A > 0).astype(np.int32) @ (B > 0).astype(np.int32).T).toarray()
+    return np.clip(r, -1, 1), comuns
+
+def top_k(r, k, mesma_matriz):
+    """Por linha: índices dos k maiores positivos (parceiros) e dos k mais negativos (rivais)"""
+    if mesma_matriz:
+        np.fill_diagonal(r, np.nan)
+    ligacoes = []
+    for relacao, sinal in (("parceiro", 1), ("rival", -1)):
+        valores = np.where(np.isnan(r), -np.inf, sinal * r)
+        k_efetivo = min(k, r.shape[1])
+        if k_efetivo == 0:
+            continue
+        melhores = np.argpartition(-valores, k_efetivo - 1, axis=1)[:, :k_efetivo]
+        for i, colunas in enumerate(melhores):
+            colunas = colunas[np.argsort(-valores[i, colunas])]
+            posicao = 0
+            for j in colunas:
+                if valores[i, j] <= 0:  # Parceiro só com r > 0, rival só com r < 0
+                    break
+                posicao += 1
+                ligacoes.append((i, j, relacao, posicao, float(r[i, j])))
+    return ligacoes
+
+# --- LOTE ---
+def calcular_municipio(conn, eleicao, municipio, k=TOP_K):
+    """Ligações (dicts prontos para a tabela correlacoes) de um município e o nº de seções"""
+    df = pd.read_sql(CONSULTA, conn, params={"eleicao": eleicao, "municipio": municipio, "cargos": list(CARGOS)})
+    return calcular_ligacoes(df, eleicao, municipio, k)
+
+def calcular_ligacoes(df, eleicao, municipio, k=TOP_K):
+    """df no formato de CONSULTA (zona, secao, cargo, numero, partido_numero, qtd); não toca no banco"""
+    if df.empty:
+        return [], 0
+    matrizes, n_secoes = montar_matrizes(df)
+    if n_secoes < MIN_SECOES:
+        return [], n_secoes
+
+    registros = []
+    for tipo, (origem, destino) in COMPARACOES.items():
+        chaves_a, A = matrizes[origem]
+        chaves_b, B = matrizes[destino]
+        if A.shape[0] == 0 or B.shape[0] == 0:
+            continue
+        r, comuns = correlacionar(A, B, n_secoes)
+        for i, j, relacao, posicao, valor in top_k(r, k, origem == destino):
+            registros.append({
+                "eleicao": eleicao, "municipio": municipio, "tipo": tipo,
+                "origem": int(chaves_a[i]), "destino": int(chaves_b[j]),
+                "relacao": relacao, "posicao": posicao, "correlacao": round(valor, 4),
+                "secoes_comuns": int(comuns[i, j]),
+            })
+    return registros, n_secoes
+
+def gravar(conn, eleicao, municipio, registros):
+    """Substitui as ligações do município (na mesma transação do chamador)"""
+    from main import Correlacao
+    conn.execute(text("DELETE FROM correlacoes WHERE eleicao = :eleicao AND municipio = :municipio"),
+                 {"eleicao": eleicao, "municipio": municipio})
+    if registros:
+        conn.execute(Correlacao.__table__.insert(), registros)
+
+def processar(eleicao=None, municipio=None, k=TOP_K):
+    from main import preparar_banco
+    preparar_banco()  # Cria correlacoes em bancos que ainda não têm
+    engine = banco.obter_engine()
+    with engine.connect() as conn:
+        municipios = listar_municipios(conn, eleicao, municipio)
+    if not municipios:
+        print("❌ Nenhum município com candidatos cadastrados para esse filtro.")
+        sys.exit(1)
+
+    print(f"🔗 Correlações de {len(municipios)} município(s), top {k} parceiros e rivais por candidato")
+    inicio = time.perf_counter()
+    total = 0
+    for eleicao_m, municipio_m in municipios:
+        comeco = time.perf_counter()
+        # Um município por transação: uma falha no meio não deixa o município sem ligações
+        with engine.begin() as conn:
+            registros, n_secoes = calcular_municipio(conn, eleicao_m, municipio_m, k)
+            gravar(conn, eleicao_m, municipio_m, registros)
+        total += len(registros)
+        print(f"   ✅ {eleicao_m}/{municipio_m}: {n_secoes:>6,} seções, {len(registros):>6,} ligações "
+              f"em {time.perf_counter() - comeco:.2f}s")
+    segundos = time.perf_counter() - inicio
+    print(f"🏁 {total:,} ligações em {segundos:.1f}s ({len(municipios) / max(segundos, 1e-9):.1f} municípios/s)")
+
+def consultar(municipio, cargo, numero, eleicao=None):
+    """Parceiros e rivais já gravados de um candidato (cargo 'partido' para partidos), com nomes"""
+    eleicao = eleicao or configuracoes.ELEICAO_PADRAO
+    query = text("""
+        SELECT x.tipo, x.relacao, x.posicao, x.destino, c.nome, x.correlacao, x.secoes_comuns
+        FROM correlacoes x
+        LEFT JOIN candidatos c
+          ON c.eleicao = x.eleicao AND c.municipio = x.municipio AND c.numero = x.destino
+         AND c.cargo = CASE WHEN x.tipo LIKE '%-prefeito' THEN 'prefeito'
+                            WHEN x.tipo LIKE '%-vereador' THEN 'vereador' END
+        WHERE x.eleicao = :eleicao AND x.municipio = :municipio AND x.origem = :numero AND x.tipo LIKE :tipo
+        ORDER BY x.tipo, x.relacao, x.posicao
+    """)
+    return pd.read_sql(query, banco.obter_engine(),
+                       params={"eleicao": eleicao, "municipio": municipio, "numero": numero, "tipo": f"{cargo}-%"})
+
+def main():
+    parser = argparse.ArgumentParser(description="Correlação de votos por seção entre candidatos e partidos, em lote")
+    parser.add_argument("--municipio", help="Só este município (padrão: todos com candidatos)")
+    parser.add_argument("--eleicao", type=int)
+    parser.add_argument("--top", type=int, default=TOP_K, help="Parceiros e rivais guardados por candidato")
+    parser.add_argument("--mostrar", metavar="CARGO:NUMERO",
+                        help="Não recalcula: mostra as ligações gravadas (ex.: prefeito:10, partido:45); exige --municipio")
+    args = parser.parse_args()
+
+    if args.mostrar:
+        if not args.municipio:
+            parser.error("--mostrar exige --municipio")
+        cargo, numero = args.mostrar.split(":")
+        df = consultar(args.municipio, cargo, int(numero), args.eleicao)
+        if df.empty:
+            print("⚠️  Nenhuma ligação gravada para esse candidato (rode sem --mostrar antes).")
+            return
+        for (tipo, relacao), grupo in df.groupby(["tipo", "relacao"], sort=False):
+            print(f"\n{'🤝' if relacao == 'parceiro' else '⚔️ '} {tipo} - {relacao}s")
+            for l in grupo.itertuples():
+                print(f"   {l.posicao}. {l.destino:<6} {l.nome or '':<30} r={l.correlacao:+.2f} ({l.secoes_comuns} seções em comum)")
+        return
+
+    processar(args.eleicao, args.municipio, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scipy import sparse
+from sqlalchemy import text
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+import banco
+import configuracoes
+import correlacao_votos
+from motor_relatorios import criar_documento, criar_estilos, limpar_nome_arquivo
+
+# Dossiê estratégico de cada candidato (a classe AnaliseCandidato do notebook, em lote):
+# o município é lido do banco uma vez só, em consultas parametrizadas, e as métricas de
+# todos os candidatos saem vetorizadas (Gini, dominância no partido, redutos, correlação
+# com os prefeitos). Os PDFs são renderizados em paralelo, em lotes por processo; o
+# gráfico de redutos é desenhado pelo próprio ReportLab (sem matplotlib).
+
+# --- CONFIGURAÇÕES ---
+PASTA_DOSSIES = "dossies"
+CARGOS = ("vereador", "prefeito")
+TOP_REDUTOS = 10
+TOP_DOMINANCIA = 5
+MIN_VOTOS_PARTIDO = 5     # Seção com menos votos do partido que isso não entra na dominância
+TAMANHO_LOTE = 20         # Dossiês por tarefa do pool
+# Gini acima do limite -> perfil (o primeiro que servir)
+PERFIS_GINI = [
+    (0.85, "CACIQUE DE BAIRRO (Alta Concentração)"),
+    (0.60, "FORÇA REGIONAL (Voto Misto)"),
+    (-1.0, "VOTO DE OPINIÃO (Pulverizado)"),
+]
+
+CONSULTA_SECOES = text("""
+    SELECT DISTINCT zona, secao FROM boletins WHERE municipio = :municipio
+""")
+CONSULTA_CANDIDATOS = text("""
+    SELECT c.cargo, c.numero, c.nome, c.partido_numero, p.sigla
+    FROM candidatos c
+    LEFT JOIN partidos p ON p.numero = c.partido_numero
+    WHERE c.eleicao = :eleicao AND c.municipio = :municipio
+""")
+
+# --- 1. CARGA ÚNICA DO MUNICÍPIO ---
+def rotulo_secao(zona, secao):
+    return zona.astype(str) + "/" + secao.astype(str)
+
+def carregar_base(eleicao, municipio):
+    """Três consultas por município: seções (lista mestra, com as zeradas), votos por seção e candidatos"""
+    params = {"eleicao": eleicao, "municipio": municipio, "cargos": list(CARGOS)}
+    with banco.obter_engine().connect() as conn:
+        secoes = pd.read_sql(CONSULTA_SECOES, conn, params=params)
+        votos = pd.read_sql(correlacao_votos.CONSULTA, conn, params=params)
+        candidatos = pd.read_sql(CONSULTA_CANDIDATOS, conn, params=params)
+    votos["secao_rotulo"] = rotulo_secao(votos["zona"], votos["secao"])
+    return {"eleicao": eleicao, "municipio": municipio, "n_secoes": len(secoes),
+            "votos": votos, "candidatos": candidatos}
+
+# --- 2. MÉTRICAS (TODOS OS CANDIDATOS DE UMA VEZ) ---
+CHAVE = ["cargo", "numero"]
+
+def calcular_gini(votos, n_secoes):
+    """
+    Gini do voto pelas seções do município, zeros incluídos, sem montar a matriz densa:
+    ordenado crescente, as n - k seções zeradas ocupam as primeiras posições e só as k com
+    voto contribuem com (2i - n - 1) * votos.
+    """
+    df = votos.sort_values(CHAVE + ["qtd"])
+    grupos = df.groupby(CHAVE)
+    com_voto = grupos["qtd"].transform("size")
+    posicao = (n_secoes - com_voto) + grupos.cumcount() + 1
+    termo = (2 * posicao - n_secoes - 1) * df["qtd"]
+    total = grupos["qtd"].sum()
+    return (termo.groupby([df["cargo"], df["numero"]]).sum() / (n_secoes * total)).rename("gini")
+
+def classificar_perfil(gini):
+    return next(perfil for limite, perfil in PERFIS_GINI if gini > limite)
+
+def calcular_resumo(votos):
+    grupos = votos.groupby(CHAVE)["qtd"]
+    return pd.DataFrame({"total": grupos.sum(), "secoes_com_voto": grupos.size(), "media": grupos.mean()})
+
+def calcular_redutos(votos, top=TOP_REDUTOS):
+    """{(cargo, numero): [(seção, votos), ...]} com as 'top' seções mais fortes"""
+    melhores = votos.sort_values(CHAVE + ["qtd"], ascending=[True, True, False]).groupby(CHAVE).head(top)
+    return {chave: list(zip(g["secao_rotulo"], g["qtd"].astype(int))) for chave, g in melhores.groupby(CHAVE)}
+
+def calcular_dominancia(votos, top=TOP_DOMINANCIA):
+    """
+    Fatia do candidato no voto nominal do próprio partido, seção a seção (partido_numero, não
+    o prefixo do número). {(cargo, numero): [(seção, votos, total do partido, %), ...]}
+    """
+    total_partido = votos.groupby(["cargo", "partido_numero", "secao_rotulo"])["qtd"].transform("sum")
+    df = votos.assign(total_partido=total_partido, share=(100 * votos["qtd"] / total_partido).round(1))
+    df = df[df["total_partido"] > MIN_VOTOS_PARTIDO]
+    melhores = df.sort_values(CHAVE + ["share", "qtd"], ascending=[True, True, False, False]).groupby(CHAVE).head(top)
+    return {chave: list(zip(g["secao_rotulo"], g["qtd"].astype(int), g["total_partido"].astype(int), g["share"]))
+            for chave, g in melhores.groupby(CHAVE)}
+
+def calcular_correlacao_prefeitos(votos):
+    """
+    Correlação de cada candidato (vereadores e prefeitos) com cada prefeito, pela fatia do voto
+    nas seções: um produto de matrizes esparsas (correlacao_votos.correlacionar) para todos.
+    {(cargo, numero): [(numero do prefeito, r), ...]} do mais alinhado ao mais oposto.
+    """
+    matrizes, n_secoes = correlacao_votos.montar_matrizes(votos)
+    numeros_p, P = matrizes["prefeito"]
+    if P.shape[0] == 0:
+        return {}
+    linhas = [(cargo, numero) for cargo in ("vereador", "prefeito") for numero in matrizes[cargo][0]]
+    A = sparse.vstack([matrizes["vereador"][1], P]).tocsr()
+    r, _ = correlacao_votos.correlacionar(A, P, n_secoes)
+    resultado = {}
+    for (cargo, numero), valores in zip(linhas, r):
+        pares = [(int(p), float(v)) for p, v in zip(numeros_p, valores)
+                 if not np.isnan(v) and not (cargo == "prefeito" and p == numero)]
+        resultado[(cargo, int(numero))] = sorted(pares, key=lambda par: -par[1])
+    return resultado
+
+def montar_dossies(base, cargos=CARGOS, numeros=None):
+    """Lista de dicts (um por candidato com voto) só com tipos simples: vai barato para os processos"""
+    votos = base["votos"]
+    if votos.empty:
+        return []
+    resumo = calcular_resumo(votos).join(calcular_gini(votos, base["n_secoes"]))
+    redutos = calcular_redutos(votos)
+    dominancia = calcular_dominancia(votos)
+    correlacoes = calcular_correlacao_prefeitos(votos)
+    cadastro = base["candidatos"].set_index(CHAVE)
+    nomes_prefeitos = {int(n): nome for (c, n), nome in cadastro["nome"].items() if c == "prefeito"}
+
+    dossies = []
+    for (cargo, numero), linha in resumo.iterrows():
+        if cargo not in cargos or (numeros and numero not in numeros):
+            continue
+        info = cadastro.loc[(cargo, numero)] if (cargo, numero) in cadastro.index else None
+        partido = int(info["partido_numero"]) if info is not None and pd.notna(info["partido_numero"]) else None
+        dossies.append({
+            "eleicao": base["eleicao"], "municipio": base["municipio"], "n_secoes": base["n_secoes"],
+            "cargo": cargo, "numero": int(numero),
+            "nome": info["nome"] if info is not None and info["nome"] else f"CANDIDATO {numero}",
+            "partido": partido,
+            "sigla": info["sigla"] if info is not None and isinstance(info["sigla"], str) else None,
+            "total": int(linha["total"]), "secoes_com_voto": int(linha["secoes_com_voto"]),
+            "media": float(linha["media"]), "gini": float(linha["gini"]),
+            "perfil": classificar_perfil(linha["gini"]),
+            "redutos": redutos.get((cargo, numero), []),
+            "dominancia": dominancia.get((cargo, numero), []),
+            "prefeitos": [(p, nomes_prefeitos.get(p, str(p)), r) for p, r in correlacoes.get((cargo, int(numero)), [])],
+        })
+    return sorted(dossies, key=lambda d: (d["cargo"], -d["total"]))
+
+# --- 3. PDF ---
+def criar_estilos_dossie():
+    estilos = criar_estilos()
+    estilos["secao"] = ParagraphStyle("SecaoDossie", parent=estilos["normal"], fontName="Helvetica-Bold",
+                                      fontSize=13, textColor=colors.navy, spaceBefore=8, spaceAfter=4)
+    estilos["caixa"] = ParagraphStyle("Caixa", parent=estilos["normal"], backColor=colors.whitesmoke,
+                                      borderColor=colors.black, borderWidth=0.5, borderPadding=6,
+                                      spaceBefore=6, spaceAfter=6, leading=14)
+    return estilos
+
+def grafico_redutos(redutos):
+    """Barras horizontais das seções mais fortes (a maior em cima)"""
+    desenho = Drawing(170 * mm, 75 * mm)
+    grafico = HorizontalBarChart()
+    grafico.x, grafico.y = 25 * mm, 5 * mm
+    grafico.width, grafico.height = 140 * mm, 65 * mm
+    grafico.data = [[votos for _, votos in reversed(redutos)]]
+    grafico.categoryAxis.categoryNames = [secao for secao, _ in reversed(redutos)]
+    grafico.categoryAxis.labels.fontSize = 7
+    grafico.valueAxis.valueMin = 0
+    grafico.valueAxis.labels.fontSize = 7
+    grafico.bars[0].fillColor = colors.HexColor("#003366")
+    grafico.barLabelFormat = "%d"
+    grafico.barLabels.fontSize = 6
+    grafico.barLabels.boxAnchor = "w"
+    grafico.barLabels.dx = 2
+    desenho.add(grafico)
+    return desenho
+
+def tabela(linhas, larguras):
+    t = Table(linhas, colWidths=larguras)
+    t.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.navy),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.whitesmoke]),
+    ]))
+    return t
+
+def elementos_dossie(d, estilos):
+    partido = f"{d['sigla']} ({d['partido']})" if d["sigla"] else (d["partido"] or "não informado")
+    elementos = [
+        Paragraph(f"DOSSIÊ ESTRATÉGICO: {d['nome']}", estilos["titulo"]),
+        Paragraph(f"Número {d['numero']} | {d['cargo'].upper()} | Partido {partido} | Município {d['municipio']} | "
+                  f"{datetime.now().strftime('%d/%m/%Y')}", estilos["subtitulo"]),
+        Spacer(1, 6 * mm),
+        Paragraph("1. Resumo de Desempenho", estilos["secao"]),
+    ]
+    melhor = d["redutos"][0] if d["redutos"] else ("-", 0)
+    elementos.append(Paragraph(
+        f"Total de <b>{d['total']} votos</b>, em {d['secoes_com_voto']} de {d['n_secoes']} seções "
+        f"(média de {d['media']:.1f} votos nas seções com voto). Melhor desempenho: seção {melhor[0]}, "
+        f"com {melhor[1]} votos.", estilos["normal"]))
+    if d["redutos"]:
+        elementos.append(grafico_redutos(d["redutos"]))
+
+    elementos.append(Paragraph("2. Perfil Geográfico (Coeficiente de Gini)", estilos["secao"]))
+    interpretacao = ("Votos muito concentrados em poucos locais: dependente de redutos." if d["gini"] > 0.7 else
+                     "Votos espalhados pela cidade: perfil de opinião ou de grupos difusos.")
+    elementos.append(Paragraph(f"<b>Índice Gini: {d['gini']:.3f}</b><br/><b>Classificação: {d['perfil']}</b><br/>"
+                               f"{interpretacao}", estilos["caixa"]))
+
+    elementos.append(Paragraph("3. Dominância Partidária (Canibalização)", estilos["secao"]))
+    if d["dominancia"]:
+        linhas = [["Seção", "Votos", "Votos do partido", "Fatia"]]
+        linhas += [[s, v, t, f"{share:.1f}%"] for s, v, t, share in d["dominancia"]]
+        elementos.append(tabela(linhas, [30 * mm, 25 * mm, 35 * mm, 25 * mm]))
+    else:
+        elementos.append(Paragraph(f"Nenhuma seção com mais de {MIN_VOTOS_PARTIDO} votos do partido.", estilos["normal"]))
+
+    elementos.append(Paragraph("4. Dobradinhas (Correlação com Prefeitos)", estilos["secao"]))
+    if d["prefeitos"]:
+        linhas = [["Prefeito", "Número", "Correlação"]]
+        linhas += [[nome, numero, f"{r:+.2f}"] for numero, nome, r in d["prefeitos"]]
+        elementos.append(tabela(linhas, [80 * mm, 25 * mm, 30 * mm]))
+        numero, nome, r = d["prefeitos"][0]
+        if r > 0:
+            elementos.append(Paragraph(f"Voto mais alinhado com <b>{nome}</b> ({numero}): cresce nas mesmas seções.",
+                                       estilos["normal"]))
+    else:
+        elementos.append(Paragraph("Sem votos de prefeito suficientes para correlacionar.", estilos["normal"]))
+    return elementos
+
+def caminho_dossie(pasta, d):
+    return os.path.join(pasta, f"DOSSIE_{limpar_nome_arquivo(d['nome'])}_{d['numero']}.pdf")
+
+def renderizar_lote(dossies, pasta):
+    """Roda num processo do pool: um PDF por dossiê do lote. Devolve [(caminho, erro ou None)]"""
+    estilos = criar_estilos_dossie()
+    resultado = []
+    for d in dossies:
+        destino = caminho_dossie(pasta, d)
+        try:
+            temporario = destino + ".tmp"
+            criar_documento(temporario).build(elementos_dossie(d, estilos))
+            os.replace(temporario, destino)
+            resultado.append((destino, None))
+        except Exception as e:
+            resultado.append((destino, str(e)))
+    return resultado
+
+# --- 4. ORQUESTRAÇÃO ---
+def gerar_dossies(municipio=configuracoes.MUNICIPIO_TSE, eleicao=configuracoes.ELEICAO_PADRAO, cargos=CARGOS,
+                  numeros=None, workers=None, pasta=PASTA_DOSSIES, tamanho_lote=TAMANHO_LOTE):
+    inicio = time.perf_counter()
+    print(f"📥 Carregando o município {municipio} (eleição {eleicao})...")
+    base = carregar_base(eleicao, municipio)
+    dossies = montar_dossies(base, cargos, set(numeros) if numeros else None)
+    if not dossies:
+        print("❌ Nenhum candidato com voto para esse filtro.")
+        sys.exit(1)
+    carga = time.perf_counter() - inicio
+    print(f"🧮 Métricas de {len(dossies)} candidatos em {carga:.2f}s ({base['n_secoes']} seções)")
+
+    os.makedirs(pasta, exist_ok=True)
+    lotes = [dossies[i:i + tamanho_lote] for i in range(0, len(dossies), tamanho_lote)]
+    feitos, falhas = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futuros = [executor.submit(renderizar_lote, lote, pasta) for lote in lotes]
+        for futuro in as_completed(futuros):
+            for destino, erro in futuro.result():
+                feitos += 1
+                if erro:
+                    falhas.append(destino)
+                    print(f"[{feitos}/{len(dossies)}] ❌ {destino}: {erro}")
+            print(f"[{feitos}/{len(dossies)}] ✅ lote concluído", flush=True)
+
+    segundos = time.perf_counter() - inicio
+    print("-" * 50)
+    print(f"🏁 {len(dossies) - len(falhas)} dossiês em '{pasta}' em {segundos:.1f}s "
+          f"({len(dossies) / max(segundos, 1e-9):.1f} dossiês/s)")
+    if falhas:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dossiê estratégico em PDF de todos os candidatos de um município")
+    parser.add_argument("--municipio", default=configuracoes.MUNICIPIO_TSE)
+    parser.add_argument("--eleicao", type=int, default=configuracoes.ELEICAO_PADRAO)
+    parser.add_argument("--cargos", nargs="+", choices=CARGOS, default=list(CARGOS))
+    parser.add_argument("--numeros", nargs="+", type=int, help="Só estes candidatos")
+    parser.add_argument("--workers", type=int, default=None, help="Processos renderizando PDFs")
+    parser.add_argument("--pasta", default=PASTA_DOSSIES)
+    args = parser.parse_args()
+    gerar_dossies(args.municipio, args.eleicao, args.cargos, args.numeros, args.workers, args.pasta)
@@ -0,0 +1,56 @@
+import sys
+import runpy
+import argparse
+import subprocess
+
+# Ponto de entrada único: 'python eleicoes.py <comando> [opções do comando]'.
+# Cada comando repassa as opções para o script de sempre (que continua rodando sozinho);
+# 'python eleicoes.py <comando> --help' mostra a ajuda do próprio script.
+
+# --- CONFIGURAÇÕES ---
+# comando: (módulo, descrição)
+COMANDOS = {
+    "pipeline": ("pipeline", "Fluxo completo de um município, pulando as etapas em dia"),
+    "ingestao": ("automacao", "Envia os PDFs de BU da pasta de origem para a API"),
+    "vigia": ("vigia_urnas", "Vigia a pasta de PDFs e envia os que chegarem"),
+    "importar-tse": ("importar_tse_csv", "Importa o boletim de urna em CSV do TSE (Postgres)"),
+    "copiar-banco": ("copiar_banco", "Copia o banco para outro backend (SQLite/DuckDB)"),
+    "locais": ("locais_votacao", "Carrega os locais de votação do TSE e gera os mapas (GeoJSON)"),
+    "candidatos": ("carregar_candidatos", "Carrega candidatos e situação a partir do TSE"),
+    "sincronizar": ("sincronizar_tse_bd", "Baixa o resultado oficial do TSE para o banco"),
+    "auditoria": ("auditoria", "Compara o banco com o resultado oficial do TSE"),
+    "eleitos": ("revelar_eleitos", "Lista os vereadores eleitos (QE, QP e sobras)"),
+    "simulador": ("simulador_cadeiras", "Simula cenários de distribuição de cadeiras"),
+    "clusterizacao": ("clusterização_de_rivais", "Agrupa candidatos por perfil geográfico de voto"),
+    "relatorios": ("motor_relatorios", "Gera os PDFs de relatório"),
+    "correlacao": ("correlacao_votos", "Parceiros e rivais de cada candidato pelo voto nas seções"),
+    "dossies": ("dossie_candidatos", "Dossiê estratégico em PDF de cada candidato"),
+}
+# comando: argumentos de 'python -m ...' (servidores que não são scripts comuns)
+SERVICOS = {
+    "api": (["uvicorn", "main:app"], "Sobe a API de upload (uvicorn)"),
+    "dashboard": (["streamlit", "run", "dashboard.py"], "Abre o painel (streamlit)"),
+}
+
+def rodar_modulo(modulo, argumentos):
+    """Roda o módulo como se fosse 'python modulo.py argumentos'"""
+    sys.argv = [f"{modulo}.py", *argumentos]
+    runpy.run_module(modulo, run_name="__main__", alter_sys=True)
+
+def rodar_servico(argumentos_modulo, argumentos):
+    return subprocess.call([sys.executable, "-m", *argumentos_modulo, *argumentos])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="eleicoes.py", description="Processamento dos boletins de urna")
+    subparsers = parser.add_subparsers(dest="comando", required=True, metavar="comando")
+    for nome, (_, descricao) in {**COMANDOS, **SERVICOS}.items():
+        # add_help=False: o --help vai para o script do comando
+        subparsers.add_parser(nome, help=descricao, description=descricao, add_help=False)
+    args, resto = parser.parse_known_args(argv)
+
+    if args.comando in SERVICOS:
+        sys.exit(rodar_servico(SERVICOS[args.comando][0], resto))
+    rodar_modulo(COMANDOS[args.comando][0], resto)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import json
+import time
+import select
+import asyncio
+import logging
+import threading
+from collections import deque
+from sqlalchemy import text
+import banco
+
+# --- CONFIGURAÇÕES ---
+CANAL = "ingestao"          # Canal do LISTEN/NOTIFY do Postgres
+LIMITE_PAYLOAD = 7900       # O NOTIFY aceita até 8000 bytes; acima disso o evento vai sem os votos
+TAMANHO_FILA_CLIENTE = 1000 # Eventos pendentes por cliente SSE antes de mandar ressincronizar
+TAMANHO_HISTORICO = 10000   # Eventos guardados pelo ouvinte do dashboard
+ESPERA_MAXIMA_RECONEXAO = 30  # Teto (segundos) da espera exponencial para reabrir o LISTEN
+RESSINCRONIZAR = {"tipo": "ressincronizar"}
+
+logger = logging.getLogger(__name__)
+
+# Eventos de ingestão: cada boletim gravado gera um delta da sua seção
+# {"boletim_id", "uf", "municipio", "zona", "secao", "votos": [[cargo, numero, nome, qtd], ...]}
+# Se o delta não couber no NOTIFY, vai com "votos": null e quem consome relê a seção.
+# Se a conexão LISTEN cai (Postgres reiniciou, rede), os ouvintes reconectam sozinhos e
+# publicam {"tipo": "ressincronizar"}: o que foi notificado no intervalo se perdeu, então
+# quem consome relê o estado em vez de somar deltas por cima do buraco.
+# Nos bancos embutidos (SQLite/DuckDB) não há LISTEN/NOTIFY: nada é publicado e o modo
+# ao vivo fica desligado; o dashboard segue atualizando pela versão da ingestão.
+
+def montar_evento(boletim, votos):
+    evento = {
+        "boletim_id": boletim.id,
+        "uf": boletim.uf,
+        "municipio": boletim.municipio,
+        "zona": boletim.zona,
+        "secao": boletim.secao,
+        "votos": [[v['cargo'], v['numero'], v['nome'], v['qtd']] for v in votos],
+    }
+    payload = json.dumps(evento, ensure_ascii=False)
+    if len(payload.encode()) > LIMITE_PAYLOAD:
+        evento["votos"] = None
+        payload = json.dumps(evento, ensure_ascii=False)
+    return payload
+
+async def notificar(db, payload):
+    """
+    Publica o evento na mesma transação do boletim (sessão assíncrona da API): o Postgres
+    só entrega o NOTIFY no commit, então ninguém recebe delta de gravação desfeita.
+    """
+    if banco.EH_POSTGRES:
+        await db.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": CANAL, "payload": payload})
+
+def evento_no_recorte(evento, filtro):
+    """filtro = ((nivel, valor), ...) no mesmo formato do dashboard"""
+    return all(evento.get(nivel) == valor for nivel, valor in filtro)
+
+def erros_conexao():
+    """Falhas que derrubam a conexão LISTEN (tratadas com reconexão)"""
+    import psycopg2
+    return (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+def conectar_ouvinte(engine):
+    """Conexão dedicada (fora do pool) em autocommit, já escutando o canal"""
+    import psycopg2  # Só o Postgres tem LISTEN: SQLite/DuckDB rodam sem o driver instalado
+    import psycopg2.extensions
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    # Keepalive do TCP: uma conexão morta sem aviso (rede caiu) também vira erro em poucos minutos
+    conn = psycopg2.connect(dsn, keepalives=1, keepalives_idle=60, keepalives_interval=10, keepalives_count=3)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {CANAL}")
+    return conn
+
+# --- LADO API (asyncio): um LISTEN por processo, repassado a N clientes SSE ---
+
+class CentralEventos:
+    """Distribui cada evento recebido do Postgres para as filas dos clientes conectados"""
+
+    def __init__(self):
+        self.filas = set()
+
+    def inscrever(self):
+        fila = asyncio.Queue(maxsize=TAMANHO_FILA_CLIENTE)
+        self.filas.add(fila)
+        return fila
+
+    def cancelar(self, fila):
+        self.filas.discard(fila)
+
+    def publicar(self, evento):
+        for fila in list(self.filas):
+            try:
+                fila.put_nowait(evento)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta o atraso e pede para ele reler o estado
+                while not fila.empty():
+                    fila.get_nowait()
+                fila.put_nowait({"tipo": "ressincronizar"})
+
+def fechar_sem_erro(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+class EscutaAssincrona:
+    """
+    Conexão LISTEN registrada no event loop da API. Se ela cai, sai do loop, é reaberta
+    em segundo plano com espera exponencial e os clientes recebem um ressincronizar.
+    """
+
+    def __init__(self, engine, central):
+        self.engine = engine
+        self.central = central
+        self.loop = asyncio.get_running_loop()
+        self.conn = None
+        self.reconexao = None
+        self.ligar(conectar_ouvinte(engine))
+
+    def ligar(self, conn):
+        self.conn = conn
+        self.descritor = conn.fileno()  # Guardado: depois que a conexão cai o fileno() não serve mais
+        self.loop.add_reader(self.descritor, self.ao_receber)
+
+    def ao_receber(self):
+        try:
+            self.conn.poll()
+        except erros_conexao() as e:
+            logger.warning("Conexão LISTEN caiu (%s); reconectando", e)
+            self.desligar()
+            self.reconexao = self.loop.create_task(self.reconectar())
+            return
+        while self.conn.notifies:
+            notificacao = self.conn.notifies.pop(0)
+            self.central.publicar(json.loads(notificacao.payload))
+
+    def desligar(self):
+        self.loop.remove_reader(self.descritor)
+        fechar_sem_erro(self.conn)
+        self.conn = None
+
+    async def reconectar(self):
+        espera = 1
+        while True:
+            await asyncio.sleep(espera)
+            try:
+                conn = await asyncio.to_thread(conectar_ouvinte, self.engine)
+            except erros_conexao() as e:
+                espera = min(espera * 2, ESPERA_MAXIMA_RECONEXAO)
+                logger.warning("LISTEN ainda sem conexão (%s); nova tentativa em %ss", e, espera)
+                continue
+            self.ligar(conn)
+            logger.info("Conexão LISTEN restabelecida")
+            self.central.publicar(RESSINCRONIZAR)
+            return
+
+    def parar(self):
+        if self.reconexao is not None:
+            self.reconexao.cancel()
+        if self.conn is not None:
+            self.desligar()
+
+def iniciar_escuta(engine, central):
+    """Começa a escutar no event loop atual; devolve a escuta para parar no shutdown (None sem Postgres)"""
+    if not banco.EH_POSTGRES:
+        return None
+    return EscutaAssincrona(engine, central)
+
+def parar_escuta(escuta):
+    if escuta is not None:
+        escuta.parar()
+
+# --- LADO DASHBOARD (threads): um ouvinte por processo do Streamlit ---
+
+class OuvinteIngestao:
+    """
+    Thread que escuta o canal e guarda os últimos eventos numerados.
+    Cada sessão do dashboard lembra o último número que aplicou e pede só o que veio depois,
+    então centenas de abas compartilham uma única conexão LISTEN.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.eventos = deque(maxlen=TAMANHO_HISTORICO)
+        self.sequencia = 0
+        self.trava = threading.Lock()
+        if banco.EH_POSTGRES:
+            threading.Thread(target=self._escutar, daemon=True).start()
+
+    def _escutar(self):
+        conn = None
+        espera = 1
+        perdeu = False  # Houve intervalo sem LISTEN: o primeiro evento depois dele é um ressincronizar
+        while True:
+            try:
+                if conn is None:
+                    conn = conectar_ouvinte(self.engine)
+                    espera = 1
+                    if perdeu:
+                        logger.info("Conexão LISTEN do dashboard restabelecida")
+                        self._guardar(RESSINCRONIZAR)
+                        perdeu = False
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._guardar(json.loads(conn.notifies.pop(0).payload))
+            except erros_conexao() as e:
+                logger.warning("Conexão LISTEN do dashboard caiu (%s); nova tentativa em %ss", e, espera)
+                if conn is not None:
+                    fechar_sem_erro(conn)
+                conn = None
+                perdeu = True
+                time.sleep(espera)
+                espera = min(espera * 2, ESPERA_MAXIMA_RECONEXAO)
+
+    def _guardar(self, evento):
+        with self.trava:
+            self.sequencia += 1
+            self.eventos.append((self.sequencia, evento))
+
+    def desde(self, sequencia):
+        """
+        Eventos com número maior que 'sequencia' e o número do último deles.
+        Devolve None no lugar da lista se parte deles já saiu do histórico (quem chamou deve reler o estado).
+        """
+        with self.trava:
+            if self.eventos and sequencia < self.eventos[0][0] - 1:
+                return None, self.sequencia
+            novos = [(n, e) for n, e in self.eventos if n > sequencia]
+            return [e for _, e in novos], (novos[-1][0] if novos else sequencia)
@@ -0,0 +1,268 @@
+import os
+import io
+import csv
+import sys
+import time
+import zipfile
+import argparse
+import banco
+from main import preparar_banco, sql_particoes, sql_esvaziar_municipio
+
+# Importa os CSVs de dados abertos do TSE (votacao_secao_<ano>_<UF>.zip) direto para
+# boletins/votos/votos_legenda/totais_cargo e agregados, sem OCR.
+# O arquivo vai do zip para o Postgres por COPY em streaming (memória constante,
+# milhões de linhas em minutos); o mapeamento é feito em SQL (INSERT ... SELECT)
+# a partir de uma tabela temporária, numa transação por arquivo.
+
+# --- CONFIGURAÇÕES ---
+CODIFICACAO_TSE = "LATIN1"
+SEPARADOR = ";"
+INTERVALO_PROGRESSO = 2.0       # Segundos entre linhas de progresso do COPY
+TAMANHO_BLOCO = 1024 * 1024     # Bytes por leitura do zip enviados ao COPY
+CARGOS = {11: "prefeito", 13: "vereador"}  # Demais cargos: DS_CARGO em minúsculas
+CARGOS_PROPORCIONAIS = (6, 7, 8, 13)       # Dep. federal, estadual, distrital, vereador: número de 2 dígitos = legenda
+BRANCO, NULO, ANULADO = 95, 96, 97
+
+COLUNAS_USADAS = ["CD_ELEICAO", "NR_TURNO", "SG_UF", "CD_MUNICIPIO", "NR_ZONA", "NR_SECAO",
+                  "CD_CARGO", "DS_CARGO", "NR_VOTAVEL", "NM_VOTAVEL", "QT_VOTOS"]
+
+class LeitorComProgresso:
+    """Envolve o arquivo do zip: o COPY lê por aqui e a cada INTERVALO_PROGRESSO mostramos MB lidos e MB/s"""
+    def __init__(self, arquivo, total_bytes):
+        self.arquivo = arquivo
+        self.total = total_bytes
+        self.lidos = 0
+        self.inicio = self.ultimo = time.perf_counter()
+
+    def read(self, tamanho=-1):
+        dados = self.arquivo.read(TAMANHO_BLOCO if tamanho is None or tamanho < 0 else tamanho)
+        self.lidos += len(dados)
+        agora = time.perf_counter()
+        if agora - self.ultimo >= INTERVALO_PROGRESSO or not dados:
+            self.ultimo = agora
+            mb = self.lidos / 1e6
+            print(f"\r   📦 {mb:,.0f}/{self.total / 1e6:,.0f} MB ({self.lidos / max(self.total, 1):.0%}) "
+                  f"- {mb / max(agora - self.inicio, 1e-9):,.1f} MB/s", end="", flush=True)
+        return dados
+
+    def readline(self, tamanho=-1):
+        return self.arquivo.readline(tamanho)
+
+def ler_cabecalho(abrir):
+    with abrir() as f:
+        primeira = io.TextIOWrapper(f, encoding="latin-1").readline()
+    return [c.strip().lower() for c in next(csv.reader([primeira], delimiter=SEPARADOR))]
+
+def etapa(cur, descricao, sql, params=None):
+    """Roda um passo do mapeamento e mostra linhas afetadas e linhas/s"""
+    inicio = time.perf_counter()
+    cur.execute(sql, params)
+    segundos = time.perf_counter() - inicio
+    linhas = max(cur.rowcount, 0)
+    print(f"   ✅ {descricao:<28} {linhas:>12,} linhas em {segundos:>7.1f}s ({linhas / max(segundos, 1e-9):>12,.0f}/s)")
+    return linhas
+
+def copiar_para_staging(cur, nome, abrir, tamanho):
+    """Cria tse_staging com as colunas do cabeçalho (tudo texto) e despeja o CSV inteiro por COPY"""
+    colunas = ler_cabecalho(abrir)
+    faltando = [c for c in COLUNAS_USADAS if c.lower() not in colunas]
+    if faltando:
+        raise ValueError(f"{nome} não parece um votacao_secao do TSE (faltam {faltando})")
+
+    cur.execute("DROP TABLE IF EXISTS tse_staging")
+    cur.execute(f"CREATE TEMP TABLE tse_staging ({', '.join(f'{c} TEXT' for c in colunas)})")
+    inicio = time.perf_counter()
+    with abrir() as f:
+        cur.copy_expert(
+            f"COPY tse_staging FROM STDIN WITH (FORMAT csv, DELIMITER '{SEPARADOR}', HEADER true, ENCODING '{CODIFICACAO_TSE}')",
+            LeitorComProgresso(f, tamanho), size=TAMANHO_BLOCO)
+    segundos = time.perf_counter() - inicio
+    cur.execute("SELECT COUNT(*) FROM tse_staging")
+    linhas = cur.fetchone()[0]
+    print(f"\n   ✅ {'COPY para staging':<28} {linhas:>12,} linhas em {segundos:>7.1f}s ({linhas / max(segundos, 1e-9):>12,.0f}/s)")
+    return linhas
+
+def preparar_particoes(cur, substituir):
+    """Cria as partições de votos dos municípios do arquivo; com substituir, esvazia os que já tinham dados"""
+    cur.execute("SELECT DISTINCT eleicao, municipio FROM tse_votos")
+    for eleicao, municipio in cur.fetchall():
+        for comando in sql_particoes(eleicao, municipio):
+            cur.execute(comando)
+        if substituir:
+            for comando, parametros in sql_esvaziar_municipio(eleicao, municipio):
+                cur.execute(comando, parametros)
+
+def mapear(cur, arquivo, turno, municipio, substituir=False):
+    """Staging -> tabelas do sistema, tudo em SQL. Devolve {tabela: linhas inseridas}"""
+    cargo = " ".join(f"WHEN {codigo} THEN '{nome}'" for codigo, nome in CARGOS.items())
+    filtro_municipio = "AND LPAD(cd_municipio, 5, '0') = %(municipio)s" if municipio else ""
+    # Uma linha por (seção, cargo, votável) já tipada; o resto do mapeamento lê daqui
+    etapa(cur, "normalizar", f"""
+        CREATE TEMP TABLE tse_votos AS
+        SELECT CAST(cd_eleicao AS INTEGER) AS eleicao, UPPER(sg_uf) AS uf,
+               LPAD(cd_municipio, 5, '0') AS municipio, LPAD(nr_zona, 4, '0') AS zona, LPAD(nr_secao, 4, '0') AS secao,
+               CAST(cd_cargo AS INTEGER) AS cd_cargo,
+               CASE CAST(cd_cargo AS INTEGER) {cargo} ELSE LOWER(ds_cargo) END AS cargo,
+               CAST(nr_votavel AS INTEGER) AS numero, nm_votavel AS nome,
+               CAST(LEFT(nr_votavel, 2) AS INTEGER) AS partido,
+               CAST(qt_votos AS INTEGER) AS qtd,
+               CASE WHEN CAST(nr_votavel AS INTEGER) = {BRANCO} THEN 'branco'
+                    WHEN CAST(nr_votavel AS INTEGER) IN ({NULO}, {ANULADO}) THEN 'nulo'
+                    WHEN CAST(nr_votavel AS INTEGER) < 100 AND CAST(cd_cargo AS INTEGER) IN {CARGOS_PROPORCIONAIS} THEN 'legenda'
+                    ELSE 'nominal' END AS tipo
+        FROM tse_staging
+        WHERE CAST(nr_turno AS INTEGER) = %(turno)s {filtro_municipio}
+    """, {"turno": turno, "municipio": municipio})
+    cur.execute("DROP TABLE tse_staging; ANALYZE tse_votos")
+    preparar_particoes(cur, substituir)
+
+    inseridos = {}
+    # Os ids vêm do próprio INSERT (RETURNING): o mesmo arquivo_nome pode já ter boletins
+    # de outros municípios, que não são desta carga
+    cur.execute("CREATE TEMP TABLE tse_boletins (id INTEGER, uf TEXT, municipio TEXT, zona TEXT, secao TEXT)")
+    inseridos["boletins"] = etapa(cur, "boletins", """
+        WITH novos AS (
+            INSERT INTO boletins (arquivo_nome, uf, municipio, zona, secao, comparecimento)
+            SELECT %(arquivo)s, uf, municipio, zona, secao, MAX(total)
+            FROM (SELECT uf, municipio, zona, secao, cargo, SUM(qtd) AS total
+                  FROM tse_votos GROUP BY uf, municipio, zona, secao, cargo) por_cargo
+            GROUP BY uf, municipio, zona, secao
+            RETURNING id, uf, municipio, zona, secao)
+        INSERT INTO tse_boletins SELECT id, uf, municipio, zona, secao FROM novos
+    """, {"arquivo": arquivo})
+    cur.execute("ANALYZE tse_boletins")
+    etapa(cur, "partidos", """
+        INSERT INTO partidos (numero)
+        SELECT DISTINCT partido FROM tse_votos WHERE tipo IN ('nominal', 'legenda')
+        ON CONFLICT DO NOTHING
+    """)
+    # Nome oficial do TSE: prevalece sobre o que veio do OCR
+    etapa(cur, "candidatos", """
+        INSERT INTO candidatos (eleicao, municipio, cargo, numero, nome, partido_numero)
+        SELECT DISTINCT ON (eleicao, municipio, cargo, numero) eleicao, municipio, cargo, numero, nome, partido
+        FROM tse_votos WHERE tipo = 'nominal'
+        ON CONFLICT ON CONSTRAINT uq_candidatos_chave DO UPDATE SET nome = EXCLUDED.nome
+    """)
+    # Sem estatística dos candidatos recém-criados o planner estima 1 linha no join e
+    # cai num nested loop com tse_boletins (quadrático; minutos em vez de segundos)
+    cur.execute("ANALYZE candidatos")
+    inseridos["votos"] = etapa(cur, "votos", """
+        INSERT INTO votos (eleicao, municipio, boletim_id, cargo, numero, candidato_id, qtd_votos, partido_numero)
+        SELECT t.eleicao, t.municipio, b.id, t.cargo, t.numero, c.id, t.qtd, t.partido
+        FROM tse_votos t
+        JOIN tse_boletins b USING (uf, municipio, zona, secao)
+        JOIN candidatos c ON c.eleicao = t.eleicao AND c.municipio = t.municipio AND c.cargo = t.cargo AND c.numero = t.numero
+        WHERE t.tipo = 'nominal'
+    """)
+    inseridos["votos_legenda"] = etapa(cur, "votos_legenda", """
+        INSERT INTO votos_legenda (boletim_id, cargo, partido_numero, qtd_votos)
+        SELECT b.id, t.cargo, t.partido, t.qtd
+        FROM tse_votos t JOIN tse_boletins b USING (uf, municipio, zona, secao)
+        WHERE t.tipo = 'legenda'
+    """)
+    inseridos["totais_cargo"] = etapa(cur, "totais_cargo", """
+        INSERT INTO totais_cargo (boletim_id, cargo, nominais, legenda, brancos, nulos)
+        SELECT b.id, t.cargo,
+               COALESCE(SUM(t.qtd) FILTER (WHERE t.tipo = 'nominal'), 0),
+               COALESCE(SUM(t.qtd) FILTER (WHERE t.tipo = 'legenda'), 0),
+               COALESCE(SUM(t.qtd) FILTER (WHERE t.tipo = 'branco'), 0),
+               COALESCE(SUM(t.qtd) FILTER (WHERE t.tipo = 'nulo'), 0)
+        FROM tse_votos t JOIN tse_boletins b USING (uf, municipio, zona, secao)
+        GROUP BY b.id, t.cargo
+    """)
+    # Agregados do painel: as mesmas somas que o upload faria boletim a boletim
+    # (seção que já tinha BU pelo OCR soma, como um boletim a mais)
+    etapa(cur, "resumo_secoes", """
+        INSERT INTO resumo_secoes (uf, municipio, zona, secao, qtd_boletins, total_nominal)
+        SELECT uf, municipio, zona, secao, 1, COALESCE(SUM(qtd) FILTER (WHERE tipo = 'nominal'), 0)
+        FROM tse_votos GROUP BY uf, municipio, zona, secao
+        ON CONFLICT (uf, municipio, zona, secao) DO UPDATE
+        SET qtd_boletins = resumo_secoes.qtd_boletins + 1,
+            total_nominal = resumo_secoes.total_nominal + EXCLUDED.total_nominal
+    """)
+    etapa(cur, "totais_secao", """
+        INSERT INTO totais_secao (uf, municipio, zona, secao, cargo, numero, nome, qtd_votos)
+        SELECT uf, municipio, zona, secao, cargo, numero, MIN(nome), SUM(qtd)
+        FROM tse_votos WHERE tipo = 'nominal'
+        GROUP BY uf, municipio, zona, secao, cargo, numero
+        ON CONFLICT (uf, municipio, zona, secao, cargo, numero) DO UPDATE
+        SET qtd_votos = totais_secao.qtd_votos + EXCLUDED.qtd_votos
+    """)
+    cur.execute("DROP TABLE tse_votos; DROP TABLE tse_boletins")
+    return inseridos
+
+def nome_importacao(nome, turno):
+    """arquivo_nome dos boletins da carga: o CSV traz os dois turnos, então o 2º leva o turno no nome"""
+    return nome if turno == 1 else f"{nome}#turno{turno}"
+
+def importar_csv(nome, abrir, tamanho, turno, municipio, substituir=False):
+    """
+    Importa um CSV (abrir() devolve o arquivo binário, do zip ou do disco). O nome do CSV (com o
+    turno, ver nome_importacao) vai em boletins.arquivo_nome e, junto com o município, serve de
+    trava contra importar a mesma carga duas vezes; substituir=True recarrega os municípios do
+    arquivo (TRUNCATE das partições) em vez de pular.
+    """
+    arquivo = nome_importacao(nome, turno)
+    conn = banco.obter_engine().raw_connection()
+    try:
+        cur = conn.cursor()
+        filtro_municipio = "AND municipio = %(municipio)s" if municipio else ""
+        cur.execute(f"SELECT COUNT(*) FROM boletins WHERE arquivo_nome = %(arquivo)s {filtro_municipio}",
+                    {"arquivo": arquivo, "municipio": municipio})
+        if cur.fetchone()[0] and not substituir:
+            alvo = f"{turno}º turno" + (f", município {municipio}" if municipio else "")
+            print(f"⏭️  {nome} ({alvo}) já foi importado (boletins com esse arquivo_nome). Pulando.")
+            return None
+        print(f"📥 {nome} ({tamanho / 1e6:,.0f} MB descompactado)")
+        inicio = time.perf_counter()
+        linhas = copiar_para_staging(cur, nome, abrir, tamanho)
+        inseridos = mapear(cur, arquivo, turno, municipio, substituir)
+        conn.commit()  # Arquivo inteiro ou nada: uma falha no meio não deixa seção pela metade
+        segundos = time.perf_counter() - inicio
+        print(f"🏁 {nome}: {linhas:,} linhas do CSV em {segundos:.1f}s ({linhas / max(segundos, 1e-9):,.0f} linhas/s) "
+              f"-> {inseridos['boletins']:,} boletins, {inseridos['votos']:,} votos, {inseridos['votos_legenda']:,} legendas")
+        return inseridos
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def membros_csv(zf):
+    # O zip do TSE traz um CSV por UF (e às vezes o BRASIL agregado) e um leiame.pdf
+    return [m for m in zf.namelist() if m.lower().endswith(".csv") and "brasil" not in m.lower()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa votacao_secao_<ano>_<UF>.zip (dados abertos do TSE) por COPY")
+    parser.add_argument("arquivos", nargs="+", help="Zips do TSE (ou CSVs já extraídos)")
+    parser.add_argument("--turno", type=int, default=1)
+    parser.add_argument("--municipio", help="Só este município (código TSE, ex.: 23027)")
+    parser.add_argument("--substituir", action="store_true",
+                        help="Recarrega os municípios do arquivo (apaga os votos deles antes, inclusive os do OCR)")
+    args = parser.parse_args()
+    municipio = args.municipio.zfill(5) if args.municipio else None
+    if not banco.EH_POSTGRES:
+        # COPY e partições são do Postgres: importe no servidor e leve para o arquivo com copiar_banco.py
+        print(f"❌ O importador usa COPY e só roda no Postgres (DATABASE_URL atual: {banco.DIALETO}).")
+        sys.exit(1)
+    preparar_banco()  # Tabelas, colunas e migrações em dia antes do COPY
+
+    inicio = time.perf_counter()
+    total_votos = 0
+    for caminho in args.arquivos:
+        if not os.path.exists(caminho):
+            print(f"❌ Arquivo não encontrado: {caminho}")
+            sys.exit(1)
+        if zipfile.is_zipfile(caminho):
+            with zipfile.ZipFile(caminho) as zf:
+                csvs = [(m, lambda m=m: zf.open(m), zf.getinfo(m).file_size) for m in membros_csv(zf)]
+                resultados = [importar_csv(*c, args.turno, municipio, args.substituir) for c in csvs]
+        else:
+            resultados = [importar_csv(os.path.basename(caminho), lambda: open(caminho, "rb"),
+                                       os.path.getsize(caminho), args.turno, municipio, args.substituir)]
+        total_votos += sum(r["votos"] for r in resultados if r)
+
+    print(f"\n🚀 Importação concluída em {time.perf_counter() - inicio:.1f}s: {total_votos:,} votos nominais gravados.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import math
+import glob
+import time
+import zipfile
+import hashlib
+import argparse
+import pandas as pd
+from sqlalchemy import text
+import banco
+
+# Locais de votação com coordenadas: cada seção vira um ponto no mapa.
+# - importar: lê o cadastro do TSE (eleitorado_local_votacao_<ano>.zip, dados abertos) para a
+#   tabela locais_votacao, já com a célula da grade hexagonal de cada local (estilo H3, sem a
+#   dependência), em duas resoluções. Carga offline, uma vez por eleição.
+# - mapa: métricas das seções (resumo_secoes / totais_secao) somadas por local (pontos) ou por
+#   célula (hexágonos) e devolvidas em GeoJSON, com cache em disco por versão da base:
+#   enquanto não entra boletim novo nem recarga de locais, o estado inteiro sai do arquivo.
+
+# --- CONFIGURAÇÕES ---
+CODIFICACAO_TSE = "latin-1"
+SEPARADOR = ";"
+LINHAS_POR_LOTE = 50_000
+COLUNAS_TSE = {
+    "SG_UF": "uf", "CD_MUNICIPIO": "municipio", "NR_ZONA": "zona", "NR_SECAO": "secao",
+    "NR_LOCAL_VOTACAO": "local", "NM_LOCAL_VOTACAO": "nome", "DS_ENDERECO": "endereco",
+    "NM_BAIRRO": "bairro", "NR_LATITUDE": "latitude", "NR_LONGITUDE": "longitude",
+}
+# Lado do hexágono em graus de latitude: fino ~1 km (bairros), grosso ~9 km (estado inteiro)
+RESOLUCOES = {"fino": 0.01, "grosso": 0.08}
+# A longitude é encolhida por cos(15°) (meio do Brasil) para os hexágonos ficarem quase regulares
+COS_REFERENCIA = math.cos(math.radians(15))
+PASTA_CACHE = "cache_mapas"
+TIPOS_MAPA = ("locais", "grade")
+
+# --- GRADE HEXAGONAL ---
+def celula_hex(latitude, longitude, tamanho):
+    """Célula 'q:r' (coordenadas axiais, hexágono de ponta para cima) que contém o ponto"""
+    x = longitude * COS_REFERENCIA / tamanho
+    y = latitude / tamanho
+    q = math.sqrt(3) / 3 * x - y / 3
+    r = 2 / 3 * y
+    s = -q - r
+    # Arredonda em coordenadas cúbicas e corrige o eixo que mais errou (q + r + s = 0)
+    rq, rr, rs = round(q), round(r), round(s)
+    dq, dr, ds = abs(rq - q), abs(rr - r), abs(rs - s)
+    if dq > dr and dq > ds:
+        rq = -rr - rs
+    elif dr > ds:
+        rr = -rq - rs
+    return f"{rq}:{rr}"
+
+def contorno_hex(celula, tamanho):
+    """Anel fechado [lon, lat] do hexágono, para o GeoJSON"""
+    q, r = map(int, celula.split(":"))
+    cx = tamanho * math.sqrt(3) * (q + r / 2)
+    cy = tamanho * 1.5 * r
+    anel = []
+    for i in range(7):  # O 7º vértice repete o 1º
+        angulo = math.radians(60 * i - 30)
+        anel.append([round((cx + tamanho * math.cos(angulo)) / COS_REFERENCIA, 6),
+                     round(cy + tamanho * math.sin(angulo), 6)])
+    return anel
+
+# --- IMPORTAÇÃO ---
+def ler_lotes(abrir, uf=None, municipio=None):
+    """CSV do TSE -> DataFrames já normalizados (códigos com zeros à esquerda, coordenadas em float)"""
+    with abrir() as f:
+        for lote in pd.read_csv(f, sep=SEPARADOR, encoding=CODIFICACAO_TSE, dtype=str,
+                                usecols=list(COLUNAS_TSE), chunksize=LINHAS_POR_LOTE):
+            df = lote.rename(columns=COLUNAS_TSE)
+            df["uf"] = df["uf"].str.upper()
+            df["municipio"] = df["municipio"].str.zfill(5)
+            df["zona"] = df["zona"].str.zfill(4)
+            df["secao"] = df["secao"].str.zfill(4)
+            df["local"] = pd.to_numeric(df["local"], errors="coerce").astype("Int64")
+            if uf:
+                df = df[df["uf"] == uf]
+            if municipio:
+                df = df[df["municipio"] == municipio]
+            for coluna, limite in (("latitude", 90), ("longitude", 180)):
+                valores = pd.to_numeric(df[coluna].str.replace(",", ".", regex=False), errors="coerce")
+                # O TSE usa -1 para local sem coordenada; fora da faixa também é lixo de cadastro
+                df[coluna] = valores.mask((valores == -1) | (valores.abs() > limite))
+            yield df
+
+def com_celulas(df):
+    """Acrescenta hex_fino / hex_grosso (None quando o local não tem coordenada)"""
+    tem_ponto = df["latitude"].notna() & df["longitude"].notna()
+    for nome, tamanho in RESOLUCOES.items():
+        df[f"hex_{nome}"] = [celula_hex(lat, lon, tamanho) if ok else None
+                             for lat, lon, ok in zip(df["latitude"], df["longitude"], tem_ponto)]
+    return df
+
+def importar_csv(nome, abrir, uf=None, municipio=None):
+    """
+    Grava os locais do CSV. Cada município encontrado é substituído por inteiro (o cadastro
+    do TSE é a fonte); tudo numa transação, então uma falha no meio não deixa município pela metade.
+    """
+    from main import LocalVotacao  # O modelo mora com os outros; só a carga precisa dele
+    tabela = LocalVotacao.__table__
+    inicio = time.perf_counter()
+    vistos = set()
+    secoes = set()
+    gravados = sem_coordenada = 0
+    with banco.obter_engine().begin() as conn:
+        for df in ler_lotes(abrir, uf, municipio):
+            # Uma linha por seção: o arquivo repete a seção no 2º turno, às vezes em outro lote
+            chaves = list(zip(df["uf"], df["municipio"], df["zona"], df["secao"]))
+            repetida = pd.Series([c in secoes for c in chaves], index=df.index)
+            repetida |= df.duplicated(["uf", "municipio", "zona", "secao"])
+            secoes.update(chaves)
+            df = com_celulas(df[~repetida].copy())
+            novos = set(zip(df["uf"], df["municipio"])) - vistos
+            if novos:
+                conn.execute(text("DELETE FROM locais_votacao WHERE uf = :uf AND municipio = :municipio"),
+                             [{"uf": u, "municipio": m} for u, m in novos])
+                vistos |= novos
+            registros = df.astype(object).where(df.notna(), None).to_dict("records")
+            if registros:
+                conn.execute(tabela.insert(), registros)
+            gravados += len(registros)
+            sem_coordenada += int(df["latitude"].isna().sum())
+            print(f"\r   📦 {nome}: {gravados:,} seções, {len(vistos):,} municípios", end="", flush=True)
+    segundos = time.perf_counter() - inicio
+    print(f"\n   ✅ {gravados:,} seções em {segundos:.1f}s ({gravados / max(segundos, 1e-9):,.0f}/s); "
+          f"{sem_coordenada:,} sem coordenada (ficam fora dos mapas)")
+    return gravados
+
+def importar(caminhos, uf=None, municipio=None):
+    from main import preparar_banco
+    preparar_banco()  # Cria locais_votacao em bancos que ainda não têm
+    total = 0
+    for caminho in caminhos:
+        if zipfile.is_zipfile(caminho):
+            with zipfile.ZipFile(caminho) as zf:
+                for membro in [m for m in zf.namelist() if m.lower().endswith(".csv")]:
+                    total += importar_csv(membro, lambda m=membro: zf.open(m), uf, municipio)
+        else:
+            total += importar_csv(os.path.basename(caminho), lambda: open(caminho, "rb"), uf, municipio)
+    return total
+
+# --- AGREGAÇÃO ---
+def versao_mapas(conn):
+    """
+    Muda quando entra boletim novo ou quando os locais são recarregados: ids novos e, como o
+    SQLite reaproveita ROWID depois de um DELETE, também a contagem de locais.
+    """
+    boletins, locais, total = conn.execute(text("""
+        SELECT (SELECT COALESCE(MAX(id), 0) FROM boletins), (SELECT COALESCE(MAX(id), 0) FROM locais_votacao),
+               (SELECT COUNT(*) FROM locais_votacao)
+    """)).one()
+    return f"b{boletins}-l{locais}n{total}"
+
+def agregar(conn, agrupar, uf, municipio=None, cargo=None, numero=None):
+    """
+    Seções do recorte juntadas aos locais e somadas por 'agrupar' (colunas de locais_votacao).
+    total = votos nominais das seções; votos = do candidato (cargo + numero) ou o próprio total.
+    """
+    colunas = ", ".join(f"l.{c}" for c in agrupar)
+    candidato = cargo is not None and numero is not None
+    votos = "COALESCE(t.qtd_votos, 0)" if candidato else "r.total_nominal"
+    juncao_candidato = """
+        LEFT JOIN totais_secao t
+          ON t.uf = l.uf AND t.municipio = l.municipio AND t.zona = l.zona AND t.secao = l.secao
+         AND t.cargo = :cargo AND t.numero = :numero""" if candidato else ""
+    filtro = "AND l.municipio = :municipio" if municipio else ""
+    consulta = text(f"""
+        SELECT {colunas},
+               COUNT(DISTINCT l.zona || '-' || CAST(l.local AS VARCHAR)) AS locais,
+               COUNT(*) AS secoes,
+               AVG(l.latitude) AS latitude, AVG(l.longitude) AS longitude,
+               MIN(l.nome) AS nome, MIN(l.bairro) AS bairro,
+               SUM({votos}) AS votos, SUM(r.total_nominal) AS total
+        FROM locais_votacao l
+        JOIN resumo_secoes r
+          ON r.uf = l.uf AND r.municipio = l.municipio AND r.zona = l.zona AND r.secao = l.secao
+        {juncao_candidato}
+        WHERE l.uf = :uf AND l.latitude IS NOT NULL {filtro}
+        GROUP BY {colunas}
+    """)
+    params = {"uf": uf, "municipio": municipio, "cargo": cargo, "numero": numero}
+    df = pd.read_sql(consulta, conn, params=params)
+    df["participacao"] = (df["votos"] / df["total"].where(df["total"] > 0)).fillna(0).round(4)
+    maximo = df["votos"].max() if not df.empty else 0
+    df["intensidade"] = (df["votos"] / maximo).round(4) if maximo else 0.0
+    return df
+
+def geojson_locais(df):
+    # Seção com NR_LOCAL_VOTACAO ilegível no CSV (local nulo) não vira ponto: agrupadas, as de
+    # locais diferentes da zona virariam um ponto só no meio deles. A grade continua contando com elas.
+    df = df[df["local"].notna()]
+    return {"type": "FeatureCollection", "features": [{
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(l.longitude, 6), round(l.latitude, 6)]},
+        "properties": {"municipio": l.municipio, "zona": l.zona, "local": int(l.local), "nome": l.nome,
+                       "bairro": l.bairro, "secoes": int(l.secoes), "votos": int(l.votos), "total": int(l.total),
+                       "participacao": l.participacao, "intensidade": float(l.intensidade)},
+    } for l in df.itertuples()]}
+
+def geojson_grade(df, resolucao):
+    coluna = f"hex_{resolucao}"
+    return {"type": "FeatureCollection", "features": [{
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [contorno_hex(getattr(c, coluna), RESOLUCOES[resolucao])]},
+        "properties": {"celula": getattr(c, coluna), "locais": int(c.locais), "secoes": int(c.secoes),
+                       "votos": int(c.votos), "total": int(c.total),
+                       "participacao": c.participacao, "intensidade": float(c.intensidade)},
+    } for c in df.itertuples()]}
+
+def gerar_mapa(conn, tipo, uf, municipio=None, cargo=None, numero=None, resolucao="grosso"):
+    if tipo == "locais":
+        return geojson_locais(agregar(conn, ["uf", "municipio", "zona", "local"], uf, municipio, cargo, numero))
+    return geojson_grade(agregar(conn, [f"hex_{resolucao}"], uf, municipio, cargo, numero), resolucao)
+
+# --- CACHE ---
+def caminho_cache(chave, versao):
+    nome = hashlib.sha1(json.dumps(chave).encode()).hexdigest()[:16]
+    return os.path.join(PASTA_CACHE, f"{nome}_{versao}.geojson")
+
+def mapa(tipo, uf, municipio=None, cargo=None, numero=None, resolucao="grosso"):
+    """
+    GeoJSON (texto) do recorte e a versão da base que ele representa. Sai do cache em disco
+    quando a versão bate; senão agrega, grava e apaga as versões antigas da mesma chave.
+    """
+    if tipo not in TIPOS_MAPA:
+        raise ValueError(f"tipo deve ser um de {TIPOS_MAPA}")
+    if resolucao not in RESOLUCOES:
+        raise ValueError(f"resolucao deve ser uma de {tuple(RESOLUCOES)}")
+    chave = [banco.DATABASE_URL, tipo, uf, municipio, cargo, numero, resolucao if tipo == "grade" else None]
+    with banco.obter_engine().connect() as conn:
+        versao = versao_mapas(conn)
+        caminho = caminho_cache(chave, versao)
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                return f.read(), versao
+        conteudo = json.dumps(gerar_mapa(conn, tipo, uf, municipio, cargo, numero, resolucao),
+                              ensure_ascii=False, separators=(",", ":"))
+
+    os.makedirs(PASTA_CACHE, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)  # Atômico: outro processo nunca lê um arquivo pela metade
+    prefixo = os.path.basename(caminho).split("_")[0]
+    for antigo in glob.glob(os.path.join(PASTA_CACHE, f"{prefixo}_*.geojson")):
+        if antigo != caminho:
+            os.remove(antigo)
+    return conteudo, versao
+
+def main():
+    parser = argparse.ArgumentParser(description="Locais de votação com coordenadas e mapas das seções")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    p_importar = comandos.add_parser("importar", help="Carrega eleitorado_local_votacao_<ano>.zip do TSE")
+    p_importar.add_argument("arquivos", nargs="+", help="Zips do TSE (ou CSVs já extraídos)")
+    p_importar.add_argument("--uf", help="Só esta UF")
+    p_importar.add_argument("--municipio", help="Só este município (código TSE, ex.: 23027)")
+    p_mapa = comandos.add_parser("mapa", help="Gera (e deixa em cache) o GeoJSON de um recorte")
+    p_mapa.add_argument("tipo", choices=TIPOS_MAPA)
+    p_mapa.add_argument("--uf", required=True)
+    p_mapa.add_argument("--municipio")
+    p_mapa.add_argument("--cargo")
+    p_mapa.add_argument("--numero", type=int)
+    p_mapa.add_argument("--resolucao", choices=list(RESOLUCOES), default="grosso")
+    p_mapa.add_argument("--saida", help="Também grava o GeoJSON neste arquivo")
+    args = parser.parse_args()
+    municipio = args.municipio.zfill(5) if args.municipio else None
+
+    if args.comando == "importar":
+        for caminho in args.arquivos:
+            if not os.path.exists(caminho):
+                print(f"❌ Arquivo não encontrado: {caminho}")
+                sys.exit(1)
+        inicio = time.perf_counter()
+        total = importar(args.arquivos, args.uf.upper() if args.uf else None, municipio)
+        print(f"🚀 {total:,} seções com local de votação gravadas em {time.perf_counter() - inicio:.1f}s.")
+        return
+
+    inicio = time.perf_counter()
+    conteudo, versao = mapa(args.tipo, args.uf.upper(), municipio, args.cargo, args.numero, args.resolucao)
+    feicoes = len(json.loads(conteudo)["features"])
+    print(f"🗺️  {args.tipo} de {args.uf.upper()}{f'/{municipio}' if municipio else ''}: {feicoes:,} feições, "
+          f"{len(conteudo) / 1e3:,.0f} KB, versão {versao} ({time.perf_counter() - inicio:.2f}s)")
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        print(f"💾 Gravado em '{args.saida}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURAÇÕES ---
+# Métricas em memória no formato texto do Prometheus (GET /metrics da API), sem dependência externa.
+# Cada processo do uvicorn tem as suas: com vários workers, o Prometheus deve raspar cada um.
+BALDES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+JANELA_TAXA = 60          # Segundos usados nas taxas instantâneas (ex.: páginas/s)
+PERFIL = os.getenv("PERFIL_INGESTAO", "")  # "", "cprofile" ou "pyinstrument": perfil de cada upload
+PASTA_PERFIS = "perfis"
+
+REGISTRO = []  # Toda métrica criada entra aqui e sai no /metrics
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(nomes, valores)) + "}"
+
+class Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.trava = threading.Lock()
+        self.valores = {}
+        REGISTRO.append(self)
+
+    def chave(self, rotulos):
+        return tuple(str(rotulos[n]) for n in self.rotulos)
+
+    def cabecalho(self):
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def inc(self, valor=1, **rotulos):
+        chave = self.chave(rotulos)
+        with self.trava:
+            self.valores[chave] = self.valores.get(chave, 0) + valor
+
+    def texto(self):
+        with self.trava:
+            itens = list(self.valores.items())
+        return self.cabecalho() + [f"{self.nome}{_rotulos(self.rotulos, k)} {v}" for k, v in itens]
+
+class Medidor(Contador):
+    """Gauge: valor que sobe e desce (fila, requisições em andamento)"""
+    tipo = "gauge"
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    def definir(self, valor, **rotulos):
+        with self.trava:
+            self.valores[self.chave(rotulos)] = valor
+
+    @contextmanager
+    def em_andamento(self, **rotulos):
+        self.inc(**rotulos)
+        try:
+            yield
+        finally:
+            self.dec(**rotulos)
+
+class Histograma(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), baldes=BALDES_SEGUNDOS):
+        super().__init__(nome, ajuda, rotulos)
+        self.baldes = tuple(baldes)
+
+    def observar(self, valor, **rotulos):
+        chave = self.chave(rotulos)
+        with self.trava:
+            contagens, soma, total = self.valores.get(chave, ([0] * len(self.baldes), 0.0, 0))
+            for i, limite in enumerate(self.baldes):
+                if valor <= limite:
+                    contagens[i] += 1
+            self.valores[chave] = (contagens, soma + valor, total + 1)
+
+    def texto(self):
+        with self.trava:
+            itens = [(k, list(c), s, t) for k, (c, s, t) in self.valores.items()]
+        linhas = self.cabecalho()
+        for chave, contagens, soma, total in itens:
+            for limite, contagem in zip(self.baldes, contagens):
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos + ('le',), chave + (limite,))} {contagem}")
+            linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos + ('le',), chave + ('+Inf',))} {total}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {soma:.6f}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {total}")
+        return linhas
+
+class Taxa(Metrica):
+    """Eventos por segundo na última JANELA_TAXA (para quem olha o /metrics sem Prometheus)"""
+    tipo = "gauge"
+
+    def __init__(self, nome, ajuda):
+        super().__init__(nome, ajuda)
+        self.eventos = deque()
+
+    def registrar(self, quantidade=1):
+        with self.trava:
+            self.eventos.append((time.monotonic(), quantidade))
+
+    def texto(self):
+        limite = time.monotonic() - JANELA_TAXA
+        with self.trava:
+            while self.eventos and self.eventos[0][0] < limite:
+                self.eventos.popleft()
+            total = sum(q for _, q in self.eventos)
+        return self.cabecalho() + [f"{self.nome} {total / JANELA_TAXA:.4f}"]
+
+def gerar_texto():
+    return "\n".join(linha for metrica in REGISTRO for linha in metrica.texto()) + "\n"
+
+# --- MÉTRICAS DA INGESTÃO ---
+ETAPAS = Histograma("ingestao_etapa_segundos", "Duração de cada etapa da ingestão de um BU", ["etapa"])
+BOLETINS = Contador("ingestao_boletins_total", "Boletins recebidos por situação", ["situacao"])
+PAGINAS = Contador("ingestao_paginas_total", "Páginas de BU passadas pelo OCR")
+PAGINAS_POR_SEGUNDO = Taxa("ingestao_paginas_por_segundo", f"Páginas/s no último {JANELA_TAXA}s")
+LINHAS_RELIDAS = Contador("ocr_linhas_relidas_total", "Linhas relidas em alta resolução, por motivo", ["motivo"])
+AGUARDANDO_OCR = Medidor("ingestao_aguardando_ocr", "Uploads recebidos esperando thread livre para o OCR")
+EM_OCR = Medidor("ingestao_em_ocr", "Uploads com OCR em andamento")
+REQUISICOES = Histograma("http_requisicao_segundos", "Duração das requisições HTTP", ["metodo", "rota", "status"])
+
+@contextmanager
+def medir_etapa(etapa):
+    """Cronometra um trecho: alimenta o histograma ingestao_etapa_segundos e o log em DEBUG"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        ETAPAS.observar(duracao, etapa=etapa)
+        logger.debug("etapa %s: %.3fs", etapa, duracao)
+
+@contextmanager
+def perfilar(nome, modo=PERFIL):
+    """
+    Perfil opcional de um trecho (ligado por PERFIL_INGESTAO). Grava um arquivo por chamada em
+    PASTA_PERFIS: .prof do cProfile (abrir com snakeviz/pstats) ou .html do pyinstrument.
+    Desligado, não custa nada. O caminho do arquivo fica em perfil["arquivo"].
+    """
+    perfil = {"arquivo": None}
+    if not modo:
+        yield perfil
+        return
+
+    os.makedirs(PASTA_PERFIS, exist_ok=True)
+    base = os.path.join(PASTA_PERFIS, f"{nome}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}")
+    if modo == "pyinstrument":
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield perfil
+        finally:
+            profiler.stop()
+            perfil["arquivo"] = base + ".html"
+            with open(perfil["arquivo"], "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield perfil
+        finally:
+            profiler.disable()
+            perfil["arquivo"] = base + ".prof"
+            profiler.dump_stats(perfil["arquivo"])
+    logger.info("perfil de %s gravado em %s", nome, perfil["arquivo"])
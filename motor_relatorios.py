@@ -0,0 +1,618 @@
+import pandas as pd
+import numpy as np
+import os
+import re
+import glob
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import text
+import banco
+import configuracoes
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, KeepTogether
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from datetime import datetime
+
+# --- CONFIGURAÇÕES ---
+ARQUIVO_COMPLETO = "Relatorio_Completo_Com_Zeros.pdf"
+ARQUIVO_AUDITORIA = "relatorio_geral_com_auditoria.pdf"
+PASTA_INDIVIDUAIS = "relatorios_individuais_auditados"
+PASTA_PARTES = "partes_relatorio_unico"   # PDFs parciais do modo em lotes (permite retomar), por município
+MANIFESTO_PARTES = "manifesto.json"       # De que dados as partes da pasta foram geradas
+TAMANHO_LOTE = 50                         # Candidatos por parte
+PARES_POR_LINHA = 5                       # Layout compacto: pares (Seção | Votos) por linha da grade
+
+SAIDAS = ["completo", "auditoria", "individuais"]
+
+
+# --- TEMPLATES DE TABELA ---
+# Cada layout de saída só difere na forma da tabela por seção; o resto
+# (dados, totais, aviso de legenda) vem do mesmo modelo em memória.
+TEMPLATES = {
+    "completo": {
+        "cabecalho": None,                       # Sem linha de títulos
+        "com_status": False,
+        "larguras": [30*mm, 20*mm],
+        "fonte": 8,
+        "destaque": "votos",                     # Pinta só a célula de votos
+        "aviso_legenda": False,
+    },
+    "auditoria": {
+        "cabecalho": ['Seção', 'Votos', 'Status'],
+        "com_status": True,
+        "larguras": [30*mm, 30*mm, 50*mm],
+        "fonte": 9,
+        "destaque": "linha",
+        "aviso_legenda": True,
+    },
+    "individual": {
+        "cabecalho": ['Seção', 'Votos', 'Status'],
+        "com_status": True,
+        "larguras": [30*mm, 30*mm, 50*mm],
+        "fonte": 9,
+        "destaque": "linha_negrito",
+        "aviso_legenda": True,
+    },
+}
+
+# --- 1. CARGA ÚNICA DOS DADOS ---
+
+def carregar_dados(municipio=None, eleicao=configuracoes.ELEICAO_PADRAO):
+    print("📥 Carregando dados do banco...")
+    # Uma eleição e um município (votos é particionada por eles) ou a eleição na base inteira;
+    # boletins não têm eleição: valem os que têm votos dela
+    filtro_votos = "v.eleicao = :eleicao AND v.municipio = :municipio" if municipio else "v.eleicao = :eleicao"
+    params = {"eleicao": eleicao, "municipio": municipio} if municipio else {"eleicao": eleicao}
+
+    # 1. Busca TODAS as seções existentes (Lista Mestra)
+    query_secoes = text(f"""
+    SELECT DISTINCT secao FROM boletins
+    WHERE id IN (SELECT v.boletim_id FROM votos v WHERE {filtro_votos})
+    ORDER BY secao
+    """)
+    todas_secoes = pd.read_sql(query_secoes, banco.obter_engine(), params=params)['secao'].tolist()
+    print(f"   -> Total de Seções na Cidade: {len(todas_secoes)}")
+
+    # 2. Busca os votos registrados
+    query_votos = text(f"""
+    SELECT
+        v.cargo,
+        v.numero,
+        c.nome,
+        b.secao,
+        v.qtd_votos
+    FROM votos v
+    JOIN boletins b ON v.boletim_id = b.id
+    JOIN candidatos c ON c.id = v.candidato_id
+    WHERE {filtro_votos}
+    """)
+    df_votos = pd.read_sql(query_votos, banco.obter_engine(), params=params)
+
+    # 3. Busca o Total Oficial do TSE
+    try:
+        query_oficial = "SELECT numero, votos as votos_tse FROM resultado_oficial"
+        df_oficial = pd.read_sql(query_oficial, banco.obter_engine())
+    except Exception as e:
+        print(f"⚠️ Aviso: Não foi possível carregar tabela oficial ({e}). O comparativo não será feito.")
+        df_oficial = pd.DataFrame(columns=['numero', 'votos_tse'])
+
+    return todas_secoes, df_votos, df_oficial
+
+def montar_modelo(todas_secoes, df_votos, df_oficial):
+    """
+    Monta o modelo compartilhado por todos os layouts:
+    {'secoes': [...], 'candidatos': [{'cargo', 'numero', 'nome', 'votos', 'total_apurado', 'total_tse', 'diferenca'}]}
+    'votos' guarda só as seções com voto (secao -> qtd); os zeros são preenchidos na hora de renderizar.
+    """
+    totais_oficiais = {int(n): int(v) for n, v in zip(df_oficial['numero'], df_oficial['votos_tse'])}
+
+    # Um candidato = (cargo, numero). O nome vem da tabela candidatos (um por candidato),
+    # então variações do OCR já não quebram o candidato em dois.
+    nomes = df_votos.groupby(['cargo', 'numero'])['nome'].first()
+    votos = df_votos.groupby(['cargo', 'numero', 'secao'])['qtd_votos'].sum()
+
+    candidatos = []
+    for (cargo, numero), votos_secao in votos.groupby(level=['cargo', 'numero']):
+        votos_secao = votos_secao.droplevel(['cargo', 'numero']).astype(int)
+        votos_secao = votos_secao[votos_secao > 0]
+        total_apurado = int(votos_secao.sum())
+        # Se não achar no oficial, assume que está igual para não dar erro
+        total_tse = totais_oficiais.get(int(numero), total_apurado)
+        candidatos.append({
+            'cargo': cargo,
+            'numero': int(numero),
+            'nome': nomes[(cargo, numero)],
+            'votos': votos_secao,
+            'total_apurado': total_apurado,
+            'total_tse': total_tse,
+            'diferenca': total_tse - total_apurado,
+        })
+
+    return {'secoes': todas_secoes, 'candidatos': candidatos}
+
+def versao_dados(municipio=None):
+    """MAX(id) e nº de boletins do recorte: muda com boletim novo, recarga ou remoção"""
+    filtro = "WHERE municipio = :municipio" if municipio else ""
+    with banco.obter_engine().connect() as conn:
+        maximo, total = conn.execute(text(f"SELECT COALESCE(MAX(id), 0), COUNT(*) FROM boletins {filtro}"),
+                                     {"municipio": municipio}).one()
+    return f"b{maximo}-n{total}"
+
+def carregar_modelo(municipio=None, eleicao=configuracoes.ELEICAO_PADRAO):
+    modelo = montar_modelo(*carregar_dados(municipio, eleicao))
+    # Identificam os dados do modelo para o modo em partes não misturar páginas de outra carga
+    modelo['municipio'] = municipio
+    modelo['eleicao'] = eleicao
+    modelo['versao'] = versao_dados(municipio)
+    return modelo
+
+# --- 2. PEÇAS DE LAYOUT COMPARTILHADAS ---
+
+def limpar_nome_arquivo(nome):
+    """Remove caracteres inválidos para nome de arquivo"""
+    nome_limpo = re.sub(r'[^\w\s-]', '', nome)
+    return nome_limpo.strip().replace(' ', '_').upper()
+
+def criar_estilos():
+    styles = getSampleStyleSheet()
+    return {
+        'normal': styles['Normal'],
+        'titulo': ParagraphStyle('Titulo', parent=styles['Heading1'], alignment=1, fontSize=16),
+        'subtitulo': ParagraphStyle('Subtitulo', parent=styles['Normal'], alignment=1, fontSize=10),
+        'cand': ParagraphStyle('Cand', parent=styles['Heading2'], fontSize=12, textColor=colors.darkblue),
+        'cand_completo': ParagraphStyle('CandCompleto', parent=styles['Heading2'], fontSize=12, textColor=colors.darkblue, spaceAfter=4),
+    }
+
+def criar_documento(caminho):
+    return SimpleDocTemplate(
+        caminho,
+        pagesize=A4,
+        rightMargin=15*mm, leftMargin=15*mm,
+        topMargin=15*mm, bottomMargin=15*mm
+    )
+
+def montar_tabela(candidato, secoes, template):
+    """Tabela por seção (incluindo zeros) de um candidato, no formato do template"""
+    votos_completos = candidato['votos'].reindex(secoes, fill_value=0)
+    tem_diferenca = template['aviso_legenda'] and candidato['diferenca'] > 0
+
+    dados_flat = []
+    if template['cabecalho']:
+        dados_flat.append(list(template['cabecalho']))
+    inicio_secoes = len(dados_flat)
+
+    for secao, voto in votos_completos.items():
+        voto_int = int(voto)
+        if template['com_status']:
+            status = "VOTADO" if voto_int > 0 else "NÃO VOTADO"
+            dados_flat.append([secao, voto_int, status])
+        else:
+            dados_flat.append([secao, voto_int])
+    fim_secoes = len(dados_flat)
+
+    # Linha de Total Apurado
+    if template['com_status']:
+        dados_flat.append(['TOTAL (Nominal)', candidato['total_apurado'], ''])
+    else:
+        dados_flat.append(['TOTAL', candidato['total_apurado']])
+    idx_total = len(dados_flat) - 1
+
+    # --- LÓGICA DO AVISO DE LEGENDA ---
+    if tem_diferenca:
+        texto_aviso = f"⚠ +{candidato['diferenca']} Votos de Legenda (Total TSE: {candidato['total_tse']})"
+        dados_flat.append([texto_aviso] + [''] * (len(template['larguras']) - 1)) # Colunas vazias pois faremos merge (span)
+
+    # --- ESTILIZAÇÃO DA TABELA ---
+    tabela = Table(dados_flat, colWidths=template['larguras'], hAlign='LEFT')
+
+    estilo_base = [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, -1), template['fonte']),
+    ]
+    if template['cabecalho']:
+        estilo_base.extend([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.navy),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ])
+    else:
+        estilo_base.append(('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey))
+
+    # Estilo da linha de Total Apurado (Preto)
+    estilo_base.extend([
+        ('BACKGROUND', (0, idx_total), (-1, idx_total), colors.black),
+        ('TEXTCOLOR', (0, idx_total), (-1, idx_total), colors.white),
+        ('FONTNAME', (0, idx_total), (-1, idx_total), 'Helvetica-Bold'),
+    ])
+
+    # Estilo da Linha AVISO (Vermelho Claro)
+    if tem_diferenca:
+        idx_aviso = len(dados_flat) - 1
+        estilo_base.extend([
+            ('SPAN', (0, idx_aviso), (-1, idx_aviso)), # Mescla as colunas
+            ('BACKGROUND', (0, idx_aviso), (-1, idx_aviso), colors.mistyrose),
+            ('TEXTCOLOR', (0, idx_aviso), (-1, idx_aviso), colors.red),
+            ('FONTNAME', (0, idx_aviso), (-1, idx_aviso), 'Helvetica-BoldOblique'),
+            ('ALIGN', (0, idx_aviso), (-1, idx_aviso), 'CENTER'),
+        ])
+
+    # Pinta as linhas onde teve voto > 0 para facilitar visualização
+    for i in range(inicio_secoes, fim_secoes):
+        if dados_flat[i][1] <= 0:
+            continue
+        if template['destaque'] == 'votos':
+            estilo_base.append(('BACKGROUND', (1, i), (1, i), colors.lightgreen))
+            estilo_base.append(('FONTNAME', (1, i), (1, i), 'Helvetica-Bold'))
+        else:
+            estilo_base.append(('BACKGROUND', (0, i), (-1, i), colors.lightgreen))
+            if template['destaque'] == 'linha_negrito':
+                estilo_base.append(('FONTNAME', (0, i), (-1, i), 'Helvetica-Bold'))
+
+    tabela.setStyle(TableStyle(estilo_base))
+    return tabela
+
+def intervalos_sem_voto(secoes, votadas):
+    """
+    Resume as seções sem voto em faixas da lista mestra: ['0001–0014', '0017', ...].
+    'votadas' é uma máscara booleana alinhada com 'secoes'.
+    """
+    zeradas = np.flatnonzero(~votadas)
+    if len(zeradas) == 0:
+        return []
+
+    # Quebra onde a posição na lista mestra deixa de ser consecutiva
+    quebras = np.flatnonzero(np.diff(zeradas) > 1) + 1
+    faixas = []
+    for bloco in np.split(zeradas, quebras):
+        inicio, fim = secoes[bloco[0]], secoes[bloco[-1]]
+        faixas.append(inicio if len(bloco) == 1 else f"{inicio}–{fim}")
+    return faixas
+
+def montar_secoes_compacto(candidato, secoes, template, estilos):
+    """
+    Layout compacto: só as seções com voto, em grade de PARES_POR_LINHA colunas,
+    e as seções zeradas resumidas em faixas num parágrafo. Evita uma linha (e um
+    comando de estilo) por seção da cidade, que é o que pesa no ReportLab.
+    """
+    votos = candidato['votos'].sort_index()
+    votadas = pd.Index(secoes).isin(votos.index)
+
+    celulas = []
+    for secao, voto in votos.items():
+        celulas.extend([secao, int(voto)])
+    largura_linha = 2 * PARES_POR_LINHA
+    celulas.extend([''] * (-len(celulas) % largura_linha))
+
+    elementos = []
+    if celulas:
+        dados = [['Seção', 'Votos'] * PARES_POR_LINHA]
+        dados += [celulas[i:i + largura_linha] for i in range(0, len(celulas), largura_linha)]
+        grade = Table(dados, colWidths=[20*mm, 14*mm] * PARES_POR_LINHA, hAlign='LEFT', repeatRows=1)
+        grade.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('FONTSIZE', (0, 0), (-1, -1), template['fonte']),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.navy),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.lightgreen),
+        ]))
+        elementos.append(grade)
+
+    faixas = intervalos_sem_voto(secoes, votadas)
+    if faixas:
+        texto_zeros = f"<b>Sem voto ({len(secoes) - int(votadas.sum())} de {len(secoes)} seções):</b> {', '.join(faixas)}"
+        elementos.extend([Spacer(1, 2*mm), Paragraph(texto_zeros, estilos['normal'])])
+
+    # Linha de Total Apurado (e aviso de legenda, se houver)
+    resumo = [['TOTAL (Nominal)', candidato['total_apurado']]]
+    estilo_resumo = [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, -1), template['fonte']),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.black),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ]
+    if template['aviso_legenda'] and candidato['diferenca'] > 0:
+        resumo.append([f"⚠ +{candidato['diferenca']} Votos de Legenda (Total TSE: {candidato['total_tse']})", ''])
+        estilo_resumo.extend([
+            ('SPAN', (0, 1), (-1, 1)),
+            ('BACKGROUND', (0, 1), (-1, 1), colors.mistyrose),
+            ('TEXTCOLOR', (0, 1), (-1, 1), colors.red),
+            ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-BoldOblique'),
+        ])
+    tabela_resumo = Table(resumo, colWidths=[60*mm, 30*mm], hAlign='LEFT')
+    tabela_resumo.setStyle(TableStyle(estilo_resumo))
+    elementos.extend([Spacer(1, 2*mm), tabela_resumo])
+
+    return elementos
+
+def montar_secoes(candidato, secoes, template, estilos, compacto=False):
+    """Flowables da parte por seção de um candidato (tabela completa ou layout compacto)"""
+    if compacto:
+        return montar_secoes_compacto(candidato, secoes, template, estilos)
+    return [montar_tabela(candidato, secoes, template)]
+
+# --- 3. LAYOUTS DE SAÍDA ---
+
+def capa_completo(modelo, estilos):
+    return [
+        Paragraph("Relatório Completo de Votação (Incluindo Zeros)", estilos['titulo']),
+        Paragraph(f"Total de Seções Processadas: {len(modelo['secoes'])}", estilos['normal']),
+        Spacer(1, 8*mm),
+    ]
+
+def bloco_completo(candidato, secoes, estilos, compacto=False):
+    texto_header = f"<b>{candidato['nome']}</b> ({candidato['numero']}) - {candidato['cargo'].upper()} | Total: <b>{candidato['total_apurado']}</b>"
+    return [
+        Paragraph(texto_header, estilos['cand_completo']),
+        # Mantém junto na página se possível
+        KeepTogether(
+            montar_secoes(candidato, secoes, TEMPLATES['completo'], estilos, compacto)
+            + [Spacer(1, 8*mm)]
+        ),
+    ]
+
+def capa_auditoria(modelo, estilos):
+    data_hoje = datetime.now().strftime("%d/%m/%Y às %H:%M")
+    return [
+        Paragraph("Relatório de Conferência de Votos", estilos['titulo']),
+        Paragraph(f"Comparativo: Apurado (DB) vs Oficial (TSE) - {data_hoje}", estilos['subtitulo']),
+        Spacer(1, 10*mm),
+    ]
+
+def bloco_auditoria(candidato, secoes, estilos, compacto=False):
+    texto_header = f"<b>{candidato['nome']}</b> ({candidato['numero']}) - {candidato['cargo'].upper()}"
+    return [
+        KeepTogether([
+            Paragraph(texto_header, estilos['cand']),
+            Spacer(1, 2*mm),
+        ] + montar_secoes(candidato, secoes, TEMPLATES['auditoria'], estilos, compacto)),
+        PageBreak(),
+    ]
+
+def elementos_individual(candidato, secoes, estilos, compacto=False):
+    data_hoje = datetime.now().strftime("%d/%m/%Y às %H:%M")
+    texto_header = (f"<b>{candidato['nome']}</b> ({candidato['numero']})<br/>"
+                    f"Cargo: {candidato['cargo'].upper()} | Apurado: <b>{candidato['total_apurado']}</b>")
+    return [
+        Paragraph("Relatório Individual de Auditoria", estilos['titulo']),
+        Paragraph(f"{data_hoje}", estilos['subtitulo']),
+        Spacer(1, 10*mm),
+        Paragraph(texto_header, estilos['cand']),
+        Spacer(1, 5*mm),
+    ] + montar_secoes(candidato, secoes, TEMPLATES['individual'], estilos, compacto)
+
+# Layouts de documento único: (capa, bloco por candidato, arquivo padrão)
+LAYOUTS_DOCUMENTO = {
+    "completo": (capa_completo, bloco_completo, ARQUIVO_COMPLETO),
+    "auditoria": (capa_auditoria, bloco_auditoria, ARQUIVO_AUDITORIA),
+}
+
+# --- 4. RENDERIZADORES ---
+
+def renderizar_documento(modelo, layout, destino=None, compacto=False):
+    """Gera um PDF único (layout 'completo' ou 'auditoria') a partir do modelo"""
+    capa, bloco, arquivo_padrao = LAYOUTS_DOCUMENTO[layout]
+    destino = destino or arquivo_padrao
+    candidatos = modelo['candidatos']
+    estilos = criar_estilos()
+
+    print(f"📄 [{layout}] Gerando tabelas para {len(candidatos)} candidatos...")
+    elementos = capa(modelo, estilos)
+    for contador, candidato in enumerate(candidatos, start=1):
+        elementos.extend(bloco(candidato, modelo['secoes'], estilos, compacto))
+        if contador % 10 == 0:
+            print(f"... Processados {contador}/{len(candidatos)}")
+
+    print(f"💾 Salvando arquivo: {destino}...")
+    try:
+        criar_documento(destino).build(elementos)
+        print(f"✅ Arquivo '{destino}' gerado com sucesso!")
+    except Exception as e:
+        print(f"❌ Erro ao gerar PDF: {e}")
+
+def renderizar_individuais(modelo, pasta=PASTA_INDIVIDUAIS, compacto=False):
+    """Gera um PDF por candidato na pasta indicada"""
+    os.makedirs(pasta, exist_ok=True)
+    candidatos = modelo['candidatos']
+    estilos = criar_estilos()
+
+    print(f"🚀 Iniciando geração de {len(candidatos)} arquivos PDF...")
+    for contador, candidato in enumerate(candidatos, start=1):
+        nome_arquivo = limpar_nome_arquivo(candidato['nome'])
+        caminho_arquivo = os.path.join(pasta, f"{nome_arquivo}_{candidato['numero']}.pdf")
+        try:
+            criar_documento(caminho_arquivo).build(elementos_individual(candidato, modelo['secoes'], estilos, compacto))
+            print(f"[{contador}/{len(candidatos)}] OK: {caminho_arquivo}")
+        except Exception as e:
+            print(f"❌ Erro ao gerar {candidato['nome']}: {e}")
+
+    print("-" * 50)
+    print("✅ Processo finalizado!")
+
+# --- 5. MODO EM LOTES (PARTES PARALELAS + MESCLAGEM) ---
+
+def caminho_parte(pasta, indice):
+    return os.path.join(pasta, f"parte_{indice:05d}.pdf")
+
+def assinatura_lote(manifesto, indice, lote):
+    """Impressão digital de uma parte: dados do manifesto + posição e candidatos do lote"""
+    chave = [manifesto["eleicao"], manifesto["municipio"], manifesto["versao"], manifesto["assinatura"], indice,
+             [f"{c['cargo']}:{c['numero']}" for c in lote]]
+    return hashlib.sha256(json.dumps(chave, default=str).encode()).hexdigest()[:16]
+
+def parte_valida(pasta, indice, assinatura):
+    """A parte existe e foi gerada deste lote, destes dados (a assinatura gravada ao lado do PDF bate)"""
+    destino = caminho_parte(pasta, indice)
+    try:
+        with open(destino + ".assinatura", encoding="utf-8") as f:
+            return os.path.exists(destino) and f.read() == assinatura
+    except FileNotFoundError:
+        return False
+
+def renderizar_parte(layout, indice, candidatos, secoes, pasta, compacto=False, assinatura=None):
+    """
+    Gera um PDF parcial com o bloco de cada candidato do lote.
+    Roda em processo separado: só a memória deste lote fica viva durante o build.
+    Grava em arquivo temporário e renomeia no final, então uma parte existente
+    em disco está sempre completa (é isso que permite retomar); a assinatura do lote
+    vai ao lado do PDF, só depois dele, e é conferida antes de mesclar.
+    """
+    capa, bloco, _ = LAYOUTS_DOCUMENTO[layout]
+    estilos = criar_estilos()
+    elementos = capa({'secoes': secoes}, estilos) if indice == 0 else []
+
+    for candidato in candidatos:
+        elementos.extend(bloco(candidato, secoes, estilos, compacto))
+
+    destino = caminho_parte(pasta, indice)
+    temporario = destino + ".tmp"
+    criar_documento(temporario).build(elementos)
+    os.replace(temporario, destino)
+    if assinatura:
+        with open(destino + ".assinatura.tmp", "w", encoding="utf-8") as f:
+            f.write(assinatura)
+        os.replace(destino + ".assinatura.tmp", destino + ".assinatura")
+    return destino
+
+def mesclar_partes(caminhos, destino):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for caminho in caminhos:
+        writer.append(caminho)
+    with open(destino, 'wb') as f:
+        writer.write(f)
+    writer.close()
+
+def manifesto_partes(modelo, tamanho_lote):
+    """
+    Identidade dos dados por trás das partes: eleição, município, versão da base, candidatos na ordem
+    dos lotes e uma assinatura do que vai impresso (nomes, totais, lista de seções), que muda
+    também quando só o cadastro de candidatos ou o resultado oficial foi recarregado.
+    """
+    candidatos = modelo['candidatos']
+    impresso = [modelo['secoes'], [[c['nome'], c['total_apurado'], c['total_tse']] for c in candidatos]]
+    return {
+        "eleicao": modelo.get('eleicao'),
+        "municipio": modelo.get('municipio'),
+        "versao": modelo.get('versao'),
+        "tamanho_lote": tamanho_lote,
+        "candidatos": [f"{c['cargo']}:{c['numero']}" for c in candidatos],
+        "assinatura": hashlib.sha256(json.dumps(impresso, default=str).encode()).hexdigest()[:16],
+    }
+
+def preparar_pasta_partes(pasta, manifesto):
+    """Mantém as partes da pasta só se foram geradas dos mesmos dados; senão apaga e grava o manifesto novo"""
+    os.makedirs(pasta, exist_ok=True)
+    caminho = os.path.join(pasta, MANIFESTO_PARTES)
+    anterior = None
+    if os.path.exists(caminho):
+        with open(caminho, encoding="utf-8") as f:
+            anterior = json.load(f)
+    if anterior == manifesto:
+        return
+    antigas = glob.glob(os.path.join(pasta, "parte_*"))
+    if antigas:
+        print(f"🧹 Os dados mudaram desde a última execução: {len(antigas)} parte(s) antiga(s) descartada(s).")
+    for antiga in antigas:
+        os.remove(antiga)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+def renderizar_documento_em_partes(modelo, layout, destino=None, tamanho_lote=TAMANHO_LOTE, workers=None, compacto=False):
+    """
+    Variante de renderizar_documento para bases grandes: cada lote de candidatos
+    vira um PDF parcial (renderizados em paralelo) e no final as partes são
+    mescladas. Partes já geradas dos mesmos dados (manifesto da pasta) são
+    reaproveitadas ao rodar de novo, então uma falha só exige refazer os lotes que quebraram.
+    """
+    destino = destino or LAYOUTS_DOCUMENTO[layout][2]
+    pasta = os.path.join(PASTA_PARTES, modelo.get('municipio') or "todos", f"{layout}_compacto" if compacto else layout)
+    manifesto = manifesto_partes(modelo, tamanho_lote)
+    preparar_pasta_partes(pasta, manifesto)
+
+    candidatos = modelo['candidatos']
+    lotes = [candidatos[i:i + tamanho_lote] for i in range(0, len(candidatos), tamanho_lote)]
+    assinaturas = [assinatura_lote(manifesto, i, lote) for i, lote in enumerate(lotes)]
+
+    pendentes = [i for i in range(len(lotes)) if not parte_valida(pasta, i, assinaturas[i])]
+    print(f"🚀 [{layout}] {len(candidatos)} candidatos em {len(lotes)} partes de até {tamanho_lote}.")
+    if len(pendentes) < len(lotes):
+        print(f"♻️  Retomando: {len(lotes) - len(pendentes)} partes já existem em '{pasta}' (mesmos dados).")
+
+    falhas = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futuros = {
+            executor.submit(renderizar_parte, layout, i, lotes[i], modelo['secoes'], pasta, compacto, assinaturas[i]): i
+            for i in pendentes
+        }
+        for concluidas, futuro in enumerate(as_completed(futuros), start=1):
+            i = futuros[futuro]
+            primeiro, ultimo = lotes[i][0], lotes[i][-1]
+            try:
+                futuro.result()
+                print(f"[{concluidas}/{len(pendentes)}] ✅ Parte {i} ({primeiro['nome']} ... {ultimo['nome']})")
+            except Exception as e:
+                falhas[i] = e
+                print(f"[{concluidas}/{len(pendentes)}] ❌ Parte {i} falhou: {e}")
+
+    if falhas:
+        print("-" * 50)
+        print(f"⚠️ {len(falhas)} parte(s) com erro: {sorted(falhas)}. Corrija e rode de novo para retomar.")
+        return
+
+    # Outra execução na mesma pasta (outros dados) pode ter trocado partes enquanto o pool rodava
+    divergentes = [i for i in range(len(lotes)) if not parte_valida(pasta, i, assinaturas[i])]
+    if divergentes:
+        print(f"⚠️ {len(divergentes)} parte(s) não batem com os dados desta execução: {divergentes}. "
+              "Nada foi mesclado; rode de novo para regerá-las.")
+        return
+
+    print(f"💾 Mesclando {len(lotes)} partes em: {destino}...")
+    try:
+        mesclar_partes([caminho_parte(pasta, i) for i in range(len(lotes))], destino)
+        print(f"✅ Arquivo '{destino}' gerado com sucesso!")
+    except Exception as e:
+        print(f"❌ Erro ao mesclar PDF: {e}")
+
+# --- 6. ORQUESTRAÇÃO ---
+
+def gerar_saidas(saidas=SAIDAS, partes=False, tamanho_lote=TAMANHO_LOTE, workers=None, compacto=False, municipio=None,
+                 eleicao=configuracoes.ELEICAO_PADRAO):
+    """Carrega o banco uma única vez e emite todas as saídas pedidas"""
+    modelo = carregar_modelo(municipio, eleicao)
+
+    if not modelo['candidatos']:
+        print("❌ Nenhum dado encontrado.")
+        return
+
+    for saida in saidas:
+        if saida == "individuais":
+            renderizar_individuais(modelo, compacto=compacto)
+        elif partes:
+            renderizar_documento_em_partes(modelo, saida, tamanho_lote=tamanho_lote, workers=workers, compacto=compacto)
+        else:
+            renderizar_documento(modelo, saida, compacto=compacto)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera os relatórios em PDF a partir de uma única carga do banco")
+    parser.add_argument("--saidas", nargs="+", choices=SAIDAS, default=SAIDAS,
+                        help="Quais relatórios emitir (padrão: todos)")
+    parser.add_argument("--compacto", action="store_true",
+                        help="Só as seções com voto em grade; seções zeradas resumidas em faixas")
+    parser.add_argument("--partes", action="store_true", help="Gera os PDFs únicos em lotes paralelos e mescla no final (retomável)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Candidatos por parte no modo --partes")
+    parser.add_argument("--workers", type=int, default=None, help="Processos paralelos no modo --partes")
+    parser.add_argument("--municipio", help="Só as seções deste município (padrão: base inteira)")
+    parser.add_argument("--eleicao", type=int, default=configuracoes.ELEICAO_PADRAO, help="ID do TSE da eleição")
+    args = parser.parse_args()
+
+    gerar_saidas(args.saidas, args.partes, args.lote, args.workers, args.compacto, args.municipio, args.eleicao)
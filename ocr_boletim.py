@@ -0,0 +1,438 @@
+import re
+import logging
+import numpy as np
+from PIL import Image
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+from metricas import medir_etapa, PAGINAS, PAGINAS_POR_SEGUNDO, LINHAS_RELIDAS
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURAÇÕES ---
+# Passada barata para todas as páginas; só as linhas duvidosas são relidas em DPI_RELEITURA
+DPI_OCR = 200
+DPI_RELEITURA = 400
+IDIOMA = "por"
+CONFIG_TESSERACT = "--psm 6"  # Bloco único: a tabela inteira, linha a linha
+CONFIG_LINHA = "--psm 7"      # Releitura: recorte com uma linha só
+CONFIANCA_MINIMA = 80         # Confiança do Tesseract (0-100) abaixo da qual um número é relido
+MARGEM_LINHA = 6              # Folga (px, na resolução da 1ª passada) ao recortar uma linha para reler
+
+# Pré-processamento
+ANGULO_MAXIMO = 3.0      # Inclinação máxima (graus) procurada no deskew
+PASSO_ANGULO = 0.25
+LARGURA_DESKEW = 800     # O ângulo é estimado numa miniatura dessa largura (px)
+MARGEM_RECORTE = 20      # Borda branca (px) mantida ao redor do texto no recorte
+FRACAO_BORDA = 0.9       # Linha/coluna com mais que isso de tinta é borda do scanner, não texto
+
+# Leitura
+FATOR_MESMA_LINHA = 0.6  # Palavras cujo centro difere menos que isso x altura da letra estão na mesma linha
+MAX_BUSCA_VOTO = 2       # Linhas abaixo onde ainda procura o voto quando a linha do candidato veio sem ele
+PALAVRAS_LIXO = ["Votação", "Votaçã", "Votacao", "Votos", "Total", "Partido"]
+CABECALHOS_PREFEITO = ["ZONA", "SEÇÃO", "APTOS", "NOMINAIS", "BRANCO", "NULOS"]
+VOTOS_ESPECIAIS = {"brancos": r"^(?:VOTOS\s+EM\s+)?BRANCOS?\D*(\d+)", "nulos": r"^(?:VOTOS\s+)?NULOS?\D*(\d+)"}
+
+# --- 1. PRÉ-PROCESSAMENTO DA IMAGEM ---
+def binarizar(cinza):
+    """Limiar de Otsu: devolve máscara booleana (True = tinta)"""
+    histograma = np.bincount(cinza.ravel(), minlength=256).astype(np.float64)
+    niveis = np.arange(256)
+    peso_fundo = np.cumsum(histograma)
+    peso_frente = cinza.size - peso_fundo
+    soma_fundo = np.cumsum(niveis * histograma)
+    soma_total = soma_fundo[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media_fundo = soma_fundo / peso_fundo
+        media_frente = (soma_total - soma_fundo) / peso_frente
+        variancia_entre = peso_fundo * peso_frente * (media_fundo - media_frente) ** 2
+    if np.all(np.isnan(variancia_entre)):  # Página de uma cor só (em branco): sem tinta
+        return np.zeros(cinza.shape, dtype=bool)
+    limiar = int(np.nanargmax(variancia_entre))
+    return cinza <= limiar
+
+def limpar_bordas(tinta):
+    """Linhas/colunas quase todas pretas são borda ou sombra do scanner: viram fundo"""
+    tinta = tinta.copy()
+    tinta[tinta.mean(axis=1) >= FRACAO_BORDA, :] = False
+    tinta[:, tinta.mean(axis=0) >= FRACAO_BORDA] = False
+    return tinta
+
+def estimar_inclinacao(tinta):
+    """
+    Perfil de projeção: inclina os pixels de tinta de uma miniatura (cisalhamento, que para
+    poucos graus equivale à rotação) e fica com o ângulo em que as linhas de texto ficam
+    mais "nítidas" (maior variação entre somas de linhas vizinhas). Um bincount por ângulo.
+    """
+    miniatura = Image.fromarray(tinta.astype(np.uint8) * 255)
+    if miniatura.width > LARGURA_DESKEW:
+        escala = LARGURA_DESKEW / miniatura.width
+        miniatura = miniatura.resize((LARGURA_DESKEW, max(1, int(miniatura.height * escala))), Image.BILINEAR)
+    ys, xs = np.nonzero(np.asarray(miniatura) > 0)
+    if len(ys) == 0:
+        return 0.0
+
+    melhor_angulo, melhor_nitidez = 0.0, -1.0
+    for angulo in np.arange(-ANGULO_MAXIMO, ANGULO_MAXIMO + PASSO_ANGULO / 2, PASSO_ANGULO):
+        # Girar a imagem "angulo" graus no sentido anti-horário (como o PIL) sobe o lado direito
+        linhas = ys - np.round(xs * np.tan(np.radians(angulo))).astype(np.int64)
+        perfil = np.bincount(linhas - linhas.min())
+        nitidez = float(np.square(np.diff(perfil)).sum())
+        if nitidez > melhor_nitidez:
+            melhor_angulo, melhor_nitidez = float(angulo), nitidez
+    return melhor_angulo
+
+def recortar_texto(tinta):
+    """
+    Corta as margens, mantendo só o bloco impresso do BU (menos pixels para o Tesseract).
+    Devolve também (topo, esquerda) do recorte, para achar a mesma região em outra resolução.
+    """
+    linhas = np.flatnonzero(tinta.any(axis=1))
+    colunas = np.flatnonzero(tinta.any(axis=0))
+    if len(linhas) == 0 or len(colunas) == 0:
+        return tinta, (0, 0)
+    topo, base = max(0, linhas[0] - MARGEM_RECORTE), linhas[-1] + MARGEM_RECORTE + 1
+    esquerda, direita = max(0, colunas[0] - MARGEM_RECORTE), colunas[-1] + MARGEM_RECORTE + 1
+    return tinta[topo:base, esquerda:direita], (int(topo), int(esquerda))
+
+def alinhar(imagem, angulo=None):
+    """Binariza, tira as bordas e desentorta (estima o ângulo se não vier um); devolve (tinta, angulo)"""
+    tinta = limpar_bordas(binarizar(np.asarray(imagem.convert("L"))))
+    if angulo is None:
+        angulo = estimar_inclinacao(tinta)
+    if angulo:
+        tinta = limpar_bordas(np.asarray(Image.fromarray(tinta).rotate(angulo, resample=Image.NEAREST, fillcolor=0)))
+    return tinta, angulo
+
+def para_imagem(tinta):
+    return Image.fromarray(np.where(tinta, 0, 255).astype(np.uint8))
+
+def preprocessar(imagem):
+    """
+    Página colorida/cinza -> imagem binária (texto preto no branco), desentortada e recortada.
+    O ajuste (ângulo e canto do recorte) permite reprocessar a página em outra resolução.
+    """
+    tinta, angulo = alinhar(imagem)
+    tinta, (topo, esquerda) = recortar_texto(tinta)
+    return para_imagem(tinta), {"angulo": angulo, "topo": topo, "esquerda": esquerda}
+
+# --- 2. OCR EM COLUNAS (TSV) ---
+def agrupar_em_linhas(palavras):
+    """
+    Junta as palavras do image_to_data pela altura do centro: número, nome e votação
+    da mesma linha do BU ficam juntos mesmo quando o Tesseract os separa em blocos.
+    """
+    if not palavras:
+        return []
+    altura = float(np.median([p["altura"] for p in palavras]))
+    palavras = sorted(palavras, key=lambda p: p["topo"] + p["altura"] / 2)
+
+    linhas, atual, centros = [], [], []
+    for p in palavras:
+        centro = p["topo"] + p["altura"] / 2
+        if atual and centro - np.mean(centros) > altura * FATOR_MESMA_LINHA:
+            linhas.append(atual)
+            atual, centros = [], []
+        atual.append(p)
+        centros.append(centro)
+    linhas.append(atual)
+
+    return [montar_linha(linha) for linha in linhas]
+
+def montar_linha(palavras):
+    palavras = sorted(palavras, key=lambda p: p["esquerda"])
+    caixa = (min(p["esquerda"] for p in palavras), min(p["topo"] for p in palavras),
+             max(p["esquerda"] + p["largura"] for p in palavras), max(p["topo"] + p["altura"] for p in palavras))
+    return {"texto": " ".join(p["texto"] for p in palavras), "palavras": palavras, "caixa": caixa}
+
+def confianca_linha(linha):
+    """Menor confiança entre as palavras com dígitos (número do candidato, votação, totais); 100 se não houver"""
+    return min((p["conf"] for p in linha["palavras"] if any(c.isdigit() for c in p["texto"])), default=100.0)
+
+def ler_linhas(imagem, config=CONFIG_TESSERACT):
+    """OCR de uma imagem já pré-processada; devolve as linhas com as palavras (posição e confiança)"""
+    import pytesseract  # Importa o pandas junto (~0,4 s): só quem roda OCR paga, não quem usa o parser
+    dados = pytesseract.image_to_data(imagem, lang=IDIOMA, config=config, output_type=pytesseract.Output.DICT)
+    palavras = []
+    for texto, esquerda, topo, largura, altura, conf in zip(
+            dados["text"], dados["left"], dados["top"], dados["width"], dados["height"], dados["conf"]):
+        texto = texto.strip()
+        if texto and float(conf) >= 0:  # conf -1 = bloco/linha, não palavra
+            palavras.append({"texto": texto, "esquerda": esquerda, "topo": topo,
+                             "largura": largura, "altura": altura, "conf": float(conf)})
+    return agrupar_em_linhas(palavras)
+
+def ocr_paginas(file_bytes, dpi=DPI_OCR):
+    """Etapa de OCR: PDF -> linhas alinhadas de todas as páginas (cada uma sabe sua página) e o ajuste de cada página"""
+    with medir_etapa("decodificar"):
+        # Lê só a estrutura do PDF: arquivo corrompido falha aqui, antes de renderizar
+        total_paginas = pdfinfo_from_bytes(file_bytes)["Pages"]
+    with medir_etapa("rasterizar"):
+        imagens = convert_from_bytes(file_bytes, dpi=dpi, grayscale=True)
+    logger.info("PDF convertido: %d páginas em %d dpi", total_paginas, dpi)
+
+    linhas, ajustes = [], []
+    for i, imagem in enumerate(imagens):
+        logger.debug("Lendo página %d com OCR", i + 1)
+        with medir_etapa("preprocessar"):
+            imagem, ajuste = preprocessar(imagem)
+        with medir_etapa("ocr_pagina"):
+            lidas = ler_linhas(imagem)
+        PAGINAS.inc()
+        PAGINAS_POR_SEGUNDO.registrar()
+        ajustes.append(ajuste)
+        for linha in lidas:
+            linha["pagina"] = i
+            linhas.append(linha)
+    return linhas, ajustes
+
+def reler_linhas(file_bytes, linhas, indices, ajustes, motivo, dpi=DPI_OCR, dpi_alta=DPI_RELEITURA, paginas_altas=None):
+    """
+    Releitura seletiva: renderiza só as páginas envolvidas em dpi_alta, aplica o mesmo
+    ângulo/recorte da 1ª passada e passa cada linha pedida sozinha pelo Tesseract (psm 7).
+    Devolve {indice: linha relida}; quem chama decide se fica com ela.
+    'paginas_altas' guarda as páginas já renderizadas entre chamadas; 'motivo' só rotula a métrica.
+    """
+    if paginas_altas is None:
+        paginas_altas = {}
+    fator = dpi_alta / dpi
+    por_pagina = {}
+    for i in indices:
+        por_pagina.setdefault(linhas[i]["pagina"], []).append(i)
+
+    relidas = {}
+    for pagina, indices_pagina in por_pagina.items():
+        ajuste = ajustes[pagina]
+        if pagina not in paginas_altas:
+            imagem = convert_from_bytes(file_bytes, dpi=dpi_alta, first_page=pagina + 1, last_page=pagina + 1, grayscale=True)[0]
+            paginas_altas[pagina] = alinhar(imagem, ajuste["angulo"])[0]
+        tinta = paginas_altas[pagina]
+        for i in indices_pagina:
+            esquerda, topo, direita, base = linhas[i]["caixa"]
+            x0 = max(0, int((ajuste["esquerda"] + esquerda - MARGEM_LINHA) * fator))
+            y0 = max(0, int((ajuste["topo"] + topo - MARGEM_LINHA) * fator))
+            x1 = int((ajuste["esquerda"] + direita + MARGEM_LINHA) * fator)
+            y1 = int((ajuste["topo"] + base + MARGEM_LINHA) * fator)
+            lidas = ler_linhas(para_imagem(tinta[y0:y1, x0:x1]), CONFIG_LINHA)
+            if not lidas:
+                continue
+            # psm 7 já devolve uma linha só; junta por garantia e mantém a caixa original
+            relida = montar_linha([p for linha in lidas for p in linha["palavras"]])
+            relida.update(pagina=pagina, caixa=linhas[i]["caixa"])
+            relidas[i] = relida
+    LINHAS_RELIDAS.inc(len(indices), motivo=motivo)
+    logger.info("Releitura (%s) em %d dpi: %d de %d linhas lidas de novo", motivo, dpi_alta, len(relidas), len(indices))
+    return relidas
+
+# --- 3. INTERPRETAÇÃO DO TEXTO ---
+def limpar_nome(nome):
+    for lixo in PALAVRAS_LIXO:
+        nome = re.sub(re.escape(lixo), "", nome, flags=re.IGNORECASE)
+    nome = nome.strip()
+    while nome and nome[-1] in ".-_ ":
+        nome = nome[:-1].strip()
+    return nome
+
+def buscar_voto_nas_proximas_linhas(linhas, indice_atual, max_busca=MAX_BUSCA_VOTO):
+    """
+    Olha as próximas 'max_busca' linhas e retorna (voto, posição da linha) do primeiro número inteiro puro.
+    Com as linhas alinhadas pelo TSV o voto quase sempre já está na própria linha;
+    isto só cobre a votação que o OCR empurrou para a linha de baixo.
+    """
+    for j in range(1, max_busca + 1):
+        if indice_atual + j >= len(linhas):
+            break
+        prox_linha = linhas[indice_atual + j].upper().replace("VOTAÇÃO", "").replace(".", "").strip()
+        if prox_linha.isdigit():
+            return int(prox_linha), indice_atual + j
+        # Outro candidato ou cabeçalho: para, para não pegar o voto do vizinho
+        if "PARTIDO" in prox_linha or re.match(r"\d{2,5}\s", prox_linha):
+            break
+    return None, None
+
+def separar_voto(nome_sujo):
+    """'FULANO DE TAL 123' -> ('FULANO DE TAL', 123); sem número no fim -> (nome, None)"""
+    match_voto_fim = re.search(r"(\d+)$", nome_sujo)
+    if not match_voto_fim:
+        return nome_sujo, None
+    return nome_sujo[:match_voto_fim.start()].strip(), int(match_voto_fim.group(1))
+
+def partido_do_numero(numero):
+    """Partido de um número de urna: os 2 primeiros dígitos (prefeito 15 -> 15, vereador 15123 -> 15, legenda 15 -> 15)"""
+    return int(str(numero)[:2])
+
+def interpretar_texto(linhas, confiancas=None):
+    """
+    Etapa de interpretação: linhas de texto do BU -> metadados, votos e os totais que o próprio BU imprime.
+    Independe do OCR (dá para testar com texto de fixture). Com 'confiancas' (uma por linha), cada voto
+    leva a menor confiança das linhas de onde saiu; cada voto e total guarda os índices dessas linhas.
+    Além dos nominais, captura aptos/comparecimento, os votos de legenda de cada partido e brancos/nulos por cargo.
+    """
+    texto_completo = "\n".join(linhas)
+    dados = {
+        "metadata": {"zona": "N/A", "secao": "N/A", "municipio": "N/A", "aptos": None, "comparecimento": None},
+        "votos": [],
+        "legenda": [],   # [{"cargo", "partido", "qtd", "confianca", "linhas"}], só vereador (prefeito não tem legenda)
+        "totais": {},    # cargo -> {"qtd": votos nominais impressos no BU, "linhas": [...]}
+        "apuracao": {},  # cargo -> {"brancos", "nulos", "legenda" (total impresso)}
+    }
+
+    # --- METADADOS (ZONA/SEÇÃO/MUNICIPIO) ---
+    # Procura padrão exato: "23027 0020 1481 0220"
+    match_header = re.search(r"(\d{5})\s+(\d{4})\s+(\d{4})\s+(\d{4})", texto_completo)
+    if match_header:
+        dados["metadata"]["municipio"] = match_header.group(1)
+        dados["metadata"]["zona"] = match_header.group(2)
+        dados["metadata"]["secao"] = match_header.group(4)
+    else:
+        # Fallback: Procura "Seção 0220" isolada
+        match_secao = re.search(r"Se[cç][ãa]o.*?\n.*?(\d{4})", texto_completo, re.IGNORECASE | re.DOTALL)
+        if match_secao:
+            dados["metadata"]["secao"] = match_secao.group(1)
+
+    # "Eleitores aptos 350" / "Comparecimento 280"
+    for campo, padrao in (("aptos", r"APTOS\D{0,5}(\d+)"), ("comparecimento", r"COMPARECIMENTO\D{0,5}(\d+)")):
+        match = re.search(padrao, texto_completo.upper())
+        if match:
+            dados["metadata"][campo] = int(match.group(1))
+
+    # Só as linhas com texto, lembrando o índice original de cada uma
+    originais = [i for i, l in enumerate(linhas) if l.strip()]
+    linhas = [linhas[i].strip() for i in originais]
+    cargo_atual = None
+    partido_atual = None  # Bloco de partido do vereador: vem do cabeçalho "Partido: X - 15" ou do último candidato
+    for i, linha in enumerate(linhas):
+        maiuscula = linha.upper()
+        # Detecta Cargo
+        if "PREFEITO" in maiuscula and "VICE" not in maiuscula: cargo_atual, partido_atual = "prefeito", None
+        if "VEREADOR" in maiuscula: cargo_atual, partido_atual = "vereador", None
+
+        # "Votos nominais 1234": total do cargo impresso no BU, usado para conferir a leitura
+        match_total = re.search(r"NOMINAIS\D*(\d+)", maiuscula)
+        if match_total and cargo_atual:
+            dados["totais"][cargo_atual] = {"qtd": int(match_total.group(1)), "linhas": [originais[i]]}
+            partido_atual = None  # Daqui para baixo é o resumo do cargo, não mais um partido
+            continue
+
+        # "Brancos 5" / "Nulos 7" do cargo
+        especial = False
+        for campo, padrao in VOTOS_ESPECIAIS.items():
+            match_especial = re.search(padrao, maiuscula)
+            if match_especial and cargo_atual:
+                dados["apuracao"].setdefault(cargo_atual, {})[campo] = int(match_especial.group(1))
+                especial = True
+        if especial:
+            continue
+
+        if cargo_atual == "vereador":
+            if re.search(r"TOTAL\s+DO\s+PARTIDO", maiuscula):
+                continue
+            match_partido = re.match(r"PARTIDO\b\D*(\d{2})\b", maiuscula)
+            if match_partido:
+                partido_atual = int(match_partido.group(1))
+                continue
+            match_legenda = re.match(r"(?:VOTOS\s+DE\s+)?LEGENDA\D*(\d+)", maiuscula)
+            if match_legenda:
+                qtd = int(match_legenda.group(1))
+                if partido_atual is not None:
+                    dados["legenda"].append({"cargo": cargo_atual, "partido": partido_atual, "qtd": qtd,
+                                             "confianca": confiancas[originais[i]] if confiancas else None,
+                                             "linhas": [originais[i]]})
+                else:
+                    # Fora de um bloco de partido: é o total de legenda do cargo
+                    dados["apuracao"].setdefault(cargo_atual, {})["legenda"] = qtd
+                continue
+
+        # Vereador: 5 dígitos (aceita sujeira antes do número); prefeito: 2 dígitos no início da linha
+        if cargo_atual == "vereador":
+            match = re.search(r"(\d{5})\s+(.+)", linha)
+        elif cargo_atual == "prefeito":
+            match = re.search(r"^(\d{2})\s+(.+)", linha)
+        else:
+            continue
+        if not match:
+            continue
+
+        num = int(match.group(1))
+        nome_sujo = match.group(2).strip()
+        if cargo_atual == "prefeito" and (not 10 <= num <= 99 or any(x in nome_sujo.upper() for x in CABECALHOS_PREFEITO)):
+            continue  # Número de seção/zona/totais ou cabeçalho que parece candidato
+
+        nome, voto = separar_voto(nome_sujo)
+        usadas = [originais[i]]
+        if voto is None:
+            voto, j = buscar_voto_nas_proximas_linhas(linhas, i)
+            if voto is not None:
+                usadas.append(originais[j])
+        if voto is None:
+            continue
+
+        nome = limpar_nome(nome)
+        confianca = min(confiancas[k] for k in usadas) if confiancas else None
+        partido = partido_do_numero(num)
+        if cargo_atual == "vereador":
+            partido_atual = partido
+        logger.debug("%s capturado: %s - %s - %s", cargo_atual, num, nome, voto)
+        dados["votos"].append({"cargo": cargo_atual, "numero": num, "nome": nome, "qtd": voto, "partido": partido,
+                               "confianca": confianca, "linhas": usadas})
+
+    return dados
+
+def cargos_divergentes(dados):
+    """Cargos cuja soma dos votos lidos não bate com os votos nominais impressos no BU"""
+    return [cargo for cargo, total in dados["totais"].items()
+            if sum(v["qtd"] for v in dados["votos"] if v["cargo"] == cargo) != total["qtd"]]
+
+def conferir_totais(dados):
+    conferencia = {}
+    for cargo in sorted({v["cargo"] for v in dados["votos"]} | set(dados["totais"])):
+        soma = sum(v["qtd"] for v in dados["votos"] if v["cargo"] == cargo)
+        total = dados["totais"].get(cargo, {}).get("qtd")
+        conferencia[cargo] = {"soma_lida": soma, "total_bu": total, "confere": None if total is None else soma == total}
+    return conferencia
+
+def interpretar_linhas(linhas):
+    return interpretar_texto([l["texto"] for l in linhas], [confianca_linha(l) for l in linhas])
+
+def extrair_dados_com_ocr(file_bytes):
+    linhas, ajustes = ocr_paginas(file_bytes)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Amostra do texto bruto:\n%s", "\n".join(l["texto"] for l in linhas)[:500])
+
+    with medir_etapa("interpretar"):
+        dados = interpretar_linhas(linhas)
+
+    # 1. Números com confiança baixa (votos, legendas e totais): relê só essas linhas em DPI_RELEITURA;
+    #    fica a leitura mais confiável de cada linha
+    duvidosas = {k for v in dados["votos"] + dados["legenda"] if v["confianca"] < CONFIANCA_MINIMA for k in v["linhas"]}
+    duvidosas |= {k for t in dados["totais"].values() for k in t["linhas"] if confianca_linha(linhas[k]) < CONFIANCA_MINIMA}
+    paginas_altas = {}
+    relidas = {}
+    if duvidosas:
+        with medir_etapa("releitura"):
+            relidas = reler_linhas(file_bytes, linhas, sorted(duvidosas), ajustes, "confianca", paginas_altas=paginas_altas)
+        for k, relida in relidas.items():
+            if confianca_linha(relida) > confianca_linha(linhas[k]):
+                linhas[k] = relida
+        dados = interpretar_linhas(linhas)
+
+    # 2. Cargo cuja soma não bate com o BU: relê as linhas que ainda não foram relidas
+    #    e adota a releitura do cargo inteiro se ela fizer a soma bater
+    for cargo in cargos_divergentes(dados):
+        do_cargo = {k for v in dados["votos"] if v["cargo"] == cargo for k in v["linhas"]} | set(dados["totais"][cargo]["linhas"])
+        faltam = sorted(do_cargo - set(relidas))
+        if faltam:
+            with medir_etapa("releitura"):
+                relidas.update(reler_linhas(file_bytes, linhas, faltam, ajustes, "total_divergente", paginas_altas=paginas_altas))
+        tentativa = [relidas.get(k, linha) if k in do_cargo else linha for k, linha in enumerate(linhas)]
+        dados_tentativa = interpretar_linhas(tentativa)
+        if cargo not in cargos_divergentes(dados_tentativa):
+            linhas, dados = tentativa, dados_tentativa
+
+    dados["conferencia"] = conferir_totais(dados)
+    for v in dados["votos"] + dados["legenda"]:
+        del v["linhas"]
+    for cargo, c in dados["conferencia"].items():
+        if c["confere"] is False:
+            logger.warning("%s: soma lida %d != votos nominais do BU %d", cargo, c["soma_lida"], c["total_bu"])
+    logger.info("Seção identificada: %s (%d votos)", dados["metadata"]["secao"], len(dados["votos"]))
+    return dados
@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import importlib.util
+import traceback
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from sqlalchemy import text, inspect
+import banco
+import configuracoes
+
+# Roda o fluxo de trabalho (TSE -> ingestão -> auditoria, eleitos, relatórios, clusterização)
+# para um município, fazendo só o necessário:
+#   - as dependências saem dos recursos: quem lê 'votos' roda depois de quem escreve 'votos';
+#   - cada etapa tem uma chave (código da etapa + impressão digital do que ela lê no banco/disco);
+#     chave igual à da última execução bem-sucedida e arquivos no lugar => a etapa é pulada;
+#   - etapas sem dependência entre si rodam em paralelo, cada uma num processo, com a saída
+#     em saidas/<municipio>/logs/<etapa>.log.
+# Uso: python eleicoes.py pipeline --municipio 23027   (ou python pipeline.py ...)
+
+# --- CONFIGURAÇÕES ---
+PASTA_SAIDAS = "saidas"                 # saidas/<municipio>/: PDFs, logs e o estado do pipeline
+ARQUIVO_ESTADO = "estado_pipeline.json"
+
+# funcao: "modulo:funcao", chamada com municipio=... (e eleicao=..., com "por_eleicao")
+# le / escreve: recursos (ver IMPRESSOES). O primeiro de 'le' é a entrada principal: sem ela, nada a fazer.
+# arquivos: o que a etapa gera na pasta do município (a etapa roda com essa pasta como diretório atual).
+# externa: busca dados fora (TSE); só roda quando pedida pelo nome ou com --atualizar.
+ETAPAS = {
+    "sincronizar": {"funcao": "sincronizar_tse_bd:sincronizar", "le": [], "escreve": ["oficial"], "externa": True},
+    "candidatos": {"funcao": "carregar_candidatos:carregar", "le": [], "escreve": ["candidatos"], "externa": True,
+                   "por_eleicao": True},
+    "ingestao": {"funcao": "automacao:processar_arquivos", "le": ["pdfs"], "escreve": ["votos"], "sem_municipio": True},
+    "auditoria": {"funcao": "auditoria:auditar_municipio", "le": ["votos", "candidatos"], "escreve": []},
+    "eleitos": {"funcao": "revelar_eleitos:gerar_lista_final", "le": ["votos", "candidatos"], "escreve": [],
+                "por_eleicao": True},
+    "relatorios": {"funcao": "motor_relatorios:gerar_saidas", "le": ["votos", "candidatos", "oficial"], "escreve": [],
+                   "por_eleicao": True, "arquivos": ["Relatorio_Completo_Com_Zeros.pdf", "relatorio_geral_com_auditoria.pdf",
+                                "relatorios_individuais_auditados"]},
+    "clusterizacao": {"funcao": "clusterização_de_rivais:main", "le": ["votos", "candidatos"], "escreve": []},
+    "correlacao": {"funcao": "correlacao_votos:processar", "le": ["votos", "candidatos"], "escreve": [],
+                   "por_eleicao": True},
+    "dossies": {"funcao": "dossie_candidatos:gerar_dossies", "le": ["votos", "candidatos"], "escreve": [],
+                "por_eleicao": True, "arquivos": ["dossies"]},
+}
+
+# --- 1. IMPRESSÕES DIGITAIS DOS RECURSOS (None = recurso vazio) ---
+
+def resumir(valor):
+    return hashlib.sha256(json.dumps(valor, default=str, sort_keys=True).encode()).hexdigest()[:16]
+
+def impressao_pdfs(municipio):
+    """PDFs esperando na pasta do automacao (o BU só diz o município depois do OCR: vale a pasta toda)"""
+    from automacao import PASTA_ORIGEM
+    if not os.path.isdir(PASTA_ORIGEM):
+        return None
+    arquivos = sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                      for e in os.scandir(PASTA_ORIGEM) if e.name.lower().endswith(".pdf"))
+    return resumir(arquivos) if arquivos else None
+
+def impressao_votos(municipio):
+    """Boletins do município (quantidade e último id) e o total nominal agregado em resumo_secoes"""
+    with banco.obter_engine().connect() as conn:
+        boletins, ultimo = conn.execute(text("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM boletins WHERE municipio = :m"),
+                                        {"m": municipio}).one()
+        if not boletins:
+            return None
+        nominais = conn.execute(text("SELECT COALESCE(SUM(total_nominal), 0) FROM resumo_secoes WHERE municipio = :m"),
+                                {"m": municipio}).scalar()
+    return resumir([boletins, ultimo, nominais])
+
+def impressao_candidatos(municipio):
+    with banco.obter_engine().connect() as conn:
+        linhas = conn.execute(text("SELECT id, nome, situacao FROM candidatos WHERE municipio = :m ORDER BY id"),
+                              {"m": municipio}).all()
+    return resumir([list(l) for l in linhas]) if linhas else None
+
+def impressao_oficial(municipio):
+    """resultado_oficial (sincronizar_tse_bd) é uma tabela só, substituída a cada raspagem"""
+    engine = banco.obter_engine()
+    if not inspect(engine).has_table("resultado_oficial"):
+        return None
+    with engine.connect() as conn:
+        linhas = conn.execute(text("SELECT numero, votos FROM resultado_oficial ORDER BY numero")).all()
+    return resumir([list(l) for l in linhas]) if linhas else None
+
+IMPRESSOES = {"pdfs": impressao_pdfs, "votos": impressao_votos, "candidatos": impressao_candidatos,
+              "oficial": impressao_oficial}
+
+def impressao_codigo(funcao):
+    """Fonte do módulo da etapa, sem importá-lo (mudou o código => a etapa roda de novo)"""
+    origem = importlib.util.find_spec(funcao.split(":")[0]).origin
+    with open(origem, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+# --- 2. PLANO ---
+
+def dependencias(selecionadas):
+    """{etapa: etapas selecionadas que escrevem algum recurso que ela lê}"""
+    return {b: [a for a in selecionadas if a != b and set(ETAPAS[a]["escreve"]) & set(ETAPAS[b]["le"])]
+            for b in selecionadas}
+
+def selecionar(alvos, atualizar):
+    """Alvos pedidos + as etapas de que eles dependem (as externas só com --atualizar), na ordem de ETAPAS"""
+    pedidas = set(alvos or [nome for nome, etapa in ETAPAS.items() if not etapa.get("externa")])
+    todas = dependencias(list(ETAPAS))
+    fila = list(pedidas)
+    while fila:
+        for anterior in todas[fila.pop()]:
+            if anterior not in pedidas and (atualizar or not ETAPAS[anterior].get("externa")):
+                pedidas.add(anterior)
+                fila.append(anterior)
+    return [nome for nome in ETAPAS if nome in pedidas], set(alvos or [])
+
+def argumentos_etapa(nome, municipio, eleicao):
+    etapa = ETAPAS[nome]
+    if etapa.get("sem_municipio"):
+        return {}
+    return {"municipio": municipio, "eleicao": eleicao} if etapa.get("por_eleicao") else {"municipio": municipio}
+
+def decidir(nome, municipio, eleicao, pasta, estado, forcar, explicitas, atualizar):
+    """(motivo para pular ou None, chave da etapa); a chave é calculada agora, depois das etapas anteriores"""
+    etapa = ETAPAS[nome]
+    if etapa.get("externa") and nome not in explicitas and not atualizar:
+        return "externa (peça pelo nome ou use --atualizar)", None
+    entradas = {recurso: IMPRESSOES[recurso](municipio) for recurso in etapa["le"]}
+    if etapa["le"] and entradas[etapa["le"][0]] is None:
+        return f"sem {etapa['le'][0]} para o município", None
+    chave = resumir({"funcao": etapa["funcao"], "codigo": impressao_codigo(etapa["funcao"]),
+                     "argumentos": argumentos_etapa(nome, municipio, eleicao), "entradas": entradas})
+    arquivos_ok = all(os.path.exists(os.path.join(pasta, a)) for a in etapa.get("arquivos", []))
+    if not forcar and not etapa.get("externa") and estado.get(nome, {}).get("chave") == chave and arquivos_ok:
+        return "em dia", chave
+    return None, chave
+
+# --- 3. EXECUÇÃO ---
+
+def executar_etapa(funcao, argumentos, pasta, arquivo_log):
+    """Roda num processo do pool: saída no log, diretório atual = pasta do município (se a etapa gera arquivos)"""
+    modulo, nome = funcao.split(":")
+    inicio = time.perf_counter()
+    with open(arquivo_log, "w", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        alvo = getattr(importlib.import_module(modulo), nome)
+        anterior = os.getcwd()
+        if pasta:
+            os.chdir(pasta)
+        try:
+            alvo(**argumentos)
+        except SystemExit as e:
+            # Os scripts encerram com sys.exit() quando não há o que fazer; código != 0 é erro
+            if e.code not in (None, 0):
+                raise RuntimeError(f"encerrou com código {e.code}")
+        except Exception:
+            traceback.print_exc()
+            raise
+        finally:
+            os.chdir(anterior)
+    return time.perf_counter() - inicio
+
+def carregar_estado(caminho):
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+def salvar_estado(estado, caminho):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+
+def rodar(municipio, alvos=None, forcar=False, atualizar=False, workers=None, plano=False,
+          eleicao=configuracoes.ELEICAO_PADRAO):
+    """Roda as etapas pedidas (padrão: todas as não externas) para o município; devolve {etapa: situação}"""
+    pasta = os.path.abspath(os.path.join(PASTA_SAIDAS, municipio))
+    os.makedirs(os.path.join(pasta, "logs"), exist_ok=True)
+    caminho_estado = os.path.join(pasta, ARQUIVO_ESTADO)
+    estado = carregar_estado(caminho_estado)
+
+    selecionadas, explicitas = selecionar(alvos, atualizar)
+    deps = dependencias(selecionadas)
+    print(f"🧭 Pipeline do município {municipio} (eleição {eleicao}): {' -> '.join(selecionadas)}")
+
+    situacao = {}
+    pendentes = list(selecionadas)
+    rodando = {}
+    inicio_total = time.perf_counter()
+    # spawn: cada etapa num processo limpo (sem herdar o pool de conexões deste processo)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as executor:
+        while pendentes or rodando:
+            antes = len(pendentes)
+            for nome in list(pendentes):
+                if any(d not in situacao for d in deps[nome]):
+                    continue
+                pendentes.remove(nome)
+                falhas = [d for d in deps[nome] if situacao[d] in ("falhou", "bloqueada")]
+                if falhas:
+                    situacao[nome] = "bloqueada"
+                    print(f"   ⛔ {nome:<14} não roda: {', '.join(falhas)} falhou")
+                    continue
+                if plano and any(situacao[d] == "vai rodar" for d in deps[nome]):
+                    situacao[nome] = "vai rodar"
+                    print(f"   ▶️  {nome:<14} vai rodar (depois de {', '.join(deps[nome])}, se a entrada mudar)")
+                    continue
+                motivo, chave = decidir(nome, municipio, eleicao, pasta, estado, forcar, explicitas, atualizar)
+                if motivo:
+                    situacao[nome] = "pulada"
+                    print(f"   ⏭️  {nome:<14} pulada: {motivo}")
+                    continue
+                if plano:
+                    situacao[nome] = "vai rodar"
+                    print(f"   ▶️  {nome:<14} vai rodar")
+                    continue
+                etapa = ETAPAS[nome]
+                argumentos = argumentos_etapa(nome, municipio, eleicao)
+                log = os.path.join(pasta, "logs", f"{nome}.log")
+                futuro = executor.submit(executar_etapa, etapa["funcao"], argumentos,
+                                         pasta if etapa.get("arquivos") else None, log)
+                rodando[futuro] = (nome, chave, log)
+                print(f"   🚀 {nome:<14} iniciada")
+
+            if not rodando:
+                if pendentes and len(pendentes) == antes:
+                    raise RuntimeError(f"Dependência circular entre: {', '.join(pendentes)}")
+                continue
+            concluidos, _ = wait(rodando, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                nome, chave, log = rodando.pop(futuro)
+                try:
+                    segundos = futuro.result()
+                except Exception as e:
+                    situacao[nome] = "falhou"
+                    print(f"   ❌ {nome:<14} falhou: {e} (ver {os.path.relpath(log)})")
+                    continue
+                situacao[nome] = "ok"
+                estado[nome] = {"chave": chave, "quando": datetime.now().isoformat(timespec="seconds"),
+                                "segundos": round(segundos, 2)}
+                salvar_estado(estado, caminho_estado)
+                print(f"   ✅ {nome:<14} concluída em {segundos:.1f}s (log: {os.path.relpath(log)})")
+
+    contagem = {s: list(situacao.values()).count(s) for s in dict.fromkeys(situacao.values())}
+    print(f"🏁 {', '.join(f'{n} {s}' for s, n in contagem.items())} em {time.perf_counter() - inicio_total:.1f}s "
+          f"(saídas em {os.path.relpath(pasta)})")
+    return situacao
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roda as etapas do fluxo para um município, só o que mudou")
+    parser.add_argument("etapas", nargs="*", metavar="ETAPA",
+                        help=f"Etapas a rodar, com as que elas precisam (padrão: todas as não externas). Opções: {', '.join(ETAPAS)}")
+    parser.add_argument("--municipio", default=configuracoes.MUNICIPIO_TSE, help="Código do município como gravado em boletins")
+    parser.add_argument("--eleicao", type=int, default=configuracoes.ELEICAO_PADRAO,
+                        help="ID do TSE da eleição (etapas que filtram votos por eleição)")
+    parser.add_argument("--forcar", action="store_true", help="Roda mesmo as etapas em dia")
+    parser.add_argument("--atualizar", action="store_true", help="Inclui as etapas externas (TSE) de que os alvos dependem")
+    parser.add_argument("--workers", type=int, default=None, help="Etapas em paralelo (padrão: número de CPUs)")
+    parser.add_argument("--plano", action="store_true", help="Só mostra o que rodaria, sem executar")
+    args = parser.parse_args(argv)
+    desconhecidas = [e for e in args.etapas if e not in ETAPAS]
+    if desconhecidas:
+        parser.error(f"etapa(s) desconhecida(s): {', '.join(desconhecidas)}. Opções: {', '.join(ETAPAS)}")
+
+    situacao = rodar(args.municipio, args.etapas, args.forcar, args.atualizar, args.workers, args.plano, args.eleicao)
+    if "falhou" in situacao.values():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
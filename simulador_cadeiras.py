@@ -0,0 +1,290 @@
+import sys
+import json
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+import banco
+import configuracoes
+
+# --- CONFIGURAÇÕES ---
+# Simulação em lote da distribuição de cadeiras (QE + QP + sobras pelas maiores médias,
+# mesma regra do calculadora_cadeiras.py / revelar_eleitos.py), com todos os cenários
+# calculados de uma vez como matriz (cenários x partidos).
+NUMERO_CADEIRAS = configuracoes.NUMERO_CADEIRAS
+CENARIOS_PADRAO = 10000
+LOTE = 5000            # Cenários por bloco de matriz (limita a memória com muitas seções/candidatos)
+SEMENTE = 42
+TOP_CANDIDATOS = 25    # Candidatos mostrados no relatório (ordenados pela chance de eleição)
+
+
+# --- 1. DADOS BASE ---
+def carregar_votos(eleicao=configuracoes.ELEICAO_PADRAO, municipio=configuracoes.MUNICIPIO_TSE):
+    """
+    Votos de vereador de uma eleição e um município (uma disputa de câmara) por número e seção;
+    a legenda de cada partido entra com o número do partido. O filtro em v.eleicao/v.municipio
+    lê só a partição do município; a seção é 'zona-secao' (o número da seção se repete entre zonas).
+    """
+    query = text("""
+    SELECT v.numero, MIN(c.nome) AS nome, v.partido_numero AS partido, b.zona || '-' || b.secao AS secao,
+           SUM(v.qtd_votos) AS qtd_votos
+    FROM votos v
+    JOIN boletins b ON v.boletim_id = b.id
+    JOIN candidatos c ON c.id = v.candidato_id
+    WHERE v.cargo = 'vereador' AND v.eleicao = :eleicao AND v.municipio = :municipio
+    GROUP BY v.numero, v.partido_numero, b.zona, b.secao
+    UNION ALL
+    SELECT l.partido_numero, 'LEGENDA', l.partido_numero, b.zona || '-' || b.secao, SUM(l.qtd_votos)
+    FROM votos_legenda l
+    JOIN boletins b ON l.boletim_id = b.id
+    WHERE l.cargo = 'vereador' AND b.municipio = :municipio
+      -- votos_legenda não tem eleição: vale a dos votos nominais do mesmo boletim
+      AND EXISTS (SELECT 1 FROM votos v WHERE v.boletim_id = b.id AND v.eleicao = :eleicao AND v.municipio = :municipio)
+    GROUP BY l.partido_numero, b.zona, b.secao
+    """)
+    return pd.read_sql(query, banco.obter_engine(), params={"eleicao": eleicao, "municipio": municipio})
+
+def montar_base(df_votos):
+    """
+    df (numero, nome, partido, secao, qtd_votos) -> base da simulação:
+    {'colunas': DataFrame (numero, nome, partido, nominal), 'secoes': [...], 'matriz': secoes x colunas}.
+    O partido vem de votos.partido_numero (o que o BU/TSE registrou), não dos dígitos do número.
+    Cada partido ganha uma coluna de legenda (número de 2 dígitos), mesmo sem voto, para receber transferências.
+    """
+    df = df_votos.assign(numero=df_votos["numero"].astype(int), partido=df_votos["partido"].astype(int))
+    nomes = df.groupby("numero")["nome"].first()
+    partido_de = df.groupby("numero")["partido"].first()
+    partidos = sorted(set(partido_de))
+    numeros = sorted(set(nomes.index) | set(partidos))
+
+    colunas = pd.DataFrame({"numero": numeros})
+    colunas["nome"] = [nomes.get(n, f"LEGENDA {n}") if n > 99 else f"LEGENDA {n}" for n in numeros]
+    colunas["partido"] = [int(partido_de[n]) if n > 99 else n for n in numeros]
+    colunas["nominal"] = colunas["numero"] > 99
+
+    tabela = df.pivot_table(index="secao", columns="numero", values="qtd_votos", aggfunc="sum", fill_value=0)
+    tabela = tabela.reindex(columns=numeros, fill_value=0)
+    return {"colunas": colunas, "secoes": tabela.index.tolist(), "matriz": tabela.to_numpy(dtype=np.float64)}
+
+def base_do_dicionario(dados_partidos):
+    """Base só com totais por partido ({'10 - Republicanos': 1901, ...}), sem seções nem candidatos"""
+    df = pd.DataFrame([{"numero": int(nome.split(" - ")[0]), "nome": nome, "partido": int(nome.split(" - ")[0]),
+                        "secao": "total", "qtd_votos": votos}
+                       for nome, votos in dados_partidos.items()])
+    return montar_base(df)
+
+# --- 2. ALOCAÇÃO VETORIZADA ---
+def distribuir_cadeiras(votos, cadeiras=NUMERO_CADEIRAS):
+    """
+    votos: matriz cenários x partidos -> vagas (mesma forma).
+    Mesmas contas do calcular_distribuicao, só que para todas as linhas de uma vez:
+    QE = round(válidos / cadeiras), QP = votos // QE e cada sobra vai para a maior média votos / (vagas + 1).
+    """
+    total = votos.sum(axis=1, keepdims=True)
+    qe = np.maximum(np.round(total / cadeiras), 1)
+    vagas = np.floor(votos / qe).astype(np.int64)
+
+    linhas = np.arange(len(votos))
+    for _ in range(cadeiras):
+        faltam = vagas.sum(axis=1) < cadeiras
+        if not faltam.any():
+            break
+        medias = votos[faltam] / (vagas[faltam] + 1)
+        vagas[linhas[faltam], medias.argmax(axis=1)] += 1
+    return vagas
+
+def eleger_candidatos(votos_colunas, vagas, grupo_da_coluna, nominal):
+    """
+    Em cada grupo (partido ou fusão), os 'vagas' candidatos nominais mais votados do cenário são eleitos.
+    Devolve matriz booleana cenários x colunas (legendas sempre False).
+    """
+    eleitos = np.zeros(votos_colunas.shape, dtype=bool)
+    for g in range(vagas.shape[1]):
+        colunas = np.flatnonzero((grupo_da_coluna == g) & nominal)
+        if not len(colunas):
+            continue
+        ordem = np.argsort(-votos_colunas[:, colunas], axis=1, kind="stable")
+        posicao = np.empty_like(ordem)
+        np.put_along_axis(posicao, ordem, np.arange(len(colunas))[None, :], axis=1)
+        eleitos[:, colunas] = posicao < vagas[:, [g]]
+    return eleitos
+
+# --- 3. CENÁRIOS ---
+def normalizar_cenario(cenario):
+    """
+    Cenário: {'nome', 'transferencias': [[origem, destino, fracao | [min, max]]],
+    'fusoes': [[10, 45], ...], 'comparecimento': [media, desvio] por seção, 'ruido': bool}
+    """
+    return {
+        "nome": cenario.get("nome", "cenario"),
+        "transferencias": [tuple(t) for t in cenario.get("transferencias", [])],
+        "fusoes": [list(f) for f in cenario.get("fusoes", [])],
+        "comparecimento": tuple(cenario.get("comparecimento", (1.0, 0.0))),
+        "ruido": cenario.get("ruido", True),
+    }
+
+def agrupar_partidos(partidos, fusoes):
+    """Partido -> índice do grupo que disputa as cadeiras (partidos fundidos viram um grupo só)"""
+    grupo_de = {}
+    nomes = []
+    for fusao in fusoes:
+        nomes.append("+".join(str(p) for p in fusao))
+        for p in fusao:
+            grupo_de[p] = len(nomes) - 1
+    for p in partidos:
+        if p not in grupo_de:
+            nomes.append(str(p))
+            grupo_de[p] = len(nomes) - 1
+    return grupo_de, nomes
+
+def sortear_fracao(fracao, n, rng):
+    """Fração fixa ou intervalo [min, max] sorteado por cenário (varredura)"""
+    if isinstance(fracao, (list, tuple)):
+        return rng.uniform(fracao[0], fracao[1], size=n)
+    return np.full(n, float(fracao))
+
+def simular_lote(base, cenario, n, rng, indicadora, cadeiras):
+    colunas = base["colunas"]
+    media, desvio = cenario["comparecimento"]
+
+    # Comparecimento por seção: fator sorteado por (cenário, seção), aplicado a todos os votos da seção
+    if desvio:
+        fatores = np.clip(rng.normal(media, desvio, size=(n, len(base["secoes"]))), 0, None)
+        votos = fatores @ base["matriz"]
+    else:
+        votos = np.repeat(base["matriz"].sum(axis=0, keepdims=True) * media, n, axis=0)
+    # Ruído de contagem: Poisson em cada (cenário, candidato)
+    if cenario["ruido"]:
+        votos = rng.poisson(votos).astype(np.float64)
+
+    for origem, destino, fracao in cenario["transferencias"]:
+        f = sortear_fracao(fracao, n, rng)
+        de_origem = (colunas["partido"] == origem).to_numpy()
+        movidos = votos[:, de_origem].sum(axis=1) * f
+        votos[:, de_origem] *= (1 - f)[:, None]
+        votos[:, colunas.index[colunas["numero"] == destino][0]] += movidos
+
+    vagas = distribuir_cadeiras(votos @ indicadora, cadeiras)
+    return vagas, votos
+
+def simular(base, cenario, n=CENARIOS_PADRAO, cadeiras=NUMERO_CADEIRAS, semente=SEMENTE):
+    """Roda n cenários sorteados em blocos de LOTE. Devolve (vagas n x grupos, eleitos n x colunas, nomes dos grupos)"""
+    cenario = normalizar_cenario(cenario)
+    colunas = base["colunas"]
+    rng = np.random.default_rng(semente)
+
+    existentes = set(colunas["partido"])
+    citados = {p for t in cenario["transferencias"] for p in t[:2]} | {p for f in cenario["fusoes"] for p in f}
+    if citados - existentes:
+        raise ValueError(f"Cenário '{cenario['nome']}' cita partidos sem votos na base: {sorted(citados - existentes)}")
+
+    grupo_de, nomes_grupos = agrupar_partidos(sorted(colunas["partido"].unique()), cenario["fusoes"])
+    grupo_da_coluna = colunas["partido"].map(grupo_de).to_numpy()
+    indicadora = np.zeros((len(colunas), len(nomes_grupos)))
+    indicadora[np.arange(len(colunas)), grupo_da_coluna] = 1
+    nominal = colunas["nominal"].to_numpy()
+
+    vagas, eleitos = [], []
+    for inicio in range(0, n, LOTE):
+        k = min(LOTE, n - inicio)
+        vagas_lote, votos_lote = simular_lote(base, cenario, k, rng, indicadora, cadeiras)
+        vagas.append(vagas_lote)
+        eleitos.append(eleger_candidatos(votos_lote, vagas_lote, grupo_da_coluna, nominal))
+    return np.vstack(vagas), np.vstack(eleitos), nomes_grupos
+
+def resumir(base, vagas, eleitos, nomes_grupos, cadeiras=NUMERO_CADEIRAS):
+    """DataFrames com a distribuição de cadeiras por grupo e a chance de eleição de cada candidato"""
+    distribuicao = np.stack([(vagas == k).mean(axis=0) for k in range(cadeiras + 1)], axis=1)
+    df_partidos = pd.DataFrame({
+        "grupo": nomes_grupos,
+        "media": vagas.mean(axis=0).round(2),
+        "p5": np.percentile(vagas, 5, axis=0).astype(int),
+        "p95": np.percentile(vagas, 95, axis=0).astype(int),
+        "p_alguma": (vagas > 0).mean(axis=0).round(3),
+    })
+    df_partidos["distribuicao"] = [{k: round(p, 3) for k, p in enumerate(linha) if round(p, 3) > 0} for linha in distribuicao]
+
+    colunas = base["colunas"]
+    df_candidatos = colunas.loc[colunas["nominal"], ["numero", "nome", "partido"]].copy()
+    df_candidatos["p_eleito"] = eleitos[:, colunas["nominal"].to_numpy()].mean(axis=0).round(3)
+    return (df_partidos.sort_values("media", ascending=False, ignore_index=True),
+            df_candidatos.sort_values("p_eleito", ascending=False, ignore_index=True))
+
+# --- 4. RELATÓRIO ---
+def mostrar(nome, df_partidos, df_candidatos, n, segundos, top=TOP_CANDIDATOS):
+    print(f"\n{'='*70}")
+    print(f"🎲 CENÁRIO '{nome}': {n} simulações em {segundos:.2f}s")
+    print(f"{'='*70}")
+    print(df_partidos[["grupo", "media", "p5", "p95", "p_alguma"]].to_string(index=False))
+    for _, linha in df_partidos.iterrows():
+        if linha["media"] > 0:
+            faixas = " | ".join(f"{k}: {p:.1%}" for k, p in linha["distribuicao"].items())
+            print(f"   🚩 {linha['grupo']:<10} {faixas}")
+    if len(df_candidatos):
+        print(f"\n🏆 Chance de eleição (top {top}):")
+        for _, c in df_candidatos.head(top).iterrows():
+            print(f"   {c['p_eleito']:>6.1%}  {c['nome']:<30} ({c['numero']})")
+
+def cenario_dos_argumentos(args):
+    transferencias = []
+    for t in args.transferir or []:
+        # "45>10:0.1" ou "45>10:0-0.3"
+        rota, fracao = t.split(":")
+        origem, destino = (int(p) for p in rota.split(">"))
+        if "-" in fracao:
+            fracao = [float(x) for x in fracao.split("-")]
+        else:
+            fracao = float(fracao)
+        transferencias.append([origem, destino, fracao])
+    fusoes = [[int(p) for p in f.split("+")] for f in args.fundir or []]
+    media, desvio = (float(x) for x in args.comparecimento.split(":"))
+    return {"nome": "linha de comando", "transferencias": transferencias, "fusoes": fusoes,
+            "comparecimento": [media, desvio], "ruido": not args.sem_ruido}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula milhares de cenários de distribuição de cadeiras de uma vez")
+    parser.add_argument("--cenarios", type=int, default=CENARIOS_PADRAO, help="Simulações por cenário")
+    parser.add_argument("--cadeiras", type=int, default=NUMERO_CADEIRAS)
+    parser.add_argument("--transferir", action="append", help="Transferência de votos 'origem>destino:fração' ou 'origem>destino:min-max'")
+    parser.add_argument("--fundir", action="append", help="Partidos que disputam juntos, ex.: 10+45")
+    parser.add_argument("--comparecimento", default="1.0:0.0", help="Fator de comparecimento por seção 'media:desvio'")
+    parser.add_argument("--sem-ruido", action="store_true", help="Sem ruído de Poisson nas contagens")
+    parser.add_argument("--arquivo-cenarios", help="JSON com uma lista de cenários (substitui as opções acima)")
+    parser.add_argument("--sem-banco", action="store_true", help="Usa os totais fixos do calculadora_cadeiras.py")
+    parser.add_argument("--eleicao", type=int, default=configuracoes.ELEICAO_PADRAO)
+    parser.add_argument("--municipio", default=configuracoes.MUNICIPIO_TSE, help="Código TSE do município (uma câmara por vez)")
+    parser.add_argument("--semente", type=int, default=SEMENTE)
+    parser.add_argument("--top", type=int, default=TOP_CANDIDATOS)
+    parser.add_argument("--csv", help="Prefixo para salvar <prefixo>_partidos.csv e <prefixo>_candidatos.csv")
+    args = parser.parse_args()
+
+    if args.sem_banco:
+        from calculadora_cadeiras import dados_partidos
+        base = base_do_dicionario(dados_partidos)
+    else:
+        print(f"📥 Carregando votos de vereador do banco (eleição {args.eleicao}, município {args.municipio})...")
+        df_votos = carregar_votos(args.eleicao, args.municipio)
+        if df_votos.empty:
+            print("❌ Nenhum voto de vereador para essa eleição e município.")
+            sys.exit(1)
+        base = montar_base(df_votos)
+    print(f"   -> {len(base['secoes'])} seções, {int(base['colunas']['nominal'].sum())} candidatos, "
+          f"{base['colunas']['partido'].nunique()} partidos, {int(base['matriz'].sum())} votos")
+
+    if args.arquivo_cenarios:
+        with open(args.arquivo_cenarios, encoding="utf-8") as f:
+            cenarios = json.load(f)
+    else:
+        cenarios = [cenario_dos_argumentos(args)]
+
+    for i, cenario in enumerate(cenarios):
+        inicio = time.perf_counter()
+        vagas, eleitos, nomes_grupos = simular(base, cenario, args.cenarios, args.cadeiras, args.semente)
+        df_partidos, df_candidatos = resumir(base, vagas, eleitos, nomes_grupos, args.cadeiras)
+        mostrar(cenario.get("nome", f"cenario {i + 1}"), df_partidos, df_candidatos, args.cenarios,
+                time.perf_counter() - inicio, args.top)
+        if args.csv:
+            sufixo = f"_{i + 1}" if len(cenarios) > 1 else ""
+            df_partidos.to_csv(f"{args.csv}{sufixo}_partidos.csv", index=False)
+            df_candidatos.to_csv(f"{args.csv}{sufixo}_candidatos.csv", index=False)
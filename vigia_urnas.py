@@ -0,0 +1,302 @@
+import os
+import time
+import signal
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import automacao
+from automacao import PASTA_ORIGEM, PASTA_DESTINO, PASTA_ERRO, PASTA_INCERTOS, URL_API, WORKERS
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Sem watchdog: cai no modo polling
+    Observer = None
+    FileSystemEventHandler = object
+
+# --- CONFIGURAÇÕES ---
+# Serviço que fica rodando e envia cada PDF que cair em PASTA_ORIGEM, sem ninguém rodar o automacao.py.
+# Usa inotify (via watchdog) quando disponível; senão varre a pasta a cada INTERVALO_POLLING.
+INTERVALO_POLLING = 2.0   # Segundos entre varreduras no modo polling (e varredura de segurança no modo inotify)
+ESTABILIZACAO = 1.0       # Arquivo só entra na fila depois de ficar esse tempo sem mudar de tamanho (cópia terminou)
+ESPERA_MAXIMA_REENVIO = 60  # Teto (segundos) da espera entre tentativas de um arquivo sem conexão
+INTERVALO_STATUS = 10     # Segundos entre linhas de status no console
+PORTA_METRICAS = 9101     # GET /metrics no formato texto do Prometheus (0 desliga)
+JANELA_LAG = 1000         # Últimos N arquivos usados no p50/p95 do lag
+
+class ObservadorPasta(FileSystemEventHandler):
+    """Repassa ao vigia todo PDF criado, modificado ou movido para dentro da pasta"""
+
+    def __init__(self, vigia):
+        self.vigia = vigia
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.vigia.notar(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.vigia.notar(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.vigia.notar(event.dest_path)
+
+class VigiaUrnas:
+    """
+    Fluxo de cada arquivo: notado (inotify/varredura) -> estável (parou de crescer) -> fila
+    -> lote enviado pela janela de WORKERS -> concluídos/erro/incertos (mesmas regras do automacao.py).
+    Só quando a conexão nem abriu o arquivo volta para a fila, com espera exponencial; resultado
+    incerto (timeout com o servidor processando) é estacionado em PASTA_INCERTOS para conferência.
+    """
+
+    def __init__(self, workers=WORKERS, url=URL_API, polling=False):
+        self.workers = workers
+        self.url = url
+        self.polling = polling or Observer is None
+        self.trava = threading.Lock()
+        self.notados = {}      # caminho -> (tamanho, mtime, instante da última mudança, instante em que foi notado)
+        self.fila = deque()    # (caminho, chegada, liberado_em, tentativas)
+        self.na_fila = set()
+        self.em_voo = {}       # futuro -> (caminho, chave, chegada, tentativas)
+        self.manifesto = automacao.carregar_manifesto()
+        self.parar = threading.Event()
+        # Métricas
+        self.contagem = {"ok": 0, "erro": 0, "incerto": 0, "sem_conexao": 0}
+        self.lotes = 0
+        self.lags = deque(maxlen=JANELA_LAG)
+        self.ultima_varredura = 0.0
+
+    # --- DETECÇÃO ---
+    def notar(self, caminho):
+        if not caminho.lower().endswith(".pdf") or os.path.dirname(os.path.abspath(caminho)) != os.path.abspath(PASTA_ORIGEM):
+            return
+        # Mesmo caminho vindo do inotify ou da varredura
+        caminho = os.path.join(PASTA_ORIGEM, os.path.basename(caminho))
+        with self.trava:
+            if caminho not in self.notados and caminho not in self.na_fila:
+                agora = time.time()
+                self.notados[caminho] = (-1, -1, agora, agora)
+
+    def varrer(self):
+        for entrada in os.scandir(PASTA_ORIGEM):
+            if entrada.is_file():
+                self.notar(entrada.path)
+        self.ultima_varredura = time.monotonic()
+
+    def promover_estaveis(self):
+        """Move para a fila os arquivos que pararam de mudar (evita enviar PDF pela metade)"""
+        agora = time.time()
+        with self.trava:
+            for caminho, (tamanho, mtime, mudou_em, notado_em) in list(self.notados.items()):
+                try:
+                    info = os.stat(caminho)
+                except FileNotFoundError:
+                    del self.notados[caminho]
+                    continue
+                if (info.st_size, info.st_mtime) != (tamanho, mtime):
+                    self.notados[caminho] = (info.st_size, info.st_mtime, agora, notado_em)
+                elif agora - mudou_em >= ESTABILIZACAO:
+                    del self.notados[caminho]
+                    chave = automacao.chave_arquivo(caminho)
+                    if self.manifesto.get(chave, {}).get("situacao") == "ok":
+                        automacao.mover(caminho, PASTA_DESTINO)  # Já enviado antes (mesma regra de retomada)
+                        continue
+                    # O lag conta desde que o arquivo foi notado (o mtime pode vir antigo num cp -p)
+                    self.fila.append((caminho, notado_em, 0.0, 0))
+                    self.na_fila.add(caminho)
+
+    # --- ENVIO EM LOTES ---
+    def despachar(self, pool):
+        """
+        Preenche as vagas livres da janela de WORKERS com os arquivos prontos mais antigos.
+        Não há espera para juntar lote: ESTABILIZACAO já segura o arquivo até a cópia terminar,
+        e um lote nunca passaria de 'workers' arquivos, então esperar só deixaria envio parado.
+        """
+        vagas = self.workers - len(self.em_voo)
+        if vagas <= 0:
+            return
+        agora = time.time()
+        lote = [item for item in self.fila if item[2] <= agora][:vagas]
+        if not lote:
+            return
+        for item in lote:
+            self.fila.remove(item)
+            caminho, chegada, _, tentativas = item
+            try:
+                chave = automacao.chave_arquivo(caminho)
+            except FileNotFoundError:  # Removido por alguém enquanto esperava
+                self.na_fila.discard(caminho)
+                continue
+            self.em_voo[pool.submit(automacao.enviar_arquivo, caminho, self.url)] = (caminho, chave, chegada, tentativas)
+        self.lotes += 1
+        print(f"📦 Lote {self.lotes}: {len(lote)} arquivos (fila: {len(self.fila)}, em voo: {len(self.em_voo)})", flush=True)
+
+    def recolher(self, prontos):
+        salvar = False
+        for futuro in prontos:
+            caminho, chave, chegada, tentativas = self.em_voo.pop(futuro)
+            arquivo = os.path.basename(caminho)
+            try:
+                situacao, detalhe = futuro.result()
+            except Exception as e:
+                situacao, detalhe = "erro", f"ERRO NO SCRIPT: {e}"
+            self.contagem[situacao] += 1
+
+            if situacao == "sem_conexao":  # Não chegou ao servidor: reenviar é seguro
+                espera = min(ESPERA_MAXIMA_REENVIO, 2 ** tentativas)
+                self.fila.append((caminho, chegada, time.time() + espera, tentativas + 1))
+                print(f"⛔ {arquivo} SEM CONEXÃO, nova tentativa em {espera}s | {detalhe}", flush=True)
+                continue
+
+            automacao.concluir_envio(self.manifesto, caminho, chave, situacao, detalhe)
+            self.na_fila.discard(caminho)
+            salvar = True
+            lag = time.time() - chegada
+            self.lags.append(lag)
+            marca = {"ok": "✅ SUCESSO",
+                     "erro": f"❌ ERRO\n   Detalhe: {detalhe}",
+                     "incerto": f"❓ INCERTO (estacionado em '{PASTA_INCERTOS}', não será reenviado)\n   Detalhe: {detalhe}"}[situacao]
+            print(f"{arquivo} {marca} | lag {lag:.1f}s", flush=True)
+        # Um write do manifesto por rodada, não por arquivo
+        if salvar:
+            automacao.salvar_manifesto(self.manifesto)
+
+    # --- MÉTRICAS ---
+    def metricas(self):
+        agora = time.time()
+        with self.trava:
+            notados = len(self.notados)
+        lags = sorted(self.lags)
+        idade_fila = agora - min((item[1] for item in self.fila), default=agora)
+        return {
+            "fila": len(self.fila),
+            "estabilizando": notados,
+            "em_voo": len(self.em_voo),
+            "lotes": self.lotes,
+            "idade_mais_antigo": idade_fila,
+            "lag_p50": lags[len(lags) // 2] if lags else 0.0,
+            "lag_p95": lags[int(len(lags) * 0.95)] if lags else 0.0,
+            **{f"enviados_{k}": v for k, v in self.contagem.items()},
+        }
+
+    def texto_prometheus(self):
+        m = self.metricas()
+        linhas = [
+            "# HELP vigia_fila_profundidade Arquivos estáveis aguardando envio",
+            "# TYPE vigia_fila_profundidade gauge",
+            f"vigia_fila_profundidade {m['fila']}",
+            "# HELP vigia_estabilizando Arquivos notados ainda sendo copiados",
+            "# TYPE vigia_estabilizando gauge",
+            f"vigia_estabilizando {m['estabilizando']}",
+            "# HELP vigia_em_voo Envios em andamento",
+            "# TYPE vigia_em_voo gauge",
+            f"vigia_em_voo {m['em_voo']}",
+            "# HELP vigia_fila_idade_segundos Idade do arquivo mais antigo na fila",
+            "# TYPE vigia_fila_idade_segundos gauge",
+            f"vigia_fila_idade_segundos {m['idade_mais_antigo']:.3f}",
+            "# HELP vigia_lag_segundos Tempo entre o arquivo ser notado na pasta e o fim do envio",
+            "# TYPE vigia_lag_segundos gauge",
+            f'vigia_lag_segundos{{quantil="0.5"}} {m["lag_p50"]:.3f}',
+            f'vigia_lag_segundos{{quantil="0.95"}} {m["lag_p95"]:.3f}',
+            "# HELP vigia_lotes_total Lotes despachados",
+            "# TYPE vigia_lotes_total counter",
+            f"vigia_lotes_total {m['lotes']}",
+            "# HELP vigia_envios_total Envios concluídos por situação",
+            "# TYPE vigia_envios_total counter",
+        ]
+        linhas += [f'vigia_envios_total{{situacao="{k}"}} {v}' for k, v in self.contagem.items()]
+        return "\n".join(linhas) + "\n"
+
+    def servir_metricas(self, porta):
+        vigia = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                corpo = vigia.texto_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        servidor = ThreadingHTTPServer(("0.0.0.0", porta), Handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return servidor
+
+    # --- LAÇO PRINCIPAL ---
+    def rodar(self, porta_metricas=PORTA_METRICAS):
+        for pasta in [PASTA_ORIGEM, PASTA_DESTINO, PASTA_ERRO, PASTA_INCERTOS]:
+            os.makedirs(pasta, exist_ok=True)
+
+        observador = None
+        if not self.polling:
+            observador = Observer()
+            observador.schedule(ObservadorPasta(self), PASTA_ORIGEM, recursive=False)
+            observador.start()
+        servidor = self.servir_metricas(porta_metricas) if porta_metricas else None
+
+        modo = "polling" if self.polling else "inotify"
+        print(f"👀 Vigiando '{PASTA_ORIGEM}' ({modo}, {self.workers} envios simultâneos)"
+              + (f" | métricas em http://localhost:{porta_metricas}/metrics" if servidor else ""))
+        self.varrer()  # O que já estava na pasta antes de ligar
+        ultimo_status = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while not self.parar.is_set() or self.em_voo:
+                # No modo inotify a varredura é só rede de segurança (eventos perdidos, pasta de rede)
+                intervalo = INTERVALO_POLLING if self.polling else INTERVALO_POLLING * 30
+                if not self.parar.is_set() and time.monotonic() - self.ultima_varredura >= intervalo:
+                    self.varrer()
+                self.promover_estaveis()
+                if not self.parar.is_set():
+                    self.despachar(pool)
+
+                if self.em_voo:
+                    prontos, _ = wait(self.em_voo, timeout=0.2, return_when=FIRST_COMPLETED)
+                    self.recolher(prontos)
+                else:
+                    self.parar.wait(0.2)
+
+                if time.monotonic() - ultimo_status >= INTERVALO_STATUS and (self.fila or self.em_voo or self.notados):
+                    m = self.metricas()
+                    print(f"📊 fila {m['fila']} | estabilizando {m['estabilizando']} | em voo {m['em_voo']} | "
+                          f"mais antigo {m['idade_mais_antigo']:.1f}s | lag p50 {m['lag_p50']:.1f}s p95 {m['lag_p95']:.1f}s", flush=True)
+                    ultimo_status = time.monotonic()
+
+        if observador:
+            observador.stop()
+            observador.join()
+        if servidor:
+            servidor.shutdown()
+        print(f"🏁 Vigia encerrado. ✅ {self.contagem['ok']} | ❌ {self.contagem['erro']} | "
+              f"❓ {self.contagem['incerto']} incertos | pendentes na pasta: {len(self.fila)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço que envia para a API cada PDF de BU que chega na pasta de origem")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Envios simultâneos")
+    parser.add_argument("--url", default=URL_API)
+    parser.add_argument("--polling", action="store_true", help="Força varredura periódica em vez de inotify (ex.: pasta de rede)")
+    parser.add_argument("--porta-metricas", type=int, default=PORTA_METRICAS, help="Porta do /metrics (0 desliga)")
+    args = parser.parse_args()
+
+    vigia = VigiaUrnas(args.workers, args.url, args.polling)
+
+    # Ctrl+C / SIGTERM: para de pegar arquivos novos e termina os envios em andamento
+    def encerrar(*_):
+        print("\n⏸️  Encerrando: terminando os envios em andamento...")
+        vigia.parar.set()
+    signal.signal(signal.SIGINT, encerrar)
+    signal.signal(signal.SIGTERM, encerrar)
+    vigia.rodar(args.porta_metricas)
+
+if __name__ == "__main__":
+    main()